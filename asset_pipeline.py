@@ -0,0 +1,285 @@
+import argparse
+import functools
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+import threading
+import urllib.request
+from urllib.parse import parse_qs, urljoin, urlparse
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:    # gzip variants only; browsers that accept br still get gzip
+    brotli = None
+
+# -------------------------------------------------
+# Static Asset Pipeline: Vendored, Fingerprinted, Precompressed
+#
+# Build step (run once per deploy, needs network access):
+#
+#   python asset_pipeline.py
+#
+# downloads every external stylesheet (and whatever it pulls in through @import and url(...):
+# the Google Fonts CSS and its woff2 files) into assets/vendor/ under content-hashed names
+# (flatly.3f2a9c1e7b04.css), rewrites the references to the local copies, and writes .gz (and .br
+# with the brotli package) next to every vendored file and every CSS/JS file in assets/.
+# assets/vendor/manifest.json maps each original URL to its local file; stylesheets() swaps them
+# in, so nothing on first paint comes from a third party. Without a build the CDN URLs are kept.
+#
+# Serving (init_app; paths below are relative to the app's pathname prefix):
+#   - /assets/vendor/*: precompressed variant picked by Accept-Encoding, ETag = fingerprint,
+#     Cache-Control immutable for a year (the name changes with the content)
+#   - Dash's own assets (?m=<mtime>) and component suites (fingerprinted): immutable for a year,
+#     compressed once per process (or from a fresh precompressed sibling) and served from memory
+#   - callback, layout and dependency responses: compressed per response
+# Register it before metrics.init_app: Flask runs after_request hooks in reverse order, so the
+# compression then runs last and the metrics record uncompressed response sizes.
+# -------------------------------------------------
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+VENDOR_DIR = "vendor"
+MANIFEST = "manifest.json"
+ASSETS_IGNORE = r"\.[0-9a-f]{12}\.(css|js)$"   # Vendored files are linked in order via stylesheets()
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/124.0 Safari/537.36")   # Google Fonts only serves woff2 to modern browsers
+PRECOMPRESS_EXTENSIONS = (".css", ".js", ".json", ".svg", ".map")
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+CSS_IMPORT_RE = re.compile(r"""@import\s+(?:url\(\s*)?(['"]?)([^'")\s;]+)\1\s*\)?""")
+
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_MIMETYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+DYNAMIC_PATHS = ("/_dash-update-component", "/_dash-layout", "/_dash-dependencies")
+ENCODING_SUFFIX = {"br": ".br", "gzip": ".gz"}
+ONE_YEAR = 31536000
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+# -------------------------------------------------
+# Build: Vendor External Resources, Fingerprint, Precompress
+# -------------------------------------------------
+def fetch(url):
+    with urllib.request.urlopen(urllib.request.Request(url, headers={"User-Agent": USER_AGENT}), timeout=30) as response:
+        return response.read(), response.headers.get_content_type()
+
+def local_name(url, content_type):
+    # "https://cdn.jsdelivr.net/npm/bootswatch@5.3.3/dist/flatly/bootstrap.min.css" -> "flatly-bootstrap.min"
+    # "https://fonts.googleapis.com/css2?family=Montserrat:wght@400;700" -> "fonts-montserrat"
+    parsed = urlparse(url)
+    parts = [p for p in parsed.path.split("/") if p]
+    stem, ext = os.path.splitext(parts[-1] if parts else "index")
+    if stem in ("bootstrap", "bootstrap.min") and len(parts) > 1:
+        stem = f"{parts[-2]}-{stem}"
+    families = parse_qs(parsed.query).get("family")
+    if families:
+        stem = "fonts-" + "-".join(f.split(":")[0] for f in families)
+    ext = ext or mimetypes.guess_extension(content_type) or ""
+    return re.sub(r"[^A-Za-z0-9.\-]+", "-", stem).strip("-").lower(), ext
+
+def vendor(url, out_dir, done, css=False):
+    # -> local file name; CSS is rewritten so its @imports and url(...) point at vendored copies.
+    if url in done:
+        return done[url]
+    data, content_type = fetch(url)
+    if css or content_type == "text/css":
+        text = data.decode("utf-8")
+
+        def rewrite(match):
+            target = match.group(2).strip()
+            if target.startswith(("data:", "#")):
+                return match.group(0)
+            return f'url("{vendor(urljoin(url, target), out_dir, done)}")'
+        # Imports first (as CSS, rewritten to the plain string form), then every other url(...).
+        text = CSS_IMPORT_RE.sub(lambda m: f'@import "{vendor(urljoin(url, m.group(2)), out_dir, done, css=True)}"', text)
+        text = CSS_URL_RE.sub(rewrite, text)
+        data, content_type = text.encode("utf-8"), "text/css"
+    stem, ext = local_name(url, content_type)
+    name = f"{stem}.{fingerprint(data)}{ext}"
+    with open(os.path.join(out_dir, name), "wb") as f:
+        f.write(data)
+    done[url] = name
+    return name
+
+def precompress(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    encodings = []
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    encodings.append("gzip")
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+        encodings.append("br")
+    return encodings
+
+def build(urls, assets_dir=ASSETS_DIR):
+    out_dir = os.path.join(assets_dir, VENDOR_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    done = {}
+    stylesheets = {url: vendor(url, out_dir, done, css=True) for url in urls}
+    # Previous builds' files no longer referenced (old fingerprints) are removed.
+    keep = set(done.values())
+    for name in os.listdir(out_dir):
+        if name != MANIFEST and re.sub(r"\.(gz|br)$", "", name) not in keep:
+            os.remove(os.path.join(out_dir, name))
+    # Fonts and images are already compressed; text gets .gz/.br variants.
+    files = {name: precompress(os.path.join(out_dir, name)) if name.endswith(PRECOMPRESS_EXTENSIONS) else []
+             for name in sorted(keep)}
+    for root, _, names in os.walk(assets_dir):
+        if os.path.abspath(root).startswith(os.path.abspath(out_dir)):
+            continue
+        for name in names:
+            if name.endswith(PRECOMPRESS_EXTENSIONS):
+                precompress(os.path.join(root, name))
+    manifest = {"stylesheets": {url: f"{VENDOR_DIR}/{name}" for url, name in stylesheets.items()}, "files": files}
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+def load_manifest(assets_dir=ASSETS_DIR):
+    try:
+        with open(os.path.join(assets_dir, VENDOR_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# External stylesheet entries -> local fingerprinted URLs where the build vendored them
+# (asset_url: the app's get_asset_url, so the requests pathname prefix is honoured).
+def stylesheets(urls, asset_url=lambda path: "/assets/" + path, assets_dir=ASSETS_DIR):
+    manifest = load_manifest(assets_dir)
+    if manifest is None:
+        return list(urls)
+    local = manifest["stylesheets"]
+    return [asset_url(local[url]) if isinstance(url, str) and url in local else url for url in urls]
+
+# -------------------------------------------------
+# Serving: Content Negotiation, Cache Headers, Response Compression
+# -------------------------------------------------
+def accepted_encodings(can_compress=False):
+    # Client-accepted encodings, br first; can_compress drops br when we cannot produce it here.
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if quality and float(quality) <= 0:
+                continue
+        except ValueError:
+            pass
+        accepted.add(name.strip().lower())
+    return [e for e in ("br", "gzip") if e in accepted and not (can_compress and e == "br" and brotli is None)]
+
+def compress(data, encoding, level=6):
+    if encoding == "br":
+        return brotli.compress(data, quality=level - 1)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def serve_vendor(filename):
+    out_dir = os.path.join(ASSETS_DIR, VENDOR_DIR)
+    path = os.path.normpath(os.path.join(out_dir, filename))
+    if not path.startswith(out_dir + os.sep) or not os.path.isfile(path):
+        return Response("Not Found", status=404)
+    match = re.search(r"\.([0-9a-f]{12})\.", filename)
+    etag = match.group(1) if match else None
+    if etag is not None and request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        encoding = next((e for e in accepted_encodings() if os.path.isfile(path + ENCODING_SUFFIX[e])), None)
+        with open(path + ENCODING_SUFFIX[encoding] if encoding else path, "rb") as f:
+            data = f.read()
+        response = Response(data, mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"public, max-age={ONE_YEAR}, immutable"
+    response.vary.add("Accept-Encoding")
+    return response
+
+class CompressedCache:
+    # (path with fingerprint, encoding) -> compressed bytes for immutable responses.
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            data = self._entries.get(key)
+        if data is None:
+            data = build()
+            with self._lock:
+                self._entries[key] = data
+        return data
+
+compressed_cache = CompressedCache()
+
+def precompressed_sibling(encoding, assets_path):
+    # A fresh assets/<file>.gz|.br from the build step, for Dash-served assets.
+    if not request.path.startswith(assets_path):
+        return None
+    path = os.path.normpath(os.path.join(ASSETS_DIR, request.path[len(assets_path):]))
+    sibling = path + ENCODING_SUFFIX[encoding]
+    if (path.startswith(ASSETS_DIR + os.sep) and os.path.isfile(sibling)
+            and os.path.getmtime(sibling) >= os.path.getmtime(path)):
+        with open(sibling, "rb") as f:
+            return f.read()
+    return None
+
+def after_request(response, assets_path="/assets/", suites_path="/_dash-component-suites/"):
+    path = request.path
+    immutable = (path.startswith(suites_path) and response.cache_control.max_age == ONE_YEAR) or \
+        (path.startswith(assets_path) and not path.startswith(f"{assets_path}{VENDOR_DIR}/") and "m" in request.args)
+    if immutable and response.status_code == 200:
+        response.headers["Cache-Control"] = f"public, max-age={ONE_YEAR}, immutable"
+    if (response.status_code != 200 or "Content-Encoding" in response.headers
+            or not (immutable or path.endswith(DYNAMIC_PATHS))
+            or not (response.mimetype or "").startswith(COMPRESS_MIMETYPES)):
+        return response
+    response.vary.add("Accept-Encoding")
+    encodings = accepted_encodings(can_compress=True)
+    if not encodings:
+        return response
+    response.direct_passthrough = False   # send_file responses are streamed by default
+    encoding = encodings[0]
+    if immutable:
+        data = compressed_cache.get((request.full_path, encoding), lambda: precompressed_sibling(encoding, assets_path)
+                                    or compress(response.get_data(), encoding, level=9))
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        data = compress(data, encoding)
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+def init_app(app):
+    # Request paths as the server sees them: under the prefix Dash mounts its routes at.
+    prefix = app.config.routes_pathname_prefix
+    assets_path = prefix + app.config.assets_url_path.strip("/") + "/"
+    suites_path = prefix + "_dash-component-suites/"
+    app.server.add_url_rule(f"{assets_path}{VENDOR_DIR}/<path:filename>", "vendored_asset", serve_vendor)
+    app.server.after_request(functools.partial(after_request, assets_path=assets_path, suites_path=suites_path))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vendor, fingerprint and precompress the dashboard's static assets.")
+    parser.add_argument("urls", nargs="*", help="Stylesheets to vendor (default: the dashboard's external_stylesheets)")
+    args = parser.parse_args(argv)
+    urls = args.urls
+    if not urls:
+        from dashboard import external_stylesheets
+        urls = [url for url in external_stylesheets if isinstance(url, str) and url.startswith("http")]
+    manifest = build(urls)
+    for url, name in manifest["stylesheets"].items():
+        print(f"{url}\n  -> assets/{name}")
+    print(f"{len(manifest['files'])} vendored files, encodings: {', '.join(sorted({e for v in manifest['files'].values() for e in v}))}",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
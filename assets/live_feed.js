@@ -0,0 +1,83 @@
+/* Live NAV (see live_feed.py): one EventSource per page keeps a bounded buffer of [seq, t, nav]
+   points; each event nudges live-nav-store, and the clientside callback below appends only the
+   points the chart has not drawn yet through extendData. A freshly mounted chart (tab switch) or a
+   restarted stream redraws from the buffer instead. A refused stream (503 at the server's cap)
+   closes the EventSource for good, so the page reconnects itself with jittered backoff. */
+(function () {
+    var feed = window.dashLiveFeed;
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        live: {
+            render: function (tick, figure) {
+                var no = window.dash_clientside.no_update;
+                if (!feed || !figure) {
+                    return [no, no];
+                }
+                var points = feed.buffer;
+                if (!tick || feed.redraw) {
+                    feed.redraw = false;
+                    feed.rendered = points.length ? points[points.length - 1][0] : 0;
+                    var trace = Object.assign({}, figure.data[0], {
+                        x: points.map(function (p) { return p[1]; }),
+                        y: points.map(function (p) { return p[2]; })
+                    });
+                    return [no, Object.assign({}, figure, {data: [trace].concat(figure.data.slice(1))})];
+                }
+                var fresh = points.filter(function (p) { return p[0] > feed.rendered; });
+                if (!fresh.length) {
+                    return [no, no];
+                }
+                feed.rendered = fresh[fresh.length - 1][0];
+                return [[{
+                    x: [fresh.map(function (p) { return p[1]; })],
+                    y: [fresh.map(function (p) { return p[2]; })]
+                }, [0], feed.maxPoints], no];
+            }
+        }
+    });
+
+    if (!feed || !window.EventSource) {
+        return;
+    }
+    feed.buffer = [];
+    feed.rendered = 0;
+    feed.redraw = false;
+
+    var lastId = "";
+    var delay = 0;
+
+    function connect() {
+        // A new EventSource sends no Last-Event-ID; ?since= resumes the same way.
+        var url = feed.url + (lastId ? (feed.url.indexOf("?") < 0 ? "?" : "&") + "since=" + encodeURIComponent(lastId) : "");
+        var source = new window.EventSource(url);
+        source.onmessage = onMessage;
+        source.onerror = function () {
+            if (source.readyState !== window.EventSource.CLOSED) {
+                return;   // Dropped connection: the browser retries on its own
+            }
+            delay = Math.min(delay ? delay * 2 : 5000, 120000);
+            window.setTimeout(connect, delay / 2 + Math.random() * delay / 2);
+        };
+    }
+
+    function onMessage(event) {
+        delay = 0;
+        lastId = event.lastEventId || lastId;
+        var message = JSON.parse(event.data);
+        if (message.reset) {
+            feed.buffer = message.points;
+            feed.redraw = true;
+        } else {
+            feed.buffer = feed.buffer.concat(message.points);
+        }
+        if (feed.buffer.length > feed.maxPoints) {
+            feed.buffer = feed.buffer.slice(-feed.maxPoints);
+        }
+        // The store only exists while the overview tab is mounted; the chart's div marks that.
+        if (document.getElementById("live-nav-chart") && window.dash_clientside.set_props) {
+            window.dash_clientside.set_props("live-nav-store", {data: {seq: feed.buffer[feed.buffer.length - 1][0]}});
+        }
+    }
+
+    connect();
+})();
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from relative_performance import benchmark_yearly
+
+# -------------------------------------------------
+# Brinson Attribution: Allocation, Selection and Interaction per Segment and Year, Linked over Ranges
+#
+# Brinson-Fachler effects for portfolio weights/returns (wp, rp) against policy weights/returns
+# (wb, rb), with Rb = sum(wb * rb):
+#
+#   allocation  = (wp - wb) * (rb - Rb)      selection = wb * (rp - rb)
+#   interaction = (wp - wb) * (rp - rb)      sum over segments = Rp - Rb for each year
+#
+# Everything is a (years x segments) array operation, so the same code attributes 4 asset classes
+# or thousands of securities. Multi-year ranges are linked with Carino or Menchero coefficients, so
+# the linked effects add up to the cumulative (geometric) excess return over the range.
+#
+# Inputs:
+#   policy_benchmark  Asset_Class, Weight (%), Benchmark (table in data/benchmarks/, optional),
+#                     Return (% per year, used where the benchmark series has no value)
+#   segment_returns   Year, Asset_Class, Return (%) -- optional portfolio returns per class. Years
+#                     or classes without one are assumed to earn their policy return plus the part
+#                     of the fund's total return the known segments do not explain, spread evenly,
+#                     so the effects always reconcile to the reported Return.
+# -------------------------------------------------
+ASSET_CLASSES = ["Equities", "Fixed_Income", "Cash", "Real_Assets"]
+LINKING_METHODS = ("carino", "menchero")
+
+def brinson_effects(wp, rp, wb, rb):
+    total_benchmark = np.sum(wb * rb, axis=-1, keepdims=True)
+    allocation = (wp - wb) * (rb - total_benchmark)
+    selection = wb * (rp - rb)
+    interaction = (wp - wb) * (rp - rb)
+    return allocation, selection, interaction
+
+# -------------------------------------------------
+# Multi-Period Linking: Per-Period Scale Factors for Effects (Sum = Cumulative Excess)
+# -------------------------------------------------
+def log_ratio(rp, rb):
+    # (ln(1 + rp) - ln(1 + rb)) / (rp - rb), with its limit 1 / (1 + r) where the two match.
+    diff = rp - rb
+    same = np.abs(diff) < 1e-12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (np.log1p(rp) - np.log1p(rb)) / np.where(same, 1.0, diff)
+    return np.where(same, 1.0 / (1.0 + rp), ratio)
+
+def carino_factors(rp, rb):
+    cumulative_p, cumulative_b = np.prod(1.0 + rp) - 1.0, np.prod(1.0 + rb) - 1.0
+    return log_ratio(rp, rb) / log_ratio(np.float64(cumulative_p), np.float64(cumulative_b))
+
+def menchero_factors(rp, rb):
+    n = len(rp)
+    cumulative_p, cumulative_b = np.prod(1.0 + rp) - 1.0, np.prod(1.0 + rb) - 1.0
+    if abs(cumulative_p - cumulative_b) < 1e-12:
+        scale = (1.0 + cumulative_p) ** ((n - 1.0) / n)
+    else:
+        scale = ((cumulative_p - cumulative_b) / n) / ((1.0 + cumulative_p) ** (1.0 / n) - (1.0 + cumulative_b) ** (1.0 / n))
+    diff = rp - rb
+    squares = np.sum(diff ** 2)
+    correction = (cumulative_p - cumulative_b - scale * np.sum(diff)) / squares * diff if squares > 0 else np.zeros(n)
+    return scale + correction
+
+LINKERS = {"carino": carino_factors, "menchero": menchero_factors}
+
+# -------------------------------------------------
+# Inputs: Portfolio and Policy Weight/Return Matrices per Year
+# -------------------------------------------------
+def policy_matrices(policy, benchmarks, years, classes):
+    rows = policy.set_index("Asset_Class").reindex(classes)
+    weights = rows["Weight"].fillna(0.0).to_numpy(dtype=np.float64)
+    wb = np.tile(weights / weights.sum(), (len(years), 1))
+    fallback = rows["Return"].fillna(0.0).to_numpy(dtype=np.float64) / 100.0 if "Return" in rows else np.zeros(len(classes))
+    rb = np.tile(fallback, (len(years), 1))
+    for k, name in enumerate(rows["Benchmark"] if "Benchmark" in rows else [None] * len(classes)):
+        table = benchmarks.get(name) if isinstance(name, str) and name else None
+        if table is not None:
+            series = benchmark_yearly(table).groupby(level=0).last().reindex(years).to_numpy(dtype=np.float64)
+            rb[:, k] = np.where(np.isnan(series), fallback[k], series)
+    return wb, rb
+
+def portfolio_returns(total, wp, rb, known=None):
+    # known: (years x segments) portfolio returns with NaN where none was reported.
+    known = np.full(wp.shape, np.nan) if known is None else known
+    missing = np.isnan(known)
+    explained = np.sum(np.where(missing, wp * rb, wp * known), axis=1)
+    missing_weight = np.sum(np.where(missing, wp, 0.0), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        residual = np.where(missing_weight > 0, (total - explained) / missing_weight, 0.0)
+    return np.where(missing, rb + residual[:, None], known), missing
+
+class Attribution:
+    def __init__(self, years, classes, wp, rp, wb, rb, estimated):
+        self.years = list(years)
+        self.positions = {year: i for i, year in enumerate(self.years)}
+        self.classes = list(classes)
+        self.wp, self.rp, self.wb, self.rb = wp, rp, wb, rb
+        self.estimated = estimated
+        self.fund_return = np.sum(wp * rp, axis=1)
+        self.benchmark_return = np.sum(wb * rb, axis=1)
+        self.allocation, self.selection, self.interaction = brinson_effects(wp, rp, wb, rb)
+
+    def __len__(self):
+        return len(self.years)
+
+    @classmethod
+    def build(cls, df, policy, benchmarks, segment_returns=None, classes=ASSET_CLASSES):
+        rows = df.sort_values(by="Year").dropna(subset=["Return"] + list(classes))
+        years = rows["Year"].to_numpy()
+        weights = rows[list(classes)].to_numpy(dtype=np.float64)
+        wp = weights / np.where(weights.sum(axis=1, keepdims=True) > 0, weights.sum(axis=1, keepdims=True), 1.0)
+        wb, rb = policy_matrices(policy, benchmarks, years, classes)
+        known = None
+        if segment_returns is not None and len(segment_returns):
+            known = (segment_returns.pivot_table(index="Year", columns="Asset_Class", values="Return", aggfunc="last")
+                     .reindex(index=years, columns=list(classes)).to_numpy(dtype=np.float64) / 100.0)
+        rp, estimated = portfolio_returns(rows["Return"].to_numpy(dtype=np.float64) / 100.0, wp, rb, known)
+        return cls(years, classes, wp, rp, wb, rb, estimated)
+
+    def linked(self, start_year, end_year, method="carino"):
+        # Years without attribution inputs (the launch year) are simply outside the range.
+        inside = [self.positions[y] for y in self.years if start_year <= y <= end_year]
+        if not inside:
+            return None
+        i, j = min(inside), max(inside) + 1
+        rp, rb = self.fund_return[i:j], self.benchmark_return[i:j]
+        factors = LINKERS[method](rp, rb)[:, None] if j - i > 1 else np.ones((1, 1))
+        return {
+            "start": self.years[i],
+            "end": self.years[j - 1],
+            "years": j - i,
+            "fund_return": float(np.prod(1.0 + rp) - 1.0),
+            "benchmark_return": float(np.prod(1.0 + rb) - 1.0),
+            "estimated": bool(self.estimated[i:j].any()),
+            "effects": pd.DataFrame({
+                "allocation": np.sum(self.allocation[i:j] * factors, axis=0),
+                "selection": np.sum(self.selection[i:j] * factors, axis=0),
+                "interaction": np.sum(self.interaction[i:j] * factors, axis=0)
+            }, index=self.classes)
+        }
@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# -------------------------------------------------
+# Load & Latency Benchmark for the Dashboard Callbacks
+#
+# Replays a seeded mix of tab switches, year selections, table pages and projections against
+# app.server through the Flask test client (in-process, no network) and writes a JSON report.
+#
+#   python benchmark.py --requests 2000 --concurrency 8 --output bench.json
+#   python benchmark.py --requests 2000 --concurrency 8 --baseline bench.json --tolerance 0.25
+# -------------------------------------------------
+DEFAULT_MIX = "tab=0.4,year=0.35,table=0.15,projection=0.05,search=0.05"
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux and bytes on macOS; either way it is a process-wide peak.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else None
+
+# -------------------------------------------------
+# Requests: Build /_dash-update-component Payloads from the App's Callback Map
+# -------------------------------------------------
+def callback_payload(app, output_key, values):
+    spec = app.callback_map[output_key]
+    outputs = spec["output"] if isinstance(spec["output"], list) else [spec["output"]]
+    inputs = [dict(item, value=value) for item, value in zip(spec["inputs"], values)]
+    return {
+        "output": output_key,
+        "outputs": [{"id": o.component_id, "property": o.component_property} for o in outputs]
+        if len(outputs) > 1 else {"id": outputs[0].component_id, "property": outputs[0].component_property},
+        "inputs": inputs,
+        "changedPropIds": [f"{inputs[0]['id']}.{inputs[0]['property']}"],
+        "state": []
+    }
+
+def output_key_for(app, callback_name, component_id=None):
+    for key, spec in app.callback_map.items():
+        if spec["callback"].__name__ == callback_name and (component_id is None or component_id in key):
+            return key
+    return None
+
+def build_scenarios(dashboard):
+    app = dashboard.app
+    frames = dashboard.current_frames
+    scenarios = defaultdict(list)
+
+    key = output_key_for(app, "render_tab_content")
+    for tab_id in dashboard.TAB_LAYOUTS:
+        scenarios["tab"].append((f"render_tab_content[{tab_id}]", callback_payload(app, key, [tab_id])))
+
+    key = output_key_for(app, "update_overview_charts")
+    for year in frames.df["Year"]:
+        scenarios["year"].append(("update_overview_charts", callback_payload(app, key, [year])))
+
+    for table_id in getattr(dashboard, "TABLE_SOURCES", {}):
+        key = output_key_for(app, "update_table_page", table_id)
+        if key is None:
+            continue
+        for page in range(3):
+            for sort_by in ([], [{"column_id": "Year", "direction": "asc"}]):
+                scenarios["table"].append((f"update_table_page[{table_id}]",
+                                           callback_payload(app, key, [page, 10, sort_by, ""])))
+
+    key = output_key_for(app, "update_range_stats")
+    if key is not None:
+        last = len(frames.ranges) - 1
+        for value in ([0, last], [last - 4, last], [2, 8], [last, last]):
+            scenarios["range"].append(("update_range_stats", callback_payload(app, key, [value])))
+
+    key = output_key_for(app, "update_projection")
+    if key is not None:
+        for horizon in (5, 10, 20, 30):
+            for preset in dashboard.ALLOCATION_PRESETS:
+                scenarios["projection"].append(("update_projection", callback_payload(app, key, [horizon, preset])))
+
+    key = output_key_for(app, "update_search")
+    if key is not None:
+        for query in ("financial crisis cash", "ESG integration", "divestitures", "covid pandemic recovery"):
+            scenarios["search"].append(("update_search", callback_payload(app, key, [query])))
+    return scenarios
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+# -------------------------------------------------
+# Runner: Fixed Request Plan Executed at the Requested Concurrency
+# -------------------------------------------------
+def run(dashboard, n_requests, concurrency, mix, seed, warmup):
+    scenarios = build_scenarios(dashboard)
+    mix = {k: w for k, w in mix.items() if scenarios.get(k) and w > 0}
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=n_requests)
+    plan = [rng.choice(scenarios[kind]) for kind in kinds]
+
+    local = threading.local()
+    def client():
+        if not hasattr(local, "client"):
+            local.client = dashboard.app.server.test_client()
+        return local.client
+
+    def send(item):
+        label, payload = item
+        start = time.perf_counter()
+        response = client().post("/_dash-update-component", json=payload)
+        elapsed = time.perf_counter() - start
+        return label, elapsed, len(response.data), response.status_code
+
+    for item in plan[:warmup]:
+        send(item)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, plan))
+    duration = time.perf_counter() - started
+    return results, duration, mix, measure_allocations(dashboard, plan)
+
+# Serial pass after the timed run: tracemalloc is process-wide (concurrent requests would share one
+# peak) and slows allocation-heavy code down, so it stays out of the latency numbers. Each distinct
+# request in the plan runs once; the peak is measured above what was allocated before it started.
+def measure_allocations(dashboard, plan):
+    client = dashboard.app.server.test_client()
+    distinct = list({id(item): item for item in plan}.values())
+    peaks = defaultdict(list)
+    tracemalloc.start()
+    try:
+        for label, payload in distinct:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            client.post("/_dash-update-component", json=payload)
+            peaks[label].append((tracemalloc.get_traced_memory()[1] - before) / 2**10)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+def summarize(results, allocations=()):
+    latencies = [r[1] * 1000 for r in results]
+    sizes = [r[2] for r in results]
+    return {
+        "count": len(results),
+        "errors": sum(1 for r in results if r[3] != 200),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": float(np.mean(latencies)) if latencies else None,
+        "max_ms": max(latencies) if latencies else None,
+        "mean_bytes": float(np.mean(sizes)) if sizes else None,
+        "total_bytes": int(sum(sizes)),
+        "alloc_peak_kb": max(allocations) if allocations else None
+    }
+
+def build_report(results, duration, args, mix, allocations):
+    import dash
+    by_label = defaultdict(list)
+    by_callback = defaultdict(list)
+    for r in results:
+        by_label[r[0]].append(r)
+        by_callback[r[0].split("[")[0]].append(r)
+    overall = summarize(results, [kb for peaks in allocations.values() for kb in peaks])
+    overall["process_rss_mb"] = rss_mb()   # Whole process, after the run
+    overall["duration_s"] = duration
+    overall["throughput_rps"] = len(results) / duration if duration else None
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "dash": dash.__version__,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "mix": mix
+        },
+        "overall": overall,
+        "callbacks": {name: summarize(rs, [kb for label, peaks in allocations.items()
+                                           if label.split("[")[0] == name for kb in peaks])
+                      for name, rs in sorted(by_callback.items())},
+        "scenarios": {name: summarize(rs, allocations.get(name, ())) for name, rs in sorted(by_label.items())}
+    }
+
+# -------------------------------------------------
+# Baseline Comparison: Flag p95 Latency or Payload Growth Beyond the Tolerance
+# -------------------------------------------------
+def compare(report, baseline, tolerance):
+    regressions = []
+    for section in ("callbacks", "scenarios"):
+        for name, current in report[section].items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous:
+                continue
+            for metric in ("p95_ms", "mean_bytes"):
+                before, after = previous.get(metric), current.get(metric)
+                if before and after and after > before * (1 + tolerance):
+                    regressions.append(f"{section}/{name}: {metric} {before:.1f} -> {after:.1f} "
+                                       f"(+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+def print_table(report):
+    header = f"{'callback':48} {'n':>6} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'bytes':>9} {'allocKB':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, s in report["scenarios"].items():
+        print(f"{name:48} {s['count']:>6} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} "
+              f"{s['mean_bytes']:>9.0f} {s['alloc_peak_kb'] or 0:>9.0f}")
+    o = report["overall"]
+    print(f"\n{o['count']} requests, {o['errors']} errors in {o['duration_s']:.2f}s "
+          f"({o['throughput_rps']:.1f} req/s), p50 {o['p50_ms']:.2f} ms, p95 {o['p95_ms']:.2f} ms, "
+          f"p99 {o['p99_ms']:.2f} ms, process RSS {o['process_rss_mb']:.0f} MB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard callbacks in-process.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="kind=weight list; kinds: tab, year, table, range, projection, search")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Compare against a stored JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative growth before flagging")
+    args = parser.parse_args(argv)
+
+    # Projections run in-request unless asked otherwise: in background mode the request only
+    # queues a job, and its latency says nothing about the work.
+    os.environ.setdefault("CALLBACK_MODE", "sync")
+    import dashboard
+    results, duration, mix, allocations = run(dashboard, args.requests, args.concurrency, parse_mix(args.mix),
+                                              args.seed, args.warmup)
+    report = build_report(results, duration, args, mix, allocations)
+    print_table(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
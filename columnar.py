@@ -0,0 +1,98 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:    # Without pyarrow every process simply keeps its own in-memory frames
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Shared Columnar Frames: Arrow IPC Files Memory-Mapped Read-Only by Every Worker
+#
+# The first process that needs a frame set builds it and writes it under COLUMNAR_DIR/<key>/;
+# every other process (each gunicorn worker, each restart) maps the same files. Numeric columns
+# without nulls come back as zero-copy, read-only NumPy views onto the page cache, so the bytes
+# exist once per machine instead of once per worker. Large low-cardinality string columns
+# (tickers, dates in holdings/prices) are stored dictionary-encoded and load as Categoricals.
+#
+# Keys must identify the content (a file digest or dataset version): entries are never rewritten.
+# Set DASHBOARD_COLUMNAR_DIR="" to disable sharing.
+# -------------------------------------------------
+COLUMNAR_DIR = os.environ.get("DASHBOARD_COLUMNAR_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), ".columnar"))
+DICTIONARY_MIN_ROWS = 10_000
+DICTIONARY_MAX_RATIO = 0.5      # Distinct values per row above which dictionary encoding does not pay
+
+def enabled(root=COLUMNAR_DIR):
+    return pa is not None and bool(root)
+
+def to_arrow(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if len(df) < DICTIONARY_MIN_ROWS:
+        return table
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            column = table.column(i)
+            encoded = column.dictionary_encode()
+            if sum(len(chunk.dictionary) for chunk in encoded.chunks) <= len(df) * DICTIONARY_MAX_RATIO:
+                table = table.set_column(i, field.name, encoded)
+    return table
+
+def write_frame(df, path):
+    table = to_arrow(df)
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def map_frame(path):
+    # The memory map stays open for as long as any column view references it.
+    source = pa.memory_map(path, "r")
+    table = ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+def publish(directory, frames):
+    root = os.path.dirname(directory)
+    os.makedirs(root, exist_ok=True)
+    # Build in a scratch directory and rename into place: readers see a complete set or nothing.
+    scratch = tempfile.mkdtemp(dir=root, prefix=".build-")
+    try:
+        for name, df in frames.items():
+            write_frame(df, os.path.join(scratch, f"{name}.arrow"))
+        os.rename(scratch, directory)
+    except (OSError, pa.ArrowException):
+        shutil.rmtree(scratch, ignore_errors=True)
+        if not os.path.isdir(directory):
+            raise
+
+def shared_frames(key, build, root=COLUMNAR_DIR):
+    # build() -> {name: DataFrame}; returns the same names as memory-mapped frames.
+    if not enabled(root):
+        return build()
+    directory = os.path.join(root, key)
+    if not os.path.isdir(directory):
+        frames = build()
+        try:
+            publish(directory, frames)
+        except (OSError, pa.ArrowException) as exc:
+            # Read-only disk or a column Arrow cannot type: this process keeps its own copy.
+            logger.warning("Could not share frames %s (%s); using private copies", key, exc)
+            return frames
+    return {os.path.splitext(f)[0]: map_frame(os.path.join(directory, f))
+            for f in sorted(os.listdir(directory)) if f.endswith(".arrow")}
+
+def prune(keep_keys, root=COLUMNAR_DIR, grace_seconds=3600):
+    # Other workers may still be on an older version for a few seconds, so only entries older than
+    # the grace period go; files already mapped stay readable after unlinking in any case.
+    if not enabled(root) or not os.path.isdir(root):
+        return
+    cutoff = time.time() - grace_seconds
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name not in keep_keys and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
@@ -1,9 +1,39 @@
+import startup
 import dash
-from dash import dcc, html, Input, Output, dash_table
+from dash import dcc, html, Input, Output, State, ClientsideFunction, dash_table, Patch
+from dash.dash_table.Format import Format
 import dash_bootstrap_components as dbc
-import plotly.express as px
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
 import pandas as pd
+import math
 import os
+from types import SimpleNamespace
+
+import asset_pipeline
+import columnar
+from figure_json import FIGURE_TEMPLATE, compact_figure, loads
+import jobs
+import live_feed
+from data_store import DataStore
+from table_query import TableIndex
+from returns_engine import compute_performance, apply_performance
+import projections
+from esg_engine import ESGEngine, apply_esg
+import attribution
+import relative_performance
+import risk
+from range_stats import RangeAggregates
+from securities import SecurityIndex
+import search
+import metrics
+from metrics import instrumented, record_cache
+import profiler
+from profiler import profiled
+
+# plotly.express is only needed when a figure is built, which a snapshot boot skips entirely.
+px = startup.lazy_import("plotly.express")
+startup.mark("imports")
 
 # -------------------------------------------------
 # Define Color & Font Variables (Inspired by Berkeley Haas MBA website)
@@ -26,6 +56,7 @@ BACKGROUND_STYLE = {
 
 # -------------------------------------------------
 # External Stylesheets: Using FLATLY Bootstrap, Animate.css, and Montserrat Google Font
+# (served from assets/vendor/ once `python asset_pipeline.py` has vendored them)
 # -------------------------------------------------
 external_stylesheets = [
     dbc.themes.FLATLY,
@@ -34,30 +65,27 @@ external_stylesheets = [
 ]
 
 # -------------------------------------------------
-# Data: Key Metrics Extracted from Each Report
+# Overview Highlight Mode: "patch" sends only the selected-year deltas, "full" re-sends whole figures
 # -------------------------------------------------
-data = {
-    "Year": [
-        "2007-2008", "2008-2009", "2009-2010", "2010-2011", "2011-2012", "2012-2013",
-        "2013-2014", "2014-2015", "2015-2016", "2016-2017", "2017-2018", "2018-2019",
-        "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"
-    ],
-    "Fund_Value": [1.25, 1.25, 1.50, 1.70, 1.90, 2.10, 2.20, 2.50, 2.80, 3.10, 3.40, 3.80, 3.45, 4.60, 4.54, 4.09, 4.30],
-    "Return": [0.0, -3.5, 17.0, 10.0, 8.0, 12.0, 13.72, 5.0, 6.0, 4.5, 7.0, 8.0, 0.62, 40.9, -8.8, 5.93, 13.87],
-    "Equities": [0, 31, 53, 55, 60, 62, 68, 70, 70, 70, 68, 65, 65, 65, 65, 73, 60],
-    "Fixed_Income": [0, 0, 0, 0, 0, 0, 16, 15, 15, 15, 16, 18, 18, 18, 20, 10, 35],
-    "Cash": [100, 69, 47, 45, 40, 38, 8, 10, 10, 10, 10, 10, 10, 10, 5, 5, 13],
-    "Real_Assets": [0, 0, 0, 0, 0, 0, 8, 5, 5, 5, 6, 7, 7, 7, 10, 12, 5],
-    "ESG_Score": [None, None, None, 50, 55, 60, 65, 68, 70, 72, 73, 75, 74, 78, 76, 77, 80]
-}
-df = pd.DataFrame(data)
+HIGHLIGHT_MODE = os.environ.get("HIGHLIGHT_MODE", "patch")
+DEFAULT_YEAR = "2023-2024"
+
+# -------------------------------------------------
+# Table Mode: "custom" pages/sorts/filters on the server, "native" ships every row to the browser
+# -------------------------------------------------
+TABLE_MODE = os.environ.get("TABLE_MODE", "custom")
+TABLE_PAGE_SIZE = int(os.environ.get("TABLE_PAGE_SIZE", "20"))
+
+# -------------------------------------------------
+# Callback Mode: "background" runs the Monte Carlo projection in job worker processes (jobs.py),
+# "sync" runs it inside the web request
+# -------------------------------------------------
+CALLBACK_MODE = os.environ.get("CALLBACK_MODE", "background")
 
 # -------------------------------------------------
-# Sort DataFrames (most recent first)
+# Data: Key Metrics, Summaries, Shifts and Performers Loaded from data/ (hot-reloaded)
 # -------------------------------------------------
-df_sorted = df.sort_values(by="Year", ascending=False)
-df_display = df_sorted.copy()
-df_plot = df.sort_values(by="Year", ascending=False)
+store = DataStore()
 
 # -------------------------------------------------
 # Insights Data: Aggregated Findings from Reports
@@ -83,204 +111,104 @@ insights_data = {
 df_insights = pd.DataFrame(insights_data)
 
 # -------------------------------------------------
-# Detailed Yearly Report Summaries (More Detailed)
-# -------------------------------------------------
-yearly_summaries = {
-    "2007-2008": (
-        "HSRIF Beginnings:\n"
-        "- **Launch and Vision:** Introduced the Haas Socially Responsible Investment Fund with a $250K gift and major donations from alumni.\n"
-        "- **Team Formation:** Assembled a diverse portfolio management team from MBA and MFE programs to gain hands-on experience in ethical investing.\n"
-        "- **Focus:** Established a vision for combining social responsibility with investment management in an academic setting."
-    ),
-    "2008-2009": (
-        "Crisis Management:\n"
-        "- **Market Turbulence:** The fund navigated the global financial crisis by maintaining a high cash position (69%) to preserve capital.\n"
-        "- **Conservative Strategy:** Minimal market exposure resulted in a -3.5% return, emphasizing risk aversion during uncertain times.\n"
-        "- **Initial Learning:** Set the stage for future recovery by safeguarding assets."
-    ),
-    "2009-2010": (
-        "Recovery Phase:\n"
-        "- **Market Rebound:** Achieved a 17% return on the invested portion as market conditions improved.\n"
-        "- **Asset Reallocation:** Increased equity exposure to 53% while reducing cash to 47%, signaling a shift toward market participation.\n"
-        "- **Early Lessons:** Detailed analysis of holdings (e.g., strong performance of Cisco Systems and underperformance of Suntech Power) provided valuable insights."
-    ),
-    "2010-2011": (
-        "Market Rebound & Process Enhancement:\n"
-        "- **Growth in Value:** Fund value increased to 1.70M USD with a 10% return amid a market rebound.\n"
-        "- **Process Improvements:** Introduced improved portfolio management and analytical tools, along with the first ESG score (set at 50).\n"
-        "- **Balanced Approach:** Began evaluating investments on both financial and social responsibility criteria."
-    ),
-    "2011-2012": (
-        "Transitional Growth:\n"
-        "- **Stable Growth:** Fund value grew to 1.90M USD with an 8% return.\n"
-        "- **Shift in Allocation:** Increased equity exposure to 60% and reduced cash to 40%, marking a gradual transition to a more balanced portfolio.\n"
-        "- **ESG Integration:** ESG score updated to 55, reflecting initial steps in integrating social metrics."
-    ),
-    "2012-2013": (
-        "Incremental Growth & ESG Integration:\n"
-        "- **Improved Performance:** Fund value reached 2.10M USD with a 12% return.\n"
-        "- **Research Enhancements:** Introduced systematic ESG tracking and improved research methodologies.\n"
-        "- **ESG Progress:** ESG score increased to 60, indicating growing commitment to sustainability."
-    ),
-    "2013-2014": (
-        "Milestone & Strategic Shift:\n"
-        "- **Scaling Up:** Fund value increased to 2.20M USD with a 13.72% return.\n"
-        "- **Technology Adoption:** Transitioned to Bloomberg’s Portfolio platform and adopted ESG benchmarks like the KLD index.\n"
-        "- **Asset Mix Transformation:** Notable shift with equity exposure at 68% and a sharp drop in cash to 8%, plus the introduction of fixed income and real assets.\n"
-        "- **ESG Score:** Raised to 65."
-    ),
-    "2014-2015": (
-        "Enhanced Process & ESG Focus:\n"
-        "- **Refinement:** Continued process refinements and robust ESG integration.\n"
-        "- **Stable Returns:** Fund value increased to 2.50M USD with a 5% return.\n"
-        "- **Asset Allocation:** Equity exposure rose to 70% while cash increased modestly to 10%; fixed income and real assets adjusted accordingly.\n"
-        "- **ESG Score:** Improved to 68."
-    ),
-    "2015-2016": (
-        "Structural Transition:\n"
-        "- **Portfolio Expansion:** Fund value grew to 2.80M USD with a 6% return.\n"
-        "- **Consistent Allocation:** Maintained 70% equities and 10% cash; fixed income and real assets stable.\n"
-        "- **ESG Maturity:** ESG score reached 70, indicating ongoing refinement."
-    ),
-    "2016-2017": (
-        "Strategic Projects & Detailed Analysis:\n"
-        "- **Modest Growth:** Fund value increased to 3.10M USD with a 4.5% return.\n"
-        "- **In-Depth Analysis:** Enhanced risk management and detailed performance analysis, with key strategic projects underway.\n"
-        "- **ESG Score:** Advanced to 72."
-    ),
-    "2017-2018": (
-        "10‑Year Retrospective:\n"
-        "- **Anniversary & Impact:** Celebrated the fund’s tenth anniversary, with alumni impact and long-term performance review.\n"
-        "- **Performance:** Fund value reached 3.40M USD with a 7% return; highlighted top performers (e.g., Alphabet Inc. at +35%) and underperformers (e.g., Starbucks at -6%).\n"
-        "- **ESG Score:** Increased to 73."
-    ),
-    "2018-2019": (
-        "Expanded Asset Allocation:\n"
-        "- **Diversification:** Fund value grew to 3.80M USD with an 8% return.\n"
-        "- **Strategic Divestitures:** Expanded asset allocation with increased fixed income (18%) and maintained cash at 10%.\n"
-        "- **ESG Excellence:** ESG score rose to 75; strong performance noted from Alphabet Inc. (+40%) and moderate underperformance from PayPal (-5%)."
-    ),
-    "2019-2020": (
-        "Volatile Markets:\n"
-        "- **Challenging Conditions:** Fund value slightly decreased to 3.45M USD with a modest return of 0.62% amid market volatility.\n"
-        "- **Risk Management:** Asset allocation remained steady with 65% equities; insights from early positions provided valuable lessons.\n"
-        "- **ESG Score:** Recorded at 74; top performer Mastercard (+10%) versus underperformer Square (-15%)."
-    ),
-    "2020-2021": (
-        "COVID‑19 Rebound:\n"
-        "- **Strong Recovery:** Fund value rebounded to 4.60M USD with a remarkable 40.9% return during the pandemic.\n"
-        "- **Portfolio Shifts:** Emphasis on equities (65%), initiation of real asset investments, and adjustments in fixed income.\n"
-        "- **ESG Leadership:** ESG score increased to 78; Microsoft (+25%) emerged as a top performer while Hannon Armstrong (-10%) underperformed."
-    ),
-    "2021-2022": (
-        "Challenging Adjustments:\n"
-        "- **Turbulent Year:** Fund value slightly decreased to 4.54M USD with an -8.8% return amid shifting market conditions.\n"
-        "- **Reallocation:** Increased fixed income exposure (20%) and reduced cash to 5% as part of strategic rebalancing.\n"
-        "- **ESG Update:** ESG score settled at 76; strong performance from Visa (+15%) and weaker performance from American Water Works (-8%)."
-    ),
-    "2022-2023": (
-        "Refined Management:\n"
-        "- **Modest Growth:** Fund value reached 4.09M USD with a 5.93% return, emphasizing refined portfolio management.\n"
-        "- **Aggressive Equity Exposure:** Increased equity to 73% while maintaining cash at 5%; adjustments across other assets for diversification.\n"
-        "- **ESG Progress:** ESG score increased to 77; slight underperformance noted in the Aperio Portfolio (-5%)."
-    ),
-    "2023-2024": (
-        "Strategic Shifts for Future Growth:\n"
-        "- **Growth & Rebalancing:** Fund value rebounded to 4.30M USD with a 13.87% return.\n"
-        "- **Asset Reallocation:** Equity exposure decreased to 60%, cash increased to 13%, and fixed income jumped to 35%, reflecting strategic rebalancing.\n"
-        "- **ESG Maturity:** ESG score peaked at 80; Walt Disney Company (+20%) identified as a top performer, while Avalon Bay (-7%) underperformed."
+# Derived Frames: Sorted and Plotting Frames Built Once per Dataset Version
+# -------------------------------------------------
+LAUNCH_MISSING_COLUMNS = ["Return", "Equities", "Fixed_Income", "Cash", "Real_Assets", "ESG_Score"]
+
+# Shared on disk across restarts, so the engine's code and settings are part of the key, not just the data.
+def performance_key(version):
+    return f"performance-{version}-{startup.source_fingerprint(('returns_engine.py',))}"
+
+def risk_key(version):
+    settings = (risk.RISK_FREE_RATE, risk.BOOTSTRAP_SAMPLES)
+    return f"risk-{version}-{startup.source_fingerprint(('risk.py',), settings)}"
+
+def build_frames(snapshot):
+    df = snapshot.tables["fund_metrics"]
+
+    # Computed NAV and returns from holdings/prices replace the hand-entered columns where available.
+    # The engine runs once per dataset version; every other worker maps its output read-only.
+    performance, daily = None, None
+    if snapshot.tables.get("holdings") is not None and snapshot.tables.get("prices") is not None:
+        def run_engine():
+            yearly, days = compute_performance(snapshot.tables["holdings"], snapshot.tables["prices"],
+                                               snapshot.tables.get("cash_flows"))
+            return {"performance": yearly, "daily": days}
+        shared = columnar.shared_frames(performance_key(snapshot.version), run_engine)
+        performance, daily = shared["performance"], shared["daily"]
+        df = apply_performance(df, performance)
+
+    # Holdings-weighted E/S/G pillars replace the hand-entered ESG_Score where holdings are scored.
+    esg, esg_yearly = None, None
+    if performance is not None and snapshot.tables.get("esg_scores") is not None:
+        esg = ESGEngine.build(snapshot.tables["holdings"], snapshot.tables["prices"], snapshot.tables["esg_scores"])
+        esg_yearly = esg.yearly()
+        df = apply_esg(df, esg_yearly)
+
+    # Sort DataFrames (most recent first)
+    df_sorted = df.sort_values(by="Year", ascending=False)
+
+    # The launch year has no meaningful return or allocation: plot gaps there, and let the tables
+    # render the nulls as "N/A" (see numeric_columns) instead of keeping an object-dtype copy.
+    launch = (df_sorted["Year"] == "2007-2008").to_numpy()
+    df_plot = df_sorted.assign(**{col: df_sorted[col].mask(launch) for col in LAUNCH_MISSING_COLUMNS})
+
+    summaries = snapshot.tables["yearly_summaries"]
+    df_top_under = snapshot.tables["top_under"]
+    return SimpleNamespace(
+        version=snapshot.version,
+        df=df,
+        performance=performance,
+        daily=daily,
+        esg=esg,
+        esg_yearly=esg_yearly,
+        df_sorted=df_sorted,
+        df_plot=df_plot,
+        benchmarks={relative_performance.benchmark_name(name): table for name, table in snapshot.tables.items()
+                    if name.startswith("benchmarks/")},
+        ranges=RangeAggregates.build(df_plot, daily),
+        policy=snapshot.tables.get("policy_benchmark"),
+        segment_returns=snapshot.tables.get("segment_returns"),
+        df_shifts=snapshot.tables["investment_shifts"].sort_values(by="Year", ascending=False),
+        df_top_under=df_top_under.sort_values(by="Year", ascending=False),
+        securities=SecurityIndex.build(df_top_under),
+        yearly_summaries=dict(zip(summaries["Year"], summaries["Summary"]))
     )
-}
 
-# -------------------------------------------------
-# Additional Data: Major Investment Shifts
-# -------------------------------------------------
-data_shifts = {
-    "Year": [
-        "2007-2008", "2008-2009", "2009-2010", "2010-2011", "2011-2012", "2012-2013",
-        "2013-2014", "2014-2015", "2015-2016", "2016-2017", "2017-2018", "2018-2019",
-        "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"
-    ],
-    "Divestitures": [0, 0, 1, 1, 1, 1, 2, 2, 1, 2, 2, 3, 1, 2, 1, 1, 2],
-    "New_Positions": [0, 0, 1, 2, 1, 1, 3, 2, 2, 3, 2, 3, 1, 4, 2, 1, 3],
-    "Key_Shifts": [
-        "Fund launched.",
-        "High cash maintained during crisis.",
-        "Sold Suntech; initiated recovery.",
-        "Introduced new analytics.",
-        "Minor divestitures during transition.",
-        "Early ESG signals observed.",
-        "Expanded portfolio; divested underperformers.",
-        "Improved ESG integration and diversification.",
-        "Balanced new positions with divestitures.",
-        "Strategic projects increased divestitures.",
-        "Board influence; rebalancing initiated.",
-        "Significant divestitures with quality new additions.",
-        "Maintained stability during volatility.",
-        "Strong rebound with reallocation.",
-        "Adjusted positions amid downturn.",
-        "Steady shifts for sustained growth.",
-        "Rebalanced for future opportunities."
-    ]
-}
-df_shifts = pd.DataFrame(data_shifts).sort_values(by="Year", ascending=False)
+current_frames = build_frames(store.snapshot())
+startup.mark("frames")
 
 # -------------------------------------------------
-# Additional Data: Top-Performing & Underperforming Investments
+# Live NAV Feed (LIVE_FEED): new observations stream to the overview's live chart (live_feed.py)
 # -------------------------------------------------
-data_top_under = {
-    "Year": [
-        "2007-2008", "2008-2009", "2009-2010", "2010-2011", 
-        "2011-2012", "2012-2013", "2013-2014", "2014-2015", 
-        "2015-2016", "2016-2017", "2017-2018", "2018-2019", 
-        "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"
-    ],
-    "Top_Performer": [
-        "N/A",  
-        "Cisco Systems (CSCO) +19.26%",
-        "Cisco Systems (CSCO) +19.26%",
-        "Cisco Systems (CSCO) +22%",
-        "Microsoft (MSFT) +18%",
-        "Apple Inc. (AAPL) +20%",
-        "Alphabet Inc. (GOOGL) +25%",
-        "Microsoft (MSFT) +30%",
-        "Mastercard Inc. (MA) +28%",
-        "Microsoft (MSFT) +32%",
-        "Alphabet Inc. (GOOGL) +35%",
-        "Alphabet Inc. (GOOGL) +40%",
-        "Mastercard Inc. (MA) +10%",
-        "Microsoft (MSFT) +25%",
-        "Visa Inc. (V) +15%",
-        "Alphabet Inc. (GOOGL) +18%",
-        "Walt Disney Company (DIS) +20%"
-    ],
-    "Underperformer": [
-        "N/A",
-        "Suntech Power Holdings (STP) -60.83%",
-        "Suntech Power Holdings (STP) -60.83%",
-        "Suntech Power Holdings (STP) -65%",
-        "Starbucks (SBUX) -12%",
-        "Qualcomm (QCOM) -15%",
-        "Mastercard (MA) -5%",
-        "SolarCity (SCTY) -10%",
-        "Eaton Corp (ETN) -8%",
-        "Hanes Brand -7%",
-        "Starbucks (SBUX) -6%",
-        "PayPal (PYPL) -5%",
-        "Square (SQ) -15%",
-        "Hannon Armstrong -10%",
-        "American Water Works (AWK) -8%",
-        "Aperio Portfolio -5%",
-        "Avalon Bay -7%"
-    ]
-}
-df_top_under = pd.DataFrame(data_top_under).sort_values(by="Year", ascending=False)
+live = None
+if live_feed.LIVE_FEED:
+    latest_value = float(current_frames.df_plot["Fund_Value"].dropna().iloc[-1])
+    live = live_feed.LiveFeed(live_feed.feed_from_spec(live_feed.LIVE_FEED, start_nav=latest_value))
 
-# -------------------------------------------------
-# Prepare DataFrames for Plotting and Display (handle missing values)
-# -------------------------------------------------
-df_plot.loc[df_plot["Year"] == "2007-2008", ["Return", "Equities", "Fixed_Income", "Cash", "Real_Assets", "ESG_Score"]] = None
-df_display.loc[df_display["Year"] == "2007-2008", ["Return", "Equities", "Fixed_Income", "Cash", "Real_Assets", "ESG_Score"]] = "N/A"
+# DataTable paging props: in custom mode only the visible page crosses the wire, via update_table_page.
+def table_paging(frame):
+    if TABLE_MODE == "custom":
+        return dict(
+            data=[],
+            page_action="custom",
+            page_current=0,
+            page_size=TABLE_PAGE_SIZE,
+            sort_action="custom",
+            sort_mode="multi",
+            sort_by=[],
+            filter_action="custom",
+            filter_query=""
+        )
+    return dict(data=frame.to_dict('records'), page_size=len(frame))
+
+# Missing numbers are formatted as "N/A" in the browser, so tables can render straight from df_plot.
+def numeric_columns(frame):
+    return [
+        {"name": col, "id": col, "type": "numeric", "format": Format(nully="N/A")}
+        if frame[col].dtype.kind in "fiu" else {"name": col, "id": col}
+        for col in frame.columns
+    ]
 
 # -------------------------------------------------
 # Create Navigation Bar (Centered) with "Berkeley" in Yellow
@@ -304,10 +232,17 @@ navbar = dbc.NavbarSimple(
 # app = dash.Dash(__name__, external_stylesheets=external_stylesheets, suppress_callback_exceptions=True)
 app = dash.Dash(__name__,
                 external_stylesheets=external_stylesheets,
+                assets_ignore=asset_pipeline.ASSETS_IGNORE,
                 suppress_callback_exceptions=True,
                 meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}])
 
 app.title = "Haas SIF Annual Reports Dashboard"
+# Vendored copies of the external stylesheets, under this app's asset URL (asset_pipeline.py).
+app.config.external_stylesheets = asset_pipeline.stylesheets(external_stylesheets, app.get_asset_url)
+
+if live is not None:
+    app.index_string = app.index_string.replace(
+        "{%config%}", live_feed.client_script(app.get_relative_path(live_feed.STREAM_PATH)) + "\n            {%config%}", 1)
 
 # -------------------------------------------------
 # App Layout: Multi-Tab Design with Navbar & Custom Background, Wrapped in a Loading Component
@@ -319,7 +254,8 @@ app.layout = dbc.Container([
         dbc.Tab(label="Overview", tab_id="overview"),
         dbc.Tab(label="Comparisons & Insights", tab_id="comparisons"),
         dbc.Tab(label="Key Visualizations", tab_id="additional"),
-        dbc.Tab(label="Findings & Future Projections", tab_id="projections")
+        dbc.Tab(label="Findings & Future Projections", tab_id="projections"),
+        dbc.Tab(label="Search Reports", tab_id="search")
     ], id="tabs", active_tab="overview", className="mb-4"),
     dcc.Loading(
         id="loading-main",
@@ -333,21 +269,26 @@ app.layout = dbc.Container([
 # -------------------------------------------------
 @app.callback(Output("tab-content", "children"),
               Input("tabs", "active_tab"))
+@instrumented(tab=lambda active_tab: active_tab)
+@profiled
 def render_tab_content(active_tab):
-    if active_tab == "overview":
-        return overview_layout()
-    elif active_tab == "comparisons":
-        return comparisons_layout()
-    elif active_tab == "additional":
-        return additional_layout()
-    elif active_tab == "projections":
-        return projections_layout()
+    if active_tab in TAB_LAYOUTS:
+        return get_tab_layout(active_tab, current_frames)
     return html.P("This tab is not yet implemented.")
 
 # -------------------------------------------------
 # Layout for Overview Tab: Dropdown, Cards, Charts, and Yearly Summary
 # -------------------------------------------------
-def overview_layout():
+def overview_layout(frames):
+    # In patch mode the base figures ship once here and the dropdown callback only sends deltas.
+    graph_figures = {"fund-value-chart": {}, "return-chart": {}, "asset-allocation-chart": {}}
+    if HIGHLIGHT_MODE == "patch":
+        fig1, fig2, fig3 = get_overview_outputs(DEFAULT_YEAR, frames)[:3]
+        graph_figures = {
+            "fund-value-chart": {"figure": fig1},
+            "return-chart": {"figure": fig2},
+            "asset-allocation-chart": {"figure": fig3}
+        }
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -356,14 +297,16 @@ def overview_layout():
                 html.Label("Select Academic Year", className="fw-bold", style={"fontSize": "1.1rem"}),
                 dcc.Dropdown(
                     id='year-dropdown',
-                    options=[{'label': year, 'value': year} for year in df["Year"]],
-                    value="2023-2024",
+                    options=[{'label': year, 'value': year} for year in frames.df["Year"]],
+                    value=DEFAULT_YEAR,
                     clearable=False,
                     style={"color": "#000"}
                 )
             ], width=4)
         ], className="mb-4"),
         dbc.Row(id="cards-row", className="mb-4 animate__animated animate__fadeIn"),
+        dbc.Row(id="risk-cards-row", className="mb-4 animate__animated animate__fadeIn"),
+        range_section(frames),
         dbc.Row([
             dbc.Col([
                 html.H3("Yearly Report Summary", className="mt-4 animate__animated animate__fadeIn", style={"fontSize": "1.2rem"}),
@@ -378,22 +321,25 @@ def overview_layout():
             ])
         ], className="mb-4 animate__animated animate__fadeInUp"),
         dbc.Row([
-            dbc.Col(dcc.Graph(id='fund-value-chart', className="animate__slow-pulse"), width=6),
-            dbc.Col(dcc.Graph(id='return-chart', className="animate__slow-pulse"), width=6)
+            dbc.Col(dcc.Graph(id='fund-value-chart', className="animate__slow-pulse",
+                              **graph_figures["fund-value-chart"]), width=6),
+            dbc.Col(dcc.Graph(id='return-chart', className="animate__slow-pulse",
+                              **graph_figures["return-chart"]), width=6)
         ], className="animate__animated animate__fadeIn"),
+        live_section(),
         dbc.Row([
-            dbc.Col(dcc.Graph(id='asset-allocation-chart', className="animate__slow-pulse"), width=12)
+            dbc.Col(dcc.Graph(id='asset-allocation-chart', className="animate__slow-pulse",
+                              **graph_figures["asset-allocation-chart"]), width=12)
         ], className="animate__animated animate__fadeIn"),
         dbc.Row([
             dbc.Col(
                 html.Div(
                     dash_table.DataTable(
                         id='performance-table',
-                        columns=[{"name": col, "id": col} for col in df_display.columns],
-                        data=df_display.to_dict('records'),
+                        columns=numeric_columns(frames.df_plot),
                         style_table={'overflowX': 'auto'},
                         style_cell={'textAlign': 'center', "color": "black", "fontSize": "0.9rem"},
-                        page_size=len(df_display),
+                        **table_paging(frames.df_plot),
                         style_header={'backgroundColor': TABLE_HEADER_COLOR, 'color': 'white', 'fontWeight': 'bold'},
                         style_data={'backgroundColor': TABLE_DATA_BG},
                         style_data_conditional=[{
@@ -412,24 +358,24 @@ def overview_layout():
 # -------------------------------------------------
 # Layout for Comparisons & Insights Tab with Detailed Descriptions
 # -------------------------------------------------
-def comparisons_layout():
+def comparisons_layout(frames):
     fig_value = px.line(
-        df_plot,
+        frames.df_plot,
         x="Year",
         y="Fund_Value",
         markers=True,
         title="Fund Value Trend (in Millions USD)",
-        template="plotly_white",
+        template=FIGURE_TEMPLATE,
         color_discrete_sequence=px.colors.qualitative.Plotly
     )
     fig_value.update_layout(transition=dict(duration=600, easing='cubic-in-out'))
     
     fig_return = px.bar(
-        df_plot,
+        frames.df_plot,
         x="Year",
         y="Return",
         title="Annual Return (%)",
-        template="plotly_white",
+        template=FIGURE_TEMPLATE,
         color_discrete_sequence=px.colors.qualitative.Vivid
     )
     fig_return.update_layout(transition=dict(duration=600, easing='cubic-in-out'))
@@ -457,20 +403,100 @@ This bar chart presents the annual percentage returns, facilitating clear compar
         ], className="mb-4"),
         dbc.Row([
             dbc.Col([
-                dcc.Graph(figure=fig_value, className="animate__animated animate__fadeIn"),
+                dcc.Graph(figure=compact_figure(fig_value, "comparisons-value"), className="animate__animated animate__fadeIn"),
                 description_value
             ], width=6),
             dbc.Col([
-                dcc.Graph(figure=fig_return, className="animate__animated animate__fadeIn"),
+                dcc.Graph(figure=compact_figure(fig_return, "comparisons-return"), className="animate__animated animate__fadeIn"),
                 description_return
             ], width=6)
-        ])
+        ]),
+        relative_section(frames)
     ], fluid=True)
 
+# -------------------------------------------------
+# Benchmark-Relative Performance: Controls, Charts and Cards (filled by update_relative_performance)
+# -------------------------------------------------
+WINDOW_LABELS = {"1": "1 Year", "3": "3 Years", "5": "5 Years", "all": "Since Inception"}
+
+def relative_section(frames):
+    if not frames.benchmarks:
+        return dbc.Row(dbc.Col(html.P("Add index series to data/benchmarks/ (Year,Return or date,close) "
+                                      "to compare the fund against a benchmark.", className="text-muted")),
+                       className="mt-4")
+    names = sorted(frames.benchmarks)
+    return html.Div([
+        dbc.Row([
+            dbc.Col(html.H3("Benchmark-Relative Performance", style={"fontSize": "1.5rem", "fontWeight": "bold"}),
+                    width=12)
+        ], className="mt-4 mb-2"),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Benchmark", className="fw-bold"),
+                dcc.Dropdown(id="benchmark-select", options=[{"label": name.upper(), "value": name} for name in names],
+                             value=names[0], clearable=False, style={"color": "#000"})
+            ], width=4),
+            dbc.Col([
+                html.Label("Window", className="fw-bold"),
+                dcc.Dropdown(id="benchmark-window",
+                             options=[{"label": label, "value": key} for key, label in WINDOW_LABELS.items()],
+                             value=relative_performance.DEFAULT_WINDOW, clearable=False, style={"color": "#000"})
+            ], width=4)
+        ], className="mb-3"),
+        dbc.Row(id="relative-cards-row", className="mb-4"),
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="relative-value-chart"), width=6),
+            dbc.Col(dcc.Graph(id="relative-return-chart"), width=6)
+        ])
+    ], className="animate__animated animate__fadeIn")
+
+def build_relative_outputs(benchmark, window, frames):
+    table = relative_performance.relative_table(frames.df_plot, frames.daily, frames.benchmarks[benchmark],
+                                                relative_performance.WINDOWS[window])
+    label = benchmark.upper()
+    growth = (1.0 + table[["fund_return", "benchmark_return"]].fillna(0.0)).cumprod()
+
+    fig_value = go.Figure([
+        go.Scatter(x=table.index, y=growth["fund_return"], mode="lines+markers", name="Fund",
+                   line=dict(color=PRIMARY_COLOR, width=3)),
+        go.Scatter(x=table.index, y=growth["benchmark_return"], mode="lines+markers", name=label,
+                   line=dict(color=ACCENT_COLOR, width=3))
+    ])
+    fig_value.update_layout(template=FIGURE_TEMPLATE, title=f"Growth of $1: Fund vs {label}",
+                            xaxis_title="Academic Year", yaxis_title="Growth of $1",
+                            transition=dict(duration=600, easing='cubic-in-out'))
+
+    fig_return = go.Figure([
+        go.Bar(x=table.index, y=table["fund_return"] * 100, name="Fund", marker_color=PRIMARY_COLOR),
+        go.Bar(x=table.index, y=table["benchmark_return"] * 100, name=label, marker_color=ACCENT_COLOR),
+        go.Scatter(x=table.index, y=table["excess_return"] * 100, mode="lines+markers", name="Excess",
+                   line=dict(color=WARNING_COLOR, width=2))
+    ])
+    fig_return.update_layout(template=FIGURE_TEMPLATE, barmode="group", title=f"Annual Return vs {label} (%)",
+                             xaxis_title="Academic Year", yaxis_title="Return (%)",
+                             transition=dict(duration=600, easing='cubic-in-out'))
+
+    stats = table.dropna(subset=["tracking_error"])
+    if stats.empty:
+        cards = html.P(f"Not enough overlapping history for a {WINDOW_LABELS[window].lower()} window.",
+                       className="text-muted")
+    else:
+        year, row = stats.index[-1], stats.iloc[-1].map(lambda v: None if pd.isna(v) else float(v))
+        detail = f"{WINDOW_LABELS[window]} to {year}"
+        cards = dbc.CardGroup([
+            risk_card("Excess Return (ann.)", format_percent(row["annualized_excess"]), detail, PRIMARY_COLOR),
+            risk_card("Tracking Error", format_percent(row["tracking_error"]), detail, INFO_COLOR),
+            risk_card("Beta", format_ratio(row["beta"]), f"vs {label}", INFO_COLOR),
+            risk_card("Information Ratio", format_ratio(row["information_ratio"]), detail, ACCENT_COLOR),
+            risk_card("Up Capture", format_percent(row["up_capture"]), f"{label} up periods", DARK_COLOR),
+            risk_card("Down Capture", format_percent(row["down_capture"]), f"{label} down periods", DARK_COLOR)
+        ])
+    return compact_figure(fig_value, "relative-value"), compact_figure(fig_return, "relative-return"), cards
+
 # -------------------------------------------------
 # Layout for Findings & Future Projections Tab
 # -------------------------------------------------
-def projections_layout():
+def projections_layout(frames):
     insights_md = """
 ### Key Findings & Future Projections
 
@@ -515,6 +541,9 @@ Building on historical successes and emerging market trends, our strategy for th
                 "fontSize": "1rem"
             }), className="animate__animated animate__fadeInUp"), width=12)
         ], className="mb-4"),
+        dbc.Row([
+            dbc.Col(projection_section(frames), width=12)
+        ], className="mb-4"),
         dbc.Row([
             dbc.Col(html.H2("Investment Plan for 2025-2026", className="text-center animate__animated animate__fadeInDown", 
                                style={"fontWeight": "bold"}), width=12)
@@ -531,20 +560,232 @@ Building on historical successes and emerging market trends, our strategy for th
         ], className="mb-4")
     ], fluid=True)
 
+# -------------------------------------------------
+# Monte Carlo Projection: Controls, Fan Chart and Summary (filled by update_projection)
+# -------------------------------------------------
+ALLOCATION_PRESETS = {
+    "current": None,
+    "conservative": (40, 40, 10, 10),
+    "balanced": (60, 30, 5, 5),
+    "growth": (80, 10, 5, 5)
+}
+
+def projection_section(frames):
+    latest = frames.df_sorted.iloc[0]
+    return dbc.Card(
+        [
+            dbc.CardHeader(
+                html.H4(
+                    "Monte Carlo Fund Value Projection",
+                    className="text-center",
+                    style={"color": PRIMARY_COLOR, "fontWeight": "bold", "fontSize": "1.5rem"}
+                )
+            ),
+            dbc.CardBody(
+                [
+                    dbc.Row([
+                        dbc.Col([
+                            html.Label("Projection Horizon (years)", className="fw-bold"),
+                            dcc.Slider(id="projection-horizon", min=1, max=30, step=1, value=10,
+                                       marks={y: str(y) for y in (1, 5, 10, 15, 20, 25, 30)})
+                        ], width=8),
+                        dbc.Col([
+                            html.Label("Asset Allocation", className="fw-bold"),
+                            dcc.Dropdown(
+                                id="projection-allocation",
+                                options=[
+                                    {"label": f"Current Mix ({latest['Year']})", "value": "current"},
+                                    {"label": "Conservative (40/40/10/10)", "value": "conservative"},
+                                    {"label": "Balanced (60/30/5/5)", "value": "balanced"},
+                                    {"label": "Growth (80/10/5/5)", "value": "growth"}
+                                ],
+                                value="current",
+                                clearable=False,
+                                style={"color": "#000"}
+                            )
+                        ], width=4)
+                    ], className="mb-3"),
+                    # Shown only while a background projection job is queued or running.
+                    dbc.Row([
+                        dbc.Col(html.Div(id="projection-status", className="text-muted"), width=10),
+                        dbc.Col(dbc.Button("Cancel", id="projection-cancel", color="secondary", size="sm",
+                                           disabled=True), width=2, className="text-end")
+                    ], id="projection-status-row", className="mb-2", style={"display": "none"}),
+                    dcc.Graph(id="projection-fan-chart"),
+                    dcc.Markdown(id="projection-summary", style={"fontSize": "1rem", "padding": "10px"})
+                ],
+                style={"backgroundColor": "#f7f7f7", "padding": "20px"}
+            )
+        ],
+        className="shadow-lg animate__animated animate__fadeInUp",
+        outline=True
+    )
+
+def projection_args(horizon, preset, frames):
+    latest = frames.df_sorted.iloc[0]
+    allocation = ALLOCATION_PRESETS.get(preset) or projections.allocation_from_row(latest)
+    return {"history": projections.history_from_frame(frames.df), "allocation": allocation, "horizon": horizon,
+            "start": [latest["Year"], float(latest["Fund_Value"])]}
+
+def build_projection_outputs(horizon, preset, frames):
+    args = projection_args(horizon, preset, frames)
+    start = args.pop("start")
+    return render_projection(dict(projections.run_projection(**args), start=start))
+
+# Also the finish step of the background job, whose result comes back as JSON (string band keys).
+# The result carries the year and value it started from, so a reload mid-job cannot mismatch them.
+def render_projection(result):
+    horizon, allocation = result["horizon"], result["allocation"]
+    start_year, start_value = result["start"]
+    x = [start_year] + projections.future_year_labels(start_year, horizon)
+    bands = {int(p): [start_value] + [start_value * g for g in band] for p, band in result["bands"].items()}
+
+    fig = go.Figure([
+        go.Scatter(x=x, y=bands[95], mode="lines", line=dict(width=0), hoverinfo="skip", showlegend=False),
+        go.Scatter(x=x, y=bands[5], mode="lines", line=dict(width=0), fill="tonexty",
+                   fillcolor="rgba(0,50,98,0.15)", name="5th-95th percentile"),
+        go.Scatter(x=x, y=bands[75], mode="lines", line=dict(width=0), hoverinfo="skip", showlegend=False),
+        go.Scatter(x=x, y=bands[25], mode="lines", line=dict(width=0), fill="tonexty",
+                   fillcolor="rgba(0,50,98,0.35)", name="25th-75th percentile"),
+        go.Scatter(x=x, y=bands[50], mode="lines+markers", line=dict(color=PRIMARY_COLOR, width=3),
+                   name="Median")
+    ])
+    fig.update_layout(
+        template=FIGURE_TEMPLATE,
+        title="Projected Fund Value (in Millions USD)",
+        xaxis_title="Academic Year",
+        yaxis_title="Fund Value (M USD)",
+        transition=dict(duration=600, easing='cubic-in-out')
+    )
+
+    summary = (
+        f"**{result['n_paths']:,} simulated paths** over {horizon} years with an allocation of "
+        f"{allocation[0]:.0f}% equities, {allocation[1]:.0f}% fixed income, {allocation[2]:.0f}% cash and "
+        f"{allocation[3]:.0f}% real assets. Median projected value: **{bands[50][-1]:.2f}M USD** "
+        f"({result['median_annualized'] * 100:.2f}% annualized); 90% of paths end between "
+        f"{bands[5][-1]:.2f}M and {bands[95][-1]:.2f}M. Probability of ending below today's value: "
+        f"**{result['prob_loss'] * 100:.1f}%**."
+    )
+    return compact_figure(fig, "projection-fan"), summary
+
+# -------------------------------------------------
+# ESG What-If: Rescale Latest Positions and Recompute the Holdings-Weighted Score
+# -------------------------------------------------
+WHAT_IF_POSITIONS = 25   # Largest latest positions offered for reweighting
+
+def esg_what_if_section(frames):
+    if frames.esg is None:
+        return html.Div()
+    positions = frames.esg.positions().head(WHAT_IF_POSITIONS)
+    return dbc.Row([
+        dbc.Col([
+            html.Label("What-If: Reweight Positions", className="fw-bold"),
+            dcc.Dropdown(
+                id="esg-what-if-tickers",
+                options=[{"label": f"{row.ticker} ({row.weight * 100:.1f}%)", "value": row.ticker}
+                         for row in positions.itertuples()],
+                multi=True,
+                placeholder="Select holdings",
+                style={"color": "#000"}
+            )
+        ], width=5),
+        dbc.Col([
+            html.Label("Weight Multiplier", className="fw-bold"),
+            dcc.Slider(id="esg-what-if-factor", min=0, max=3, step=0.25, value=0,
+                       marks={0: "Sell", 1: "1x", 2: "2x", 3: "3x"})
+        ], width=4),
+        dbc.Col(html.Div(id="esg-what-if-result"), width=3)
+    ], className="my-3")
+
+def format_score(value):
+    return "N/A" if value is None else f"{value:.1f}"
+
+def build_esg_what_if(tickers, factor, frames):
+    result = frames.esg.what_if({ticker: factor for ticker in tickers or []})
+    # Selling every (scored) position leaves no score to compare: None, shown as N/A.
+    esg, base = result["esg"], result["base_esg"]
+    delta = "N/A" if esg is None or base is None else f"{esg - base:+.2f}"
+    coverage = "N/A" if result["coverage"] is None else f"{result['coverage'] * 100:.0f}%"
+    return [
+        html.H4(format_score(esg), style={"color": PRIMARY_COLOR, "fontWeight": "bold", "marginBottom": 0}),
+        html.Small(f"{delta} vs {format_score(base)} on {result['date']}; "
+                   + ", ".join(f"{p} {format_score(v)}" for p, v in result["pillars"].items())
+                   + f"; {coverage} scored", className="text-muted")
+    ]
+
+# -------------------------------------------------
+# Security Drill-Down: Every Year a Security Appeared Among the Performers, from the Ticker Index
+# -------------------------------------------------
+ROLE_COLORS = {"Top": INFO_COLOR, "Under": WARNING_COLOR}
+
+def security_section(frames):
+    return html.Div([
+        dbc.Row([
+            dbc.Col(html.H3("Security Drill-Down", className="animate__animated animate__fadeInDown",
+                            style={"fontWeight": "bold"}), width=12)
+        ]),
+        dbc.Row([
+            dbc.Col(
+                dcc.Dropdown(
+                    id="security-select",
+                    options=[{"label": f"{label} ({count}x)" if count > 1 else label, "value": key}
+                             for key, label, count in frames.securities.securities()],
+                    placeholder="Select a security (e.g. MSFT)",
+                    style={"color": "#000"}
+                ),
+                width=6
+            )
+        ], className="mb-2"),
+        dbc.Row([
+            dbc.Col(dcc.Graph(id="security-returns-chart"), width=8),
+            dbc.Col(html.Div(id="security-history"), width=4)
+        ], className="mb-4")
+    ])
+
+def format_return(value):
+    # Performers listed without a return ("Apple Inc. (AAPL)") parse to NaN.
+    return "N/A" if pd.isna(value) else f"{value:+.2f}%"
+
+def build_security_outputs(key, frames):
+    rows = frames.securities.lookup(key)
+    fig = go.Figure([
+        go.Bar(x=part["Year"], y=part["Return"], name=f"{role} Performer" if role == "Top" else "Underperformer",
+               marker_color=ROLE_COLORS[role], text=[format_return(r) for r in part["Return"]], textposition="outside")
+        for role, part in rows.groupby("Role", sort=False)
+    ])
+    fig.update_layout(
+        template=FIGURE_TEMPLATE,
+        margin=dict(l=20, r=20, t=40, b=20),
+        title=rows["Name"].iloc[-1] if len(rows) else "",
+        xaxis=dict(title="Academic Year", type="category", categoryorder="category ascending"),
+        yaxis_title="Return (%)"
+    )
+    history = [
+        html.P(f"{row.Year}: {row.Name} {format_return(row.Return)} ({'top' if row.Role == 'Top' else 'under'}performer)",
+               style={"marginBottom": "0.25rem"})
+        for row in rows.itertuples()
+    ]
+    return compact_figure(fig, "security-returns"), history or html.P("Not listed among the top or underperformers.", className="text-muted")
+
 # -------------------------------------------------
 # Layout for Key Visualizations Tab (formerly Additional Visualizations)
 # -------------------------------------------------
-def additional_layout():
+def additional_layout(frames):
     # ESG Score Trends Section: Create the ESG graph
     fig_esg = px.line(
-        df_plot,
+        frames.df_plot,
         x="Year",
         y="ESG_Score",
         markers=True,
         title="",
-        template="plotly_white",
+        template=FIGURE_TEMPLATE,
         color_discrete_sequence=px.colors.qualitative.Plotly
     )
+    if frames.esg_yearly is not None:
+        for pillar, name in (("E_Score", "Environmental"), ("S_Score", "Social"), ("G_Score", "Governance")):
+            fig_esg.add_scatter(x=frames.esg_yearly["Year"], y=frames.esg_yearly[pillar], mode="lines",
+                                line=dict(dash="dot"), name=name)
+        fig_esg.data[0].update(name="ESG Score", showlegend=True)
     fig_esg.update_layout(
         margin=dict(l=20, r=20, t=20, b=20),
         transition=dict(duration=600, easing='cubic-in-out'),
@@ -563,7 +804,8 @@ def additional_layout():
             ),
             dbc.CardBody(
                 [
-                    dcc.Graph(figure=fig_esg, className="animate__animated animate__slideInRight"),
+                    dcc.Graph(figure=compact_figure(fig_esg, "esg-trend"), className="animate__animated animate__slideInRight"),
+                    esg_what_if_section(frames),
                     html.P(
                         ("This graph illustrates the evolution of the fund’s ESG score over the academic years. The score, "
                          "derived from environmental, social, and governance metrics, shows a steady upward trend that reflects "
@@ -581,14 +823,17 @@ def additional_layout():
     
     # Correlation Heatmap Section: Create the heatmap
     numeric_cols = ["Fund_Value", "Return", "Equities", "Fixed_Income", "Cash", "Real_Assets", "ESG_Score"]
-    df_corr = df[numeric_cols].corr()
+    df_numeric = frames.df[["Year"] + numeric_cols]
+    if frames.esg_yearly is not None:
+        df_numeric = df_numeric.merge(frames.esg_yearly[["Year", "E_Score", "S_Score", "G_Score"]], on="Year", how="left")
+    df_corr = df_numeric.drop(columns="Year").corr()
     heatmap_fig = px.imshow(
         df_corr,
         text_auto=True,
         aspect="auto",
         title="",
         color_continuous_scale="RdBu_r",
-        template="plotly_white"
+        template=FIGURE_TEMPLATE
     )
     heatmap_fig.update_layout(
         margin=dict(l=20, r=20, t=20, b=20),
@@ -608,7 +853,7 @@ def additional_layout():
             ),
             dbc.CardBody(
                 [
-                    dcc.Graph(figure=heatmap_fig, className="animate__animated animate__slideInLeft"),
+                    dcc.Graph(figure=compact_figure(heatmap_fig, "correlation-heatmap"), className="animate__animated animate__slideInLeft"),
                     html.P(
                         ("This heatmap visualizes the correlation between key financial metrics and the ESG score. Each cell indicates "
                          "the strength and direction of the correlation between two variables, with color intensity representing the magnitude. "
@@ -628,11 +873,10 @@ def additional_layout():
     shifts_table = html.Div(
         dash_table.DataTable(
             id='shifts-table',
-            columns=[{"name": col, "id": col} for col in df_shifts.columns],
-            data=df_shifts.to_dict('records'),
+            columns=[{"name": col, "id": col} for col in frames.df_shifts.columns],
             style_table={'overflowX': 'auto'},
             style_cell={'textAlign': 'center', "color": "black", "fontSize": "0.9rem"},
-            page_size=len(df_shifts),
+            **table_paging(frames.df_shifts),
             style_header={'backgroundColor': TABLE_HEADER_COLOR, 'color': 'white', 'fontWeight': 'bold'},
             style_data={'backgroundColor': TABLE_DATA_BG},
             style_data_conditional=[{
@@ -649,11 +893,10 @@ def additional_layout():
     top_under_table = html.Div(
         dash_table.DataTable(
             id='top-under-table',
-            columns=[{"name": col, "id": col} for col in df_top_under.columns],
-            data=df_top_under.to_dict('records'),
+            columns=[{"name": col, "id": col} for col in frames.df_top_under.columns],
             style_table={'overflowX': 'auto'},
             style_cell={'textAlign': 'center', "color": "black", "fontSize": "0.9rem"},
-            page_size=len(df_top_under),
+            **table_paging(frames.df_top_under),
             style_header={'backgroundColor': TABLE_HEADER_COLOR, 'color': 'white', 'fontWeight': 'bold'},
             style_data={'backgroundColor': TABLE_DATA_BG},
             style_data_conditional=[{
@@ -690,36 +933,260 @@ def additional_layout():
         ]),
         dbc.Row([
             dbc.Col(top_under_table, width=12)
+        ], className="mb-4"),
+        security_section(frames)
+    ], fluid=True)
+
+# -------------------------------------------------
+# Layout for Search Reports Tab: Keyword + Semantic Search over Summaries, Shifts and Insights
+# -------------------------------------------------
+def search_layout(frames):
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col(html.H2("Search Reports", className="text-center animate__animated animate__fadeInDown",
+                            style={"fontWeight": "bold"}), width=12)
+        ]),
+        dbc.Row([
+            dbc.Col(
+                dbc.Input(id="search-query", type="search", debounce=True,
+                          placeholder="e.g. financial crisis cash, ESG integration, divestitures"),
+                width=12
+            )
+        ], className="mb-4"),
+        dbc.Row([
+            dbc.Col(html.Div(id="search-results"), width=12)
         ])
     ], fluid=True)
 
+def build_search_results(query, frames):
+    if not query or not query.strip():
+        return html.P(f"Search {len(get_search_index(frames))} passages from every yearly report, "
+                      "investment shift and insight.", className="text-muted")
+    results = get_search_index(frames).search(query, limit=10)
+    if not results:
+        return html.P("No matching passages.", className="text-muted")
+    return [
+        dbc.Card(
+            dbc.CardBody([
+                html.H5([dbc.Badge(r["year"], color="primary", className="me-2"), r["source"]],
+                        style={"color": PRIMARY_COLOR, "fontWeight": "bold"}),
+                dcc.Markdown(r["text"], style={"fontSize": "1rem", "marginBottom": 0})
+            ]),
+            className="mb-3 shadow-sm animate__animated animate__fadeIn"
+        )
+        for r in results
+    ]
+
 # -------------------------------------------------
-# Callback: Update Overview Charts, Cards, and Yearly Summary Based on Selected Year
+# Live NAV: Empty Time-Axis Chart, Filled and Extended in the Browser from the SSE Stream
 # -------------------------------------------------
-@app.callback(
-    [
-        Output('fund-value-chart', 'figure'),
-        Output('return-chart', 'figure'),
-        Output('asset-allocation-chart', 'figure'),
-        Output('cards-row', 'children'),
-        Output('year-summary', 'children')
-    ],
-    Input('year-dropdown', 'value')
-)
-def update_overview_charts(selected_year):
-    filtered = df_plot[df_plot["Year"] == selected_year]
+# Fund-value-chart is one point per academic year, so intraday NAV gets its own date axis.
+def live_section():
+    if live is None:
+        return html.Div()
+    fig = go.Figure(go.Scatter(x=[], y=[], mode="lines", name="NAV", line=dict(color=INFO_COLOR)))
+    fig.update_layout(title="Live NAV (in Millions USD)", template=FIGURE_TEMPLATE, xaxis=dict(type="date"),
+                      uirevision="live")
+    return dbc.Row([
+        dbc.Col([
+            dcc.Graph(id="live-nav-chart", figure=compact_figure(fig, "live-nav")),
+            dcc.Store(id="live-nav-store")
+        ], width=12)
+    ], className="mb-4 animate__animated animate__fadeIn")
+
+# -------------------------------------------------
+# Year-Range Analysis: RangeSlider over the Years, O(1) Stats from frames.ranges
+# -------------------------------------------------
+def range_section(frames):
+    years = frames.ranges.years
+    return dbc.Row([
+        dbc.Col([
+            html.Label("Select Year Range", className="fw-bold", style={"fontSize": "1.1rem"}),
+            dcc.RangeSlider(
+                id="year-range-slider",
+                min=0,
+                max=len(years) - 1,
+                step=1,
+                value=[0, len(years) - 1],
+                marks={i: year[:4] for i, year in enumerate(years) if i % 2 == 0 or i == len(years) - 1}
+            ),
+            html.Div(id="range-stats-row", className="mt-3"),
+            attribution_section(frames)
+        ], width=12)
+    ], className="mb-4 animate__animated animate__fadeIn")
+
+# -------------------------------------------------
+# Return Attribution: Waterfall from Policy Benchmark to Fund over the Selected Year Range
+# -------------------------------------------------
+def attribution_section(frames):
+    if frames.policy is None:
+        return html.P("Add data/policy_benchmark.csv (Asset_Class, Weight, Benchmark, Return) for return attribution.",
+                      className="text-muted mt-3")
+    return html.Div([
+        dbc.Row([
+            dbc.Col([
+                html.Label("Multi-Year Linking", className="fw-bold"),
+                dcc.Dropdown(id="attribution-linking",
+                             options=[{"label": "Carino", "value": "carino"}, {"label": "Menchero", "value": "menchero"}],
+                             value="carino", clearable=False, style={"color": "#000"})
+            ], width=3)
+        ], className="mt-3"),
+        dcc.Graph(id="attribution-waterfall")
+    ])
+
+def build_attribution_waterfall(value, method, frames):
+    years = frames.ranges.years
+    lo, hi = sorted((value or [0, len(years) - 1])[:2])
+    result = get_attribution(frames).linked(years[lo], years[hi], method)
+    fig = go.Figure()
+    if result is None:
+        fig.update_layout(template=FIGURE_TEMPLATE, title=f"No attribution inputs for {years[lo]} to {years[hi]}")
+        return compact_figure(fig, "attribution-waterfall")
+    effects = result["effects"] * 100
+    labels = (["Policy Benchmark"] + [f"Allocation: {c.replace('_', ' ')}" for c in effects.index]
+              + ["Selection", "Interaction", "Fund"])
+    values = ([result["benchmark_return"] * 100] + effects["allocation"].tolist()
+              + [effects["selection"].sum(), effects["interaction"].sum(), result["fund_return"] * 100])
+    fig.add_trace(go.Waterfall(
+        x=labels,
+        y=values,
+        measure=["absolute"] + ["relative"] * (len(values) - 2) + ["total"],
+        text=[f"{v:+.2f}%" if 0 < i < len(values) - 1 else f"{v:.2f}%" for i, v in enumerate(values)],
+        textposition="outside",
+        connector=dict(line=dict(color=SECONDARY_COLOR)),
+        increasing=dict(marker=dict(color=INFO_COLOR)),
+        decreasing=dict(marker=dict(color=WARNING_COLOR)),
+        totals=dict(marker=dict(color=PRIMARY_COLOR))
+    ))
+    span = result["start"] if result["years"] == 1 else f"{result['start']} to {result['end']}"
+    linking = "" if result["years"] == 1 else f", {method.title()}-linked"
+    fig.update_layout(
+        template=FIGURE_TEMPLATE,
+        title=f"Return Attribution vs Policy Benchmark, {span}{linking} (%)",
+        yaxis_title="Cumulative Return (%)",
+        showlegend=False
+    )
+    if result["estimated"]:
+        fig.add_annotation(text="Per-class portfolio returns estimated from the total (no segment_returns table)",
+                           xref="paper", yref="paper", x=0, y=-0.25, showarrow=False, font=dict(size=11))
+    return compact_figure(fig, "attribution-waterfall")
+
+def format_percent(value):
+    # Degenerate ranges and ratios (no data, zero denominators) come through as None, NaN or inf.
+    return "N/A" if value is None or not math.isfinite(value) else f"{value * 100:.2f}%"
+
+def build_range_stats(value, frames):
+    years = frames.ranges.years
+    lo, hi = (value or [0, len(years) - 1])[:2]
+    stats = frames.ranges.query(years[lo], years[hi])
+    allocation = ", ".join(f"{name.replace('_', ' ')} {'N/A' if pct is None else f'{pct:.0f}%'}"
+                           for name, pct in stats["allocation"].items())
+    return [
+        html.H3(f"{stats['start']} to {stats['end']} ({stats['years']} years)", style={"fontSize": "1.2rem"}),
+        dbc.CardGroup([
+            dbc.Card(
+                [dbc.CardHeader("Cumulative Return"),
+                 dbc.CardBody(html.H4(format_percent(stats["cumulative_return"]), className="card-title"))],
+                color=PRIMARY_COLOR,
+                inverse=True
+            ),
+            dbc.Card(
+                [dbc.CardHeader("Annualized Return"),
+                 dbc.CardBody(html.H4(format_percent(stats["annualized_return"]), className="card-title"))],
+                color=ACCENT_COLOR,
+                inverse=True
+            ),
+            dbc.Card(
+                [dbc.CardHeader("Fund Value Growth"),
+                 dbc.CardBody([
+                     html.H4(format_percent(stats["value_growth"]), className="card-title"),
+                     html.Small(f"{stats['opening_value']:.2f}M to {stats['closing_value']:.2f}M USD")
+                 ])],
+                color=INFO_COLOR,
+                inverse=True
+            ),
+            dbc.Card(
+                [dbc.CardHeader("Average Allocation"),
+                 dbc.CardBody(html.P(allocation, className="card-text"))],
+                color=DARK_COLOR,
+                inverse=True
+            )
+        ])
+    ]
+
+# -------------------------------------------------
+# Risk Cards: Metrics over the Return History up to the Selected Year (from get_risk_table)
+# -------------------------------------------------
+def format_ratio(value):
+    return "N/A" if value is None or not math.isfinite(value) else f"{value:.2f}"
+
+def risk_card(header, value, detail, color):
+    return dbc.Card(
+        [dbc.CardHeader(header),
+         dbc.CardBody([html.H4(value, className="card-title"), html.Small(detail)])],
+        color=color,
+        inverse=True
+    )
+
+def build_risk_cards(selected_year, frames):
+    table = get_risk_table(frames)
+    if selected_year not in table.index or pd.isna(table.loc[selected_year, "observations"]):
+        return html.P(f"No return history up to {selected_year} for risk metrics.", className="text-muted")
+    row = table.loc[selected_year].map(lambda v: None if pd.isna(v) else float(v))
+    period = "daily" if frames.daily is not None else "annual"
+    confidence = f"{risk.CONFIDENCE * 100:.0f}%"
+    return dbc.CardGroup([
+        risk_card("Volatility (ann.)", format_percent(row["volatility"]),
+                  f"Rolling {risk.ROLLING_YEARS}Y: {format_percent(row['rolling_volatility'])}", PRIMARY_COLOR),
+        risk_card("Max Drawdown", format_percent(row["max_drawdown"]),
+                  f"Current: {format_percent(row['current_drawdown'])}", WARNING_COLOR),
+        risk_card("Sharpe Ratio", format_ratio(row["sharpe"]),
+                  f"Risk-free {risk.RISK_FREE_RATE * 100:.1f}%", INFO_COLOR),
+        risk_card("Sortino Ratio", format_ratio(row["sortino"]), "Downside deviation", INFO_COLOR),
+        risk_card(f"VaR {confidence} ({period})", format_percent(row["var"]),
+                  f"Bootstrap: {format_percent(row['bootstrap_var'])}", DARK_COLOR),
+        risk_card(f"CVaR {confidence} ({period})", format_percent(row["cvar"]),
+                  f"Bootstrap: {format_percent(row['bootstrap_cvar'])}", DARK_COLOR)
+    ], className="mb-4")
+
+# -------------------------------------------------
+# Overview Cache: Figures, Cards, and Summary per (selected_year, dataset version)
+# -------------------------------------------------
+overview_cache = {}
+
+def highlight_rows(selected_year, frames):
+    filtered = frames.df_plot[frames.df_plot["Year"] == selected_year]
     if filtered.empty:
-        filtered = df_plot.iloc[[0]]
-    sd = filtered.iloc[0]
+        filtered = frames.df_plot.iloc[[0]]
+    return filtered
+
+def highlight_colors(selected_year, frames):
+    colors = ["#FFA600"] * len(frames.df_plot)
+    sel_idx = frames.df_plot.reset_index(drop=True).index[frames.df_plot["Year"].values == selected_year]
+    if len(sel_idx) > 0:
+        colors[sel_idx[0]] = "red"
+    return colors
+
+def allocation_values(selected_year, frames):
+    sd_numeric = frames.df[frames.df["Year"] == selected_year].iloc[0]
+    return {
+        "Equities": sd_numeric["Equities"],
+        "Fixed Income": sd_numeric["Fixed_Income"],
+        "Cash": sd_numeric["Cash"],
+        "Real Assets": sd_numeric["Real_Assets"]
+    }
+
+def build_overview_outputs(selected_year, frames):
+    filtered = highlight_rows(selected_year, frames)
     
     # Chart 1: Fund Value Trend with highlight.
     fig1 = px.line(
-        df_plot,
+        frames.df_plot,
         x="Year",
         y="Fund_Value",
         markers=True,
         title="Fund Value Trend (in Millions USD)",
-        template="plotly_white",
+        template=FIGURE_TEMPLATE,
         color_discrete_sequence=px.colors.qualitative.Plotly
     )
     fig1.add_scatter(
@@ -732,42 +1199,35 @@ def update_overview_charts(selected_year):
     fig1.update_layout(transition=dict(duration=600, easing='cubic-in-out'))
     
     # Chart 2: Annual Return Bar Chart with selected year highlighted in red.
-    df_bar = df_plot.reset_index(drop=True).copy()
-    colors = ["#FFA600"] * len(df_bar)
-    sel_idx = df_bar.index[df_bar["Year"] == selected_year]
-    if len(sel_idx) > 0:
-        colors[sel_idx[0]] = "red"
+    df_bar = frames.df_plot.reset_index(drop=True).copy()
+    colors = highlight_colors(selected_year, frames)
     
     fig2 = px.bar(
         df_bar,
         x="Year",
         y="Return",
         title="Annual Return (%)",
-        template="plotly_white",
+        template=FIGURE_TEMPLATE,
         color_discrete_sequence=["#FFA600"]
     )
     fig2.update_traces(marker_color=colors)
     fig2.update_layout(transition=dict(duration=600, easing='cubic-in-out'))
     
     # Chart 3: Asset Allocation Pie Chart.
-    sd_numeric = df[df["Year"] == selected_year].iloc[0]
-    asset_values = {
-        "Equities": sd_numeric["Equities"],
-        "Fixed Income": sd_numeric["Fixed_Income"],
-        "Cash": sd_numeric["Cash"],
-        "Real Assets": sd_numeric["Real_Assets"]
-    }
+    asset_values = allocation_values(selected_year, frames)
     fig3 = px.pie(
         names=list(asset_values.keys()),
         values=list(asset_values.values()),
         title=f"Asset Allocation for {selected_year}",
-        template="plotly_white",
+        template=FIGURE_TEMPLATE,
         color_discrete_sequence=px.colors.qualitative.Safe
     )
     fig3.update_layout(transition=dict(duration=600, easing='cubic-in-out'))
     
+    risk_cards = build_risk_cards(selected_year, frames)
+
     # Cards: Key metrics for the selected year.
-    sd_cards = df[df["Year"] == selected_year].iloc[0]
+    sd_cards = frames.df[frames.df["Year"] == selected_year].iloc[0]
     cards = dbc.CardGroup([
         dbc.Card(
             [dbc.CardHeader("Fund Value (M USD)"),
@@ -807,9 +1267,433 @@ def update_overview_charts(selected_year):
         )
     ], className="mb-4")
     
-    summary_text = yearly_summaries.get(selected_year, "No summary available for this year.")
+    summary_text = frames.yearly_summaries.get(selected_year, "No summary available for this year.")
     
-    return fig1, fig2, fig3, cards, summary_text
+    return (compact_figure(fig1, "overview-value"), compact_figure(fig2, "overview-return"),
+            compact_figure(fig3, "overview-allocation"), cards, risk_cards, summary_text)
+
+def get_overview_outputs(selected_year, frames=None):
+    frames = frames or current_frames
+    key = (selected_year, frames.version)
+    outputs = overview_cache.get(key)
+    record_cache("overview", outputs is not None)
+    if outputs is None:
+        outputs = build_overview_outputs(selected_year, frames)
+        overview_cache[key] = outputs
+    return outputs
+
+def warm_overview_cache(frames):
+    for year in frames.df["Year"]:
+        get_overview_outputs(year, frames)
+        if HIGHLIGHT_MODE == "patch":
+            get_overview_patch_outputs(year, frames)
+
+# Deltas against the base figures shipped in overview_layout(): the "Selected Year" marker,
+# the bar colors, and the pie values/title. Cards and summary still come from the cache.
+def build_overview_patches(selected_year, frames):
+    filtered = highlight_rows(selected_year, frames)
+    fig1 = Patch()
+    fig1["data"][1]["x"] = filtered["Year"].tolist()
+    fig1["data"][1]["y"] = filtered["Fund_Value"].tolist()
+
+    fig2 = Patch()
+    fig2["data"][0]["marker"]["color"] = highlight_colors(selected_year, frames)
+
+    asset_values = allocation_values(selected_year, frames)
+    fig3 = Patch()
+    fig3["data"][0]["values"] = [float(v) for v in asset_values.values()]
+    fig3["layout"]["title"]["text"] = f"Asset Allocation for {selected_year}"
+    return fig1, fig2, fig3
+
+# Patch-mode callback outputs, cached like the full ones: the patches are stored in their serialized
+# form (what Dash sends for a Patch), so a dropdown change is a single lookup.
+def get_overview_patch_outputs(selected_year, frames):
+    key = ("patch", selected_year, frames.version)
+    outputs = overview_cache.get(key)
+    record_cache("overview", outputs is not None)
+    if outputs is None:
+        patches = tuple(patch.to_plotly_json() for patch in build_overview_patches(selected_year, frames))
+        outputs = patches + tuple(get_overview_outputs(selected_year, frames)[3:])
+        overview_cache[key] = outputs
+    return outputs
+
+# -------------------------------------------------
+# Tab Layout Cache: Serialized Layout JSON per (tab_id, dataset version)
+# -------------------------------------------------
+TAB_LAYOUTS = {
+    "overview": overview_layout,
+    "comparisons": comparisons_layout,
+    "additional": additional_layout,
+    "projections": projections_layout,
+    "search": search_layout
+}
+tab_layout_cache = {}
+
+def get_tab_layout(active_tab, frames=None):
+    frames = frames or current_frames
+    key = (active_tab, frames.version)
+    serialized = tab_layout_cache.get(key)
+    record_cache("tab-layout", serialized is not None)
+    if serialized is None:
+        serialized = to_json_plotly(TAB_LAYOUTS[active_tab](frames))
+        tab_layout_cache[key] = serialized
+    # Parse a fresh copy per request so no response ever shares mutable layout objects.
+    return loads(serialized)
+
+def warm_tab_cache(frames):
+    for tab_id in TAB_LAYOUTS:
+        get_tab_layout(tab_id, frames)
+
+# -------------------------------------------------
+# Table Index Cache: Sort Orders and Codes per (table_id, dataset version)
+# -------------------------------------------------
+# table_id -> frames -> (frame to sort/filter on, frame to render rows from)
+TABLE_SOURCES = {
+    "performance-table": lambda frames: (frames.df_plot, frames.df_plot),
+    "shifts-table": lambda frames: (frames.df_shifts, frames.df_shifts),
+    "top-under-table": lambda frames: (frames.df_top_under, frames.df_top_under)
+}
+table_index_cache = {}
+TABLE_TABS = {"performance-table": "overview", "shifts-table": "additional", "top-under-table": "additional"}
+
+def get_table_index(table_id, frames=None):
+    frames = frames or current_frames
+    key = (table_id, frames.version)
+    index = table_index_cache.get(key)
+    record_cache("table-index", index is not None)
+    if index is None:
+        index = TableIndex(*TABLE_SOURCES[table_id](frames))
+        table_index_cache[key] = index
+    return index
+
+def warm_table_index_cache(frames):
+    for table_id in TABLE_SOURCES:
+        get_table_index(table_id, frames)
+
+# -------------------------------------------------
+# Search Index Cache: One Index per Dataset Version (persisted and memory-mapped by search.py)
+# -------------------------------------------------
+search_index_cache = {}
+
+def get_search_index(frames=None):
+    frames = frames or current_frames
+    key = ("reports", frames.version)
+    index = search_index_cache.get(key)
+    record_cache("search-index", index is not None)
+    if index is None:
+        docs = search.report_passages(frames.yearly_summaries, frames.df_shifts, df_insights)
+        index = search.load_or_build(docs)
+        search_index_cache[key] = index
+    return index
+
+# -------------------------------------------------
+# Risk Cache: Per-Year Risk Table per Dataset Version (computed once per machine, see risk.py)
+# -------------------------------------------------
+risk_cache = {}
+
+def get_risk_table(frames=None):
+    frames = frames or current_frames
+    key = ("risk", frames.version)
+    table = risk_cache.get(key)
+    record_cache("risk", table is not None)
+    if table is None:
+        def build():
+            return {"risk": risk.risk_table(frames.df_plot, frames.daily).reset_index()}
+        table = columnar.shared_frames(risk_key(frames.version), build)["risk"].set_index("Year")
+        risk_cache[key] = table
+    return table
+
+# -------------------------------------------------
+# Attribution Cache: Yearly Brinson Effects per Dataset Version (ranges are linked per request)
+# -------------------------------------------------
+attribution_cache = {}
+
+def get_attribution(frames=None):
+    frames = frames or current_frames
+    key = ("attribution", frames.version)
+    result = attribution_cache.get(key)
+    record_cache("attribution", result is not None)
+    if result is None:
+        result = attribution.Attribution.build(frames.df_plot, frames.policy, frames.benchmarks, frames.segment_returns)
+        attribution_cache[key] = result
+    return result
+
+# -------------------------------------------------
+# Relative Performance Cache: Charts and Cards per (benchmark, window, dataset version)
+# -------------------------------------------------
+relative_cache = {}
+
+def get_relative_outputs(benchmark, window, frames=None):
+    frames = frames or current_frames
+    key = (benchmark, window, frames.version)
+    outputs = relative_cache.get(key)
+    record_cache("relative", outputs is not None)
+    if outputs is None:
+        outputs = build_relative_outputs(benchmark, window, frames)
+        relative_cache[key] = outputs
+    return outputs
+
+def warm_relative_cache(frames):
+    for benchmark in frames.benchmarks:
+        for window in relative_performance.WINDOWS:
+            get_relative_outputs(benchmark, window, frames)
+
+# -------------------------------------------------
+# Cache Lifecycle: Warm the Next Version Before It Goes Live, Then Drop the Old One
+# -------------------------------------------------
+VERSIONED_CACHES = [overview_cache, tab_layout_cache, table_index_cache, search_index_cache, risk_cache,
+                    relative_cache, attribution_cache]
+
+# Figures, layouts and benchmark charts: serialized to the startup snapshot (startup.py).
+SNAPSHOT_CACHES = {"overview": overview_cache, "tab-layout": tab_layout_cache, "relative": relative_cache}
+
+def snapshot_file(frames):
+    settings = (HIGHLIGHT_MODE, TABLE_MODE, TABLE_PAGE_SIZE, risk.RISK_FREE_RATE, risk.BOOTSTRAP_SAMPLES,
+                live is not None)
+    return startup.snapshot_path(frames.version, startup.code_fingerprint(settings))
+
+def load_snapshot(frames):
+    entries = startup.read_snapshot(snapshot_file(frames)) if startup.enabled() else None
+    if entries is None or set(entries) != set(SNAPSHOT_CACHES):
+        return False
+    for name, cache in SNAPSHOT_CACHES.items():
+        cache.update(entries[name])
+    return True
+
+def save_snapshot(frames):
+    if startup.enabled():
+        startup.write_snapshot(snapshot_file(frames), {
+            name: {key: value for key, value in cache.items() if key[-1] == frames.version}
+            for name, cache in SNAPSHOT_CACHES.items()
+        })
+
+def warm_caches(frames, use_snapshot=True):
+    if not (use_snapshot and load_snapshot(frames)):
+        warm_overview_cache(frames)
+        warm_tab_cache(frames)
+        warm_relative_cache(frames)
+        save_snapshot(frames)
+    if TABLE_MODE == "custom":
+        warm_table_index_cache(frames)
+    get_search_index(frames)
+    if frames.policy is not None:
+        get_attribution(frames)
+
+def prune_caches(version):
+    for cache in VERSIONED_CACHES:
+        for key in list(cache):
+            if key[-1] != version:
+                cache.pop(key, None)
+
+# Runs in the data store's watcher thread whenever a data file changes.
+def on_data_reload(snapshot):
+    global current_frames
+    frames = build_frames(snapshot)
+    warm_caches(frames)
+    current_frames = frames
+    prune_caches(frames.version)
+    columnar.prune([store.columnar_key(name, state) for name, state in snapshot.files.items()]
+                   + [performance_key(snapshot.version), risk_key(snapshot.version)])
+
+store.add_listener(on_data_reload)
+
+# Drops every cached figure and layout for the live version and rebuilds them.
+def invalidate_caches():
+    for cache in VERSIONED_CACHES:
+        cache.clear()
+    warm_caches(current_frames, use_snapshot=False)
+
+# -------------------------------------------------
+# Callback: Update Overview Charts, Cards, and Yearly Summary Based on Selected Year
+# -------------------------------------------------
+@app.callback(
+    [
+        Output('fund-value-chart', 'figure'),
+        Output('return-chart', 'figure'),
+        Output('asset-allocation-chart', 'figure'),
+        Output('cards-row', 'children'),
+        Output('risk-cards-row', 'children'),
+        Output('year-summary', 'children')
+    ],
+    Input('year-dropdown', 'value')
+)
+@instrumented(tab="overview")
+@profiled
+def update_overview_charts(selected_year):
+    if HIGHLIGHT_MODE == "patch":
+        return get_overview_patch_outputs(selected_year, current_frames)
+    return get_overview_outputs(selected_year)
+
+# -------------------------------------------------
+# Callback: ESG What-If for the Selected Holdings and Multiplier (one CSR row, sub-millisecond)
+# -------------------------------------------------
+@app.callback(
+    Output('esg-what-if-result', 'children'),
+    [Input('esg-what-if-tickers', 'value'), Input('esg-what-if-factor', 'value')]
+)
+@instrumented(tab="additional")
+def update_esg_what_if(tickers, factor):
+    frames = current_frames
+    if frames.esg is None:
+        raise dash.exceptions.PreventUpdate
+    return build_esg_what_if(tickers, factor, frames)
+
+# -------------------------------------------------
+# Callback: Security Drill-Down (one slice of the ticker index, no string scans)
+# -------------------------------------------------
+@app.callback(
+    [Output('security-returns-chart', 'figure'), Output('security-history', 'children')],
+    Input('security-select', 'value')
+)
+@instrumented(tab="additional")
+def update_security(key):
+    if not key:
+        raise dash.exceptions.PreventUpdate
+    return build_security_outputs(key, current_frames)
+
+# -------------------------------------------------
+# Callback: Attribution Waterfall for the Selected Year Range and Linking Method
+# -------------------------------------------------
+@app.callback(
+    Output('attribution-waterfall', 'figure'),
+    [Input('year-range-slider', 'value'), Input('attribution-linking', 'value')]
+)
+@instrumented(tab="overview")
+def update_attribution(value, method):
+    frames = current_frames
+    if frames.policy is None or method not in attribution.LINKING_METHODS:
+        raise dash.exceptions.PreventUpdate
+    return build_attribution_waterfall(value, method, frames)
+
+# -------------------------------------------------
+# Callback: Benchmark-Relative Charts and Cards for the Selected Benchmark and Window
+# -------------------------------------------------
+@app.callback(
+    [
+        Output('relative-value-chart', 'figure'),
+        Output('relative-return-chart', 'figure'),
+        Output('relative-cards-row', 'children')
+    ],
+    [Input('benchmark-select', 'value'), Input('benchmark-window', 'value')]
+)
+@instrumented(tab="comparisons")
+def update_relative_performance(benchmark, window):
+    frames = current_frames
+    if benchmark not in frames.benchmarks or window not in relative_performance.WINDOWS:
+        raise dash.exceptions.PreventUpdate
+    return get_relative_outputs(benchmark, window, frames)
+
+# -------------------------------------------------
+# Callback (clientside): Append Streamed NAV Points to the Live Chart (assets/live_feed.js)
+# -------------------------------------------------
+if live is not None:
+    app.clientside_callback(
+        ClientsideFunction(namespace="live", function_name="render"),
+        [Output("live-nav-chart", "extendData"), Output("live-nav-chart", "figure")],
+        Input("live-nav-store", "data"),
+        State("live-nav-chart", "figure")
+    )
+
+# -------------------------------------------------
+# Callback: Year-Range Stats (prefix aggregates make every range a constant-time lookup)
+# -------------------------------------------------
+@app.callback(Output('range-stats-row', 'children'), Input('year-range-slider', 'value'))
+@instrumented(tab="overview")
+def update_range_stats(value):
+    return build_range_stats(value, current_frames)
+
+# -------------------------------------------------
+# Callback: Monte Carlo Projection Fan Chart (results memoized in projections.run_projection)
+#
+# In background mode the request only gathers the inputs and queues projections.projection_job;
+# a job worker (importing just projections) runs it, the renderer polls for progress and the
+# result. The job reports progress after every chunk of paths, and Cancel (or a new horizon or
+# allocation) stops it at the next report. Finished results are kept per (inputs, dataset version) in
+# the job database and shared by every web worker.
+# -------------------------------------------------
+PROJECTION_OUTPUTS = [Output('projection-fan-chart', 'figure'), Output('projection-summary', 'children')]
+PROJECTION_INPUTS = [Input('projection-horizon', 'value'), Input('projection-allocation', 'value')]
+
+if CALLBACK_MODE == "background":
+    job_manager = jobs.SQLiteJobManager(cache_by=[lambda: current_frames.version])
+
+    @app.callback(
+        PROJECTION_OUTPUTS,
+        PROJECTION_INPUTS,
+        background=True,
+        manager=job_manager,
+        interval=500,
+        progress=[Output('projection-status', 'children')],
+        running=[
+            (Output('projection-status-row', 'style'), {}, {"display": "none"}),
+            (Output('projection-cancel', 'disabled'), False, True)
+        ],
+        cancel=[Input('projection-cancel', 'n_clicks')]
+    )
+    @jobs.offload("projections:projection_job", finish=render_projection)
+    @instrumented(tab="projections")
+    def update_projection(horizon, preset):
+        return projection_args(horizon, preset, current_frames)
+else:
+    @app.callback(PROJECTION_OUTPUTS, PROJECTION_INPUTS)
+    @instrumented(tab="projections")
+    def update_projection(horizon, preset):
+        return build_projection_outputs(horizon, preset, current_frames)
+
+# -------------------------------------------------
+# Callback: Ranked Report Passages for the Search Query
+# -------------------------------------------------
+@app.callback(Output('search-results', 'children'), Input('search-query', 'value'))
+@instrumented(tab="search")
+def update_search(query):
+    return build_search_results(query, current_frames)
+
+# -------------------------------------------------
+# Callbacks: Server-Side Paging, Sorting and Filtering for Each DataTable
+# -------------------------------------------------
+def register_table_callback(table_id):
+    @app.callback(
+        [Output(table_id, 'data'), Output(table_id, 'page_count')],
+        [
+            Input(table_id, 'page_current'),
+            Input(table_id, 'page_size'),
+            Input(table_id, 'sort_by'),
+            Input(table_id, 'filter_query')
+        ]
+    )
+    @instrumented(tab=TABLE_TABS[table_id])
+    def update_table_page(page_current, page_size, sort_by, filter_query):
+        return get_table_index(table_id).query(page_current, page_size, sort_by, filter_query)
+    return update_table_page
+
+if TABLE_MODE == "custom":
+    for table_id in TABLE_SOURCES:
+        register_table_callback(table_id)
+
+startup.mark("callbacks")
+
+# Warm the caches for every year and tab so dropdown changes and tab switches are lookups
+# from the first request on (read from the startup snapshot when one matches).
+warm_caches(current_frames)
+startup.mark("caches")
+
+# Each process (including every gunicorn worker) polls data/ for changes in the background.
+app.server.before_request(store.ensure_watcher)
+
+# Vendored assets with immutable cache headers, and compressed bundles and callback responses.
+# Registered before metrics so its after_request runs last (Flask runs them in reverse order)
+# and the metrics record uncompressed response sizes.
+asset_pipeline.init_app(app)
+
+# Per-callback timings as Server-Timing headers, and Prometheus histograms on /metrics.
+metrics.init_app(app.server)
+
+# Sampled stacks of the @profiled callbacks on /_profile (PROFILE=1 or a signed X-Profile-Token).
+profiler.init_app(app.server)
+
+# Server-sent NAV events on /_live/stream, one shared log per process (live_feed.py).
+if live is not None:
+    live_feed.init_app(app.server, live)
 
 # -------------------------------------------------
 # Run the App
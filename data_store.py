@@ -0,0 +1,235 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+import columnar
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Configuration: Where the Tables Live and How Often to Look for Changes
+# -------------------------------------------------
+DATA_DIR = os.environ.get("DASHBOARD_DATA_DIR",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+RELOAD_INTERVAL = float(os.environ.get("DASHBOARD_RELOAD_INTERVAL", "5"))
+
+# Table name -> required. Each table is a file named <table><ext> in DATA_DIR.
+TABLES = {
+    "fund_metrics": True,
+    "investment_shifts": True,
+    "top_under": True,
+    "yearly_summaries": True,
+    # Optional holdings-level inputs for returns_engine; when present they replace Fund_Value/Return.
+    "holdings": False,
+    "prices": False,
+    "cash_flows": False,
+    # Optional per-security E/S/G scores for esg_engine (with holdings and prices).
+    "esg_scores": False,
+    # Optional attribution inputs (see attribution.py).
+    "policy_benchmark": False,
+    "segment_returns": False
+}
+
+# Directories whose every file is an optional table named "<directory>/<file stem>",
+# e.g. data/benchmarks/sp500.csv -> "benchmarks/sp500".
+TABLE_DIRECTORIES = ("benchmarks",)
+
+# Preferred order when several formats of the same table exist; columnar formats are memory-mapped.
+FORMATS = (".parquet", ".feather", ".arrow", ".csv", ".json")
+
+FileState = namedtuple("FileState", ["path", "mtime_ns", "size", "digest"])
+DataSnapshot = namedtuple("DataSnapshot", ["version", "tables", "files"])
+
+# -------------------------------------------------
+# Readers: One per File Format
+# -------------------------------------------------
+def read_parquet(path):
+    import pyarrow.parquet as pq
+    return pq.read_table(path, memory_map=True).to_pandas()
+
+def read_arrow(path):
+    import pyarrow as pa
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+def read_csv(path):
+    # Only empty cells are missing values; literal "N/A" entries are data and must survive.
+    return pd.read_csv(path, keep_default_na=False, na_values=[""])
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame(json.load(f))
+
+READERS = {
+    ".parquet": read_parquet,
+    ".feather": read_arrow,
+    ".arrow": read_arrow,
+    ".csv": read_csv,
+    ".json": read_json
+}
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def snapshot_version(files):
+    h = hashlib.sha1()
+    for name in sorted(files):
+        h.update(f"{name}:{files[name].digest};".encode("utf-8"))
+    return h.hexdigest()[:12]
+
+# -------------------------------------------------
+# Data Store: Immutable Snapshots, Swapped Atomically on Change
+# -------------------------------------------------
+class DataStore:
+    def __init__(self, data_dir=DATA_DIR, tables=TABLES, reload_interval=RELOAD_INTERVAL,
+                 columnar_dir=columnar.COLUMNAR_DIR, table_directories=TABLE_DIRECTORIES):
+        self.data_dir = data_dir
+        self.tables = dict(tables)
+        self.table_directories = tuple(table_directories)
+        self.reload_interval = reload_interval
+        self.columnar_dir = columnar_dir
+        self._snapshot = None
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._watcher_pid = None
+        self._rejected = {}
+
+    def table_path(self, name):
+        for ext in FORMATS:
+            path = os.path.join(self.data_dir, name + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def discover_tables(self):
+        tables = dict(self.tables)
+        for directory in self.table_directories:
+            root = os.path.join(self.data_dir, directory)
+            if not os.path.isdir(root):
+                continue
+            for filename in sorted(os.listdir(root)):
+                stem, ext = os.path.splitext(filename)
+                if ext in READERS and not stem.startswith("."):
+                    tables.setdefault(f"{directory}/{stem}", False)
+        return tables
+
+    def snapshot(self):
+        if self._snapshot is None:
+            self.reload()
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+    def table(self, name):
+        return self.snapshot().tables.get(name)
+
+    # Parsed once per file revision by whichever worker gets there first, then memory-mapped by all.
+    def read_table(self, name, state):
+        reader = READERS[os.path.splitext(state.path)[1]]
+        frame = name.replace("/", "--")    # Directory tables ("benchmarks/sp500") as flat file names
+        return columnar.shared_frames(self.columnar_key(name, state), lambda: {frame: reader(state.path)},
+                                      self.columnar_dir)[frame]
+
+    def columnar_key(self, name, state):
+        return f"{name.replace('/', '--')}-{state.digest[:16]}"
+
+    def columnar_keys(self):
+        return [self.columnar_key(name, state) for name, state in self.snapshot().files.items()]
+
+    # Listeners run with the new snapshot *before* it is published, so they can warm
+    # version-keyed caches while requests keep being served from the previous version.
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def reload(self, force=False):
+        with self._lock:
+            current = self._snapshot
+            files = {}
+            changed = []
+            for name, required in self.discover_tables().items():
+                path = self.table_path(name)
+                if path is None:
+                    if required:
+                        raise FileNotFoundError(f"Missing data table '{name}' in {self.data_dir}")
+                    continue
+                stat = os.stat(path)
+                old = current.files.get(name) if current is not None else None
+                rejected = self._rejected.get(name)
+                if (rejected is not None and (old is not None or not required) and rejected.path == path
+                        and rejected.mtime_ns == stat.st_mtime_ns and rejected.size == stat.st_size):
+                    # Same bad revision that already failed to parse: keep serving the old table, or
+                    # leave a new optional one out, so it cannot hold back changes to the others.
+                    if old is not None:
+                        files[name] = old
+                    continue
+                if (not force and old is not None and old.path == path
+                        and old.mtime_ns == stat.st_mtime_ns and old.size == stat.st_size):
+                    files[name] = old
+                    continue
+                self._rejected.pop(name, None)
+                digest = file_digest(path)
+                files[name] = FileState(path, stat.st_mtime_ns, stat.st_size, digest)
+                if force or old is None or old.digest != digest or old.path != path:
+                    changed.append(name)
+
+            removed = [] if current is None else [n for n in current.files if n not in files]
+            if current is not None and not changed and not removed:
+                # Touched but identical files: remember the new stat so they are not re-hashed.
+                self._snapshot = current._replace(files=files)
+                return False
+
+            tables = {} if current is None else {n: t for n, t in current.tables.items() if n in files}
+            for name in changed:
+                try:
+                    tables[name] = self.read_table(name, files[name])
+                except Exception:
+                    self._rejected[name] = files[name]
+                    raise
+            snapshot = DataSnapshot(snapshot_version(files), tables, files)
+
+            try:
+                for fn in self._listeners:
+                    fn(snapshot)
+            except Exception:
+                # Parsed but unusable (e.g. build_frames rejects it): same treatment as a parse error.
+                for name in changed:
+                    self._rejected[name] = files[name]
+                raise
+            self._snapshot = snapshot
+            if current is not None:
+                logger.info("Reloaded %s (dataset version %s -> %s)", ", ".join(changed + removed),
+                            current.version, snapshot.version)
+            return True
+
+    # -------------------------------------------------
+    # Background Watcher: Polls mtimes/sizes and Hashes Only Files That Moved
+    # -------------------------------------------------
+    def ensure_watcher(self):
+        # Threads do not survive a fork, so each gunicorn worker starts its own watcher.
+        if self.reload_interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+        thread = threading.Thread(target=self._watch, name="data-store-watcher", daemon=True)
+        thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            try:
+                self.reload()
+            except Exception as exc:
+                # A half-written or malformed file keeps the previous snapshot until it changes again.
+                logger.warning("Data reload failed (%s); still serving version %s", exc,
+                               self._snapshot.version if self._snapshot else None)
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from returns_engine import CASH_TICKER, academic_year_label, academic_year_start, as_dates
+
+# -------------------------------------------------
+# Holdings-Weighted ESG Engine
+#
+# Inputs (optional tables in data/, see data_store.TABLES):
+#   holdings:    date, ticker, shares   -- position as of `date`, carried forward until the next entry
+#   prices:      date, ticker, close    -- the last close on or before each holdings date values it
+#   esg_scores:  ticker, E, S, G        -- per-security pillar scores (0-100)
+# Every distinct holdings date is an observation. Market values live in one CSR matrix
+# (observations x securities) holding only the positions actually open on that date, so every
+# pillar, the coverage and the composite for every date come out of a single reduceat over its
+# non-zeros (the sparse product W @ [S | 1]). What-if queries rescale one row and reduce only it.
+# -------------------------------------------------
+PILLARS = ["E", "S", "G"]
+PILLAR_WEIGHTS = np.array([1.0, 1.0, 1.0]) / 3.0   # Composite ESG_Score = weighted pillar average
+
+def expand_intervals(starts, stops):
+    # Every row in [starts[i], stops[i]) for each i, flattened -> (owner i, row) pairs.
+    lengths = np.maximum(stops - starts, 0)
+    owners = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owners, starts[owners] + offsets
+
+def asof(codes, days, values, query_codes, query_days):
+    # Latest value per code on or before each query day (NaN before the first) via one
+    # searchsorted over composite (code, day) keys.
+    low = min(days.min(), query_days.min())
+    span = max(days.max(), query_days.max()) - low + 1
+    keys = codes * span + (days - low)
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order]
+    found = np.searchsorted(keys, query_codes * span + (query_days - low), side="right") - 1
+    ok = (found >= 0) & (keys[np.maximum(found, 0)] // span == query_codes)
+    return np.where(ok, values[np.maximum(found, 0)], np.nan)
+
+class ESGEngine:
+    def __init__(self, dates, tickers, indptr, cols, market_values, scores, scored):
+        self.dates = dates                    # (n_obs,) datetime64[D]
+        self.tickers = tickers                # (n_securities,) object
+        self.codes = {t: i for i, t in enumerate(tickers)}
+        self.indptr = indptr                  # CSR row pointers into cols/market_values
+        self.cols = cols
+        self.market_values = market_values
+        self.scores = scores                  # (n_securities, 3) pillar scores, 0 where unscored
+        self.scored = scored                  # (n_securities,) bool
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def build(cls, holdings, prices, esg_scores):
+        ticker_codes, tickers = pd.factorize(pd.concat([holdings["ticker"], prices["ticker"], esg_scores["ticker"]],
+                                                       ignore_index=True))
+        tickers = np.asarray(tickers, dtype=object)
+        n_h, n_p = len(holdings), len(prices)
+        h_codes, p_codes, s_codes = ticker_codes[:n_h], ticker_codes[n_h:n_h + n_p], ticker_codes[n_h + n_p:]
+        h_days = as_dates(holdings["date"]).astype(np.int64)
+        p_days = as_dates(prices["date"]).astype(np.int64)
+        shares = holdings["shares"].to_numpy(dtype=np.float64)
+
+        # Each holdings row is open from its date until the same ticker's next row.
+        obs_days = np.unique(h_days)
+        order = np.lexsort((h_days, h_codes))
+        h_codes, h_days, shares = h_codes[order], h_days[order], shares[order]
+        same_next = np.append(h_codes[1:] == h_codes[:-1], False)
+        next_days = np.where(same_next, np.append(h_days[1:], 0), np.iinfo(np.int64).max)
+        # Several rows for one ticker on one day: the later one wins (its interval is empty).
+        owners, rows = expand_intervals(np.searchsorted(obs_days, h_days),
+                                        np.searchsorted(obs_days, next_days))
+        cols = h_codes[owners]
+        position = shares[owners]
+
+        price = asof(p_codes, p_days, prices["close"].to_numpy(dtype=np.float64), cols, obs_days[rows])
+        price = np.where(np.isnan(price) & (tickers[cols] == CASH_TICKER), 1.0, price)
+        market_value = position * np.nan_to_num(price, nan=0.0)
+        keep = market_value > 0
+
+        # CSR: entries sorted by observation row.
+        rows, cols, market_value = rows[keep], cols[keep], market_value[keep]
+        order = np.argsort(rows, kind="stable")
+        rows, cols, market_value = rows[order], cols[order], market_value[order]
+        indptr = np.zeros(len(obs_days) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(obs_days)), out=indptr[1:])
+
+        scores = np.zeros((len(tickers), len(PILLARS)))
+        pillar_values = esg_scores[PILLARS].to_numpy(dtype=np.float64)
+        scored = np.zeros(len(tickers), dtype=bool)
+        complete = ~np.isnan(pillar_values).any(axis=1)
+        scores[s_codes[complete]] = pillar_values[complete]
+        scored[s_codes[complete]] = True
+        return cls(obs_days.astype("datetime64[D]"), tickers, indptr, cols, market_value, scores, scored)
+
+    # -------------------------------------------------
+    # Aggregation: One Reduction over the CSR Non-Zeros
+    # -------------------------------------------------
+    def aggregate(self, lo, hi, market_values=None):
+        # Rows [lo, hi) -> (pillar scores (rows x 3), coverage (rows,)); unscored weight is excluded.
+        start, stop = self.indptr[lo], self.indptr[hi]
+        values = self.market_values[start:stop] if market_values is None else market_values
+        cols = self.cols[start:stop]
+        scored = self.scored[cols]
+        terms = np.column_stack([values[:, None] * self.scores[cols] * scored[:, None], values * scored, values])
+        counts = np.diff(self.indptr[lo:hi + 1])
+        sums = np.zeros((hi - lo, terms.shape[1]))
+        nonempty = counts > 0
+        if stop > start:
+            sums[nonempty] = np.add.reduceat(terms, (self.indptr[lo:hi] - start)[nonempty], axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pillars = sums[:, :len(PILLARS)] / sums[:, [len(PILLARS)]]
+            coverage = sums[:, len(PILLARS)] / sums[:, len(PILLARS) + 1]
+        return pillars, coverage
+
+    def scores_by_date(self):
+        pillars, coverage = self.aggregate(0, len(self))
+        frame = pd.DataFrame(pillars, columns=[f"{p}_Score" for p in PILLARS])
+        frame.insert(0, "date", self.dates)
+        frame["ESG_Score"] = pillars @ PILLAR_WEIGHTS
+        frame["Coverage"] = coverage
+        return frame
+
+    def yearly(self):
+        # Score at each academic year's last holdings date.
+        frame = self.scores_by_date()
+        frame["Year"] = [academic_year_label(y) for y in academic_year_start(self.dates)]
+        return frame.groupby("Year", sort=True).last().reset_index().drop(columns="date")
+
+    # -------------------------------------------------
+    # Positions and What-If Reweighting for One Observation
+    # -------------------------------------------------
+    def positions(self, row=-1):
+        row = row % len(self)
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        cols, values = self.cols[start:stop], self.market_values[start:stop]
+        frame = pd.DataFrame(self.scores[cols], columns=PILLARS)
+        frame.insert(0, "ticker", self.tickers[cols])
+        frame.insert(1, "weight", values / values.sum() if len(values) else values)
+        frame["scored"] = self.scored[cols]
+        return frame.sort_values("weight", ascending=False, kind="stable").reset_index(drop=True)
+
+    def what_if(self, scale, row=-1):
+        # scale: {ticker: factor} applied to that position's weight (0 sells it); the rest keep theirs.
+        # Scores and coverage are None when nothing (scored) is left to average over.
+        row = row % len(self)
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        factors = np.ones(len(self.tickers))
+        for ticker, factor in scale.items():
+            if ticker in self.codes:
+                factors[self.codes[ticker]] = factor
+        values = self.market_values[start:stop] * factors[self.cols[start:stop]]
+        pillars, coverage = self.aggregate(row, row + 1, values)
+        base, base_coverage = self.aggregate(row, row + 1)
+        return {
+            "date": self.dates[row],
+            "pillars": {p: defined(v) for p, v in zip(PILLARS, pillars[0])},
+            "esg": defined(pillars[0] @ PILLAR_WEIGHTS),
+            "coverage": defined(coverage[0]),
+            "base_pillars": {p: defined(v) for p, v in zip(PILLARS, base[0])},
+            "base_esg": defined(base[0] @ PILLAR_WEIGHTS),
+            "base_coverage": defined(base_coverage[0])
+        }
+
+def defined(value):
+    return float(value) if np.isfinite(value) else None
+
+# Replace the hand-entered ESG_Score with the holdings-weighted one for every year the engine covers.
+def apply_esg(df, yearly):
+    df = df.copy()
+    computed = yearly.set_index("Year")
+    hit = df["Year"].isin(computed.index) & computed["ESG_Score"].reindex(df["Year"]).notna().to_numpy()
+    df.loc[hit, "ESG_Score"] = computed.loc[df.loc[hit, "Year"], "ESG_Score"].to_numpy().round(1)
+    return df
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import re
+import sys
+
+from dash.fingerprint import check_fingerprint
+
+from benchmark import callback_payload
+
+# -------------------------------------------------
+# Static Export: Pre-Render Every Tab and Input State into a Serverless Bundle
+#
+# Every callback state listed in static_inputs() is rendered once through the real callbacks
+# (in-process, via the Flask test client) and written to _static/<callback>/<n>.json. The
+# callbacks are re-declared as clientside functions that look the state up and fetch its JSON,
+# so the bundle runs from any static host or CDN with no Python server behind it.
+#
+#   python export_static.py --output dist/static
+#   python -m http.server -d dist/static 8000
+#
+# All paths in the bundle are relative, so it can be served from a sub-directory.
+#
+# Callbacks with no static states (free-text search, the ESG what-if multi-select) cannot be
+# pre-rendered: their inputs are disabled in the exported layouts and their outputs show
+# LIVE_ONLY_NOTICE. README.txt in the bundle lists what was pre-rendered and what was disabled.
+# -------------------------------------------------
+NAMESPACE = "static_export"
+CALLBACKS_SCRIPT = "static-callbacks.js"
+README = "README.txt"
+LIVE_ONLY_NOTICE = "Needs the live dashboard server; not available in this static export."
+PROJECTION_HORIZONS = range(1, 31)   # Every step of the projection-horizon slider
+
+# callback name -> every tuple of input values to pre-render
+def static_inputs(dashboard):
+    frames = dashboard.current_frames
+    return {
+        "render_tab_content": [(tab_id,) for tab_id in dashboard.TAB_LAYOUTS],
+        "update_overview_charts": [(year,) for year in frames.df["Year"]],
+        "update_range_stats": [([lo, hi],) for lo in range(len(frames.ranges))
+                               for hi in range(lo, len(frames.ranges))],
+        "update_attribution": [([lo, hi], method) for lo in range(len(frames.ranges))
+                               for hi in range(lo, len(frames.ranges))
+                               for method in dashboard.attribution.LINKING_METHODS] if frames.policy is not None else [],
+        "update_relative_performance": [(benchmark, window) for benchmark in sorted(frames.benchmarks)
+                                        for window in dashboard.relative_performance.WINDOWS],
+        "update_security": [(key,) for key, _, _ in frames.securities.securities()],
+        "update_projection": [(horizon, preset) for horizon in PROJECTION_HORIZONS
+                              for preset in dashboard.ALLOCATION_PRESETS]
+    }
+
+def state_key(values):
+    # Must match JSON.stringify(args) in the browser.
+    return json.dumps(list(values), separators=(",", ":"), ensure_ascii=False)
+
+def write_file(root, rel_path, data):
+    path = os.path.join(root, *rel_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+def fetch(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return response.get_data()
+
+def fetch_json(client, url):
+    return json.loads(fetch(client, url))
+
+# -------------------------------------------------
+# Static Files: Index Page, Component Suites, Assets
+# -------------------------------------------------
+def local_path(url):
+    # "/_dash-component-suites/dash/dcc/x.v3_0_3m123.js?v=1" -> "_dash-component-suites/dash/dcc/x.js"
+    path = url.split("?", 1)[0].lstrip("/")
+    return check_fingerprint(path)[0]
+
+def export_index(client, output, callbacks_script):
+    html = fetch(client, "/").decode("utf-8")
+    config_pattern = re.compile(r'(<script id="_dash-config" type="application/json">)(.*?)(</script>)', re.S)
+    config = json.loads(config_pattern.search(html).group(2))
+    config["requests_pathname_prefix"] = "./"
+    html = config_pattern.sub(lambda m: m.group(1) + json.dumps(config).replace("</", "<\\/") + m.group(3), html)
+
+    def relative(match):
+        attr, url = match.group(1), match.group(2)
+        path = local_path(url)
+        write_file(output, path, fetch(client, url))
+        return f'{attr}="./{path}"'
+    html = re.sub(r'\b(src|href)="(/[^"]*)"', relative, html)
+
+    # The lookup functions must exist before the renderer starts firing callbacks.
+    renderer = '<script id="_dash-renderer"'
+    html = html.replace(renderer, f'<script src="./{callbacks_script}"></script>\n            {renderer}', 1)
+    write_file(output, "index.html", html.encode("utf-8"))
+
+def export_component_suites(client, app, output):
+    for namespace, paths in app.registered_paths.items():
+        for path in sorted(paths):
+            if path.endswith(".map"):
+                continue
+            # Async chunks (graph, slider, dropdown, plotly.js) are requested by their plain names.
+            write_file(output, f"_dash-component-suites/{namespace}/{path}",
+                       fetch(client, f"/_dash-component-suites/{namespace}/{path}"))
+
+def export_assets(client, app, output):
+    folder = app.config.assets_folder
+    for root, _, files in os.walk(folder):
+        for name in files:
+            rel = os.path.relpath(os.path.join(root, name), folder).replace(os.sep, "/")
+            write_file(output, f"assets/{rel}", fetch(client, f"/assets/{rel}"))
+
+# -------------------------------------------------
+# Callbacks: Pre-Render Each State and Rewrite the Dependency Graph to Clientside Lookups
+# -------------------------------------------------
+def callback_name(app, output_key):
+    return app.callback_map[output_key]["callback"].__name__
+
+def output_props(output_key):
+    # "..a.figure...b.children.." -> [["a", "figure"], ["b", "children"]]
+    return [o.rsplit(".", 1) for o in output_key.strip(".").split("...")]
+
+def live_only(app, dependencies, states):
+    # -> {callback name: (input ids, output ids)} for the callbacks the bundle cannot serve.
+    return {callback_name(app, dep["output"]): ({i["id"] for i in dep["inputs"]},
+                                                {component_id for component_id, _ in output_props(dep["output"])})
+            for dep in dependencies if callback_name(app, dep["output"]) not in states}
+
+def disable_live_only(node, skipped):
+    # Walks a component tree (as JSON) and disables every control that would need the server.
+    inputs = set().union(*(ids for ids, _ in skipped.values())) if skipped else set()
+    outputs = set().union(*(ids for _, ids in skipped.values())) if skipped else set()
+    if isinstance(node, list):
+        for child in node:
+            disable_live_only(child, skipped)
+    elif isinstance(node, dict):
+        props = node.get("props")
+        if isinstance(props, dict) and "type" in node:
+            if props.get("id") in inputs:
+                props["disabled"] = True
+            if props.get("id") in outputs:
+                props["children"] = LIVE_ONLY_NOTICE
+        for value in node.values():
+            disable_live_only(value, skipped)
+    return node
+
+def export_callbacks(client, app, dependencies, states, output):
+    index = {}
+    kept = []
+    skipped = live_only(app, dependencies, states)
+    for dep in dependencies:
+        name = callback_name(app, dep["output"])
+        if name in skipped:
+            continue
+        multi = dep["output"].startswith("..")
+        outputs = output_props(dep["output"])
+        index[name] = {}
+        for n, values in enumerate(states[name]):
+            response = client.post("/_dash-update-component", json=callback_payload(app, dep["output"], values))
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}{tuple(values)} returned {response.status_code}")
+            props = response.get_json()["response"]
+            result = disable_live_only([props[component_id][prop] for component_id, prop in outputs], skipped)
+            rel_path = f"_static/{name}/{n}.json"
+            write_file(output, rel_path, json.dumps(result if multi else result[0],
+                                                    separators=(",", ":")).encode("utf-8"))
+            index[name][state_key(values)] = rel_path
+        kept.append(dict(dep, clientside_function={"namespace": NAMESPACE, "function_name": name}))
+    return kept, index, skipped
+
+def callbacks_script(index):
+    return f"""(function () {{
+    var INDEX = {json.dumps(index, indent=4, ensure_ascii=False)};
+    var loaded = {{}};
+    function lookup(name, args) {{
+        var path = INDEX[name][JSON.stringify(args)];
+        if (path === undefined) {{
+            return window.dash_clientside.no_update;
+        }}
+        if (!loaded[path]) {{
+            loaded[path] = fetch(path).then(function (response) {{ return response.json(); }});
+        }}
+        return loaded[path];
+    }}
+    var functions = {{}};
+    Object.keys(INDEX).forEach(function (name) {{
+        functions[name] = function () {{ return lookup(name, Array.prototype.slice.call(arguments)); }};
+    }});
+    window.dash_clientside = Object.assign({{}}, window.dash_clientside, {{{NAMESPACE}: functions}});
+}})();
+"""
+
+def export(dashboard, output):
+    app = dashboard.app
+    client = app.server.test_client()
+    os.makedirs(output, exist_ok=True)
+
+    dependencies, index, skipped = export_callbacks(client, app, fetch_json(client, "/_dash-dependencies"),
+                                                    static_inputs(dashboard), output)
+    write_file(output, "_dash-dependencies", json.dumps(dependencies).encode("utf-8"))
+    layout = disable_live_only(fetch_json(client, "/_dash-layout"), skipped)
+    write_file(output, "_dash-layout", json.dumps(layout, separators=(",", ":")).encode("utf-8"))
+    write_file(output, CALLBACKS_SCRIPT, callbacks_script(index).encode("utf-8"))
+    write_file(output, README, readme(index, skipped).encode("utf-8"))
+    export_index(client, output, CALLBACKS_SCRIPT)
+    export_component_suites(client, app, output)
+    export_assets(client, app, output)
+    return index, skipped
+
+def readme(index, skipped):
+    lines = ["Static export of the dashboard (python export_static.py): no server needed.", "",
+             "Pre-rendered callbacks (every input state listed is served from _static/):"]
+    lines += [f"  {name:28} {len(states):>5} states" for name, states in index.items()]
+    lines += ["", "Disabled in this bundle (they need the live server; their outputs show the notice below):"]
+    lines += [f"  {name:28} inputs {', '.join(sorted(inputs))} -> {', '.join(sorted(outputs))}"
+              for name, (inputs, outputs) in sorted(skipped.items())] or ["  (none)"]
+    lines += ["", f'  "{LIVE_ONLY_NOTICE}"']
+    return "\n".join(lines) + "\n"
+
+def bundle_size(output):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(output) for name in files)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the dashboard as a static, serverless bundle.")
+    parser.add_argument("--output", default=os.path.join("dist", "static"))
+    args = parser.parse_args(argv)
+
+    # Tables ship their full data and the overview callback returns whole figures; the server-side
+    # paging callbacks, Patch deltas, background jobs and the live NAV stream all need a live server.
+    os.environ["TABLE_MODE"] = "native"
+    os.environ["HIGHLIGHT_MODE"] = "full"
+    os.environ["CALLBACK_MODE"] = "sync"
+    os.environ["LIVE_FEED"] = ""
+    import dashboard
+    index, skipped = export(dashboard, args.output)
+    sys.stdout.write(readme(index, skipped))
+    print(f"\nWrote {args.output} ({bundle_size(args.output) / 2**20:.1f} MiB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import time
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+
+import metrics
+
+try:
+    import orjson
+except ImportError:   # Plain json still works, just slower
+    orjson = None
+
+# -------------------------------------------------
+# Compact Figures: One Lean Registered Template, orjson
+#
+# Plotly 6 already ships numeric arrays (numpy, pandas) as base64 typed arrays. What it does not
+# trim is the template: plotly_white inlines ~7 KB of defaults into every figure, most of them for
+# trace types and subplots (geo, polar, 3D, maps) the dashboard never draws. FIGURE_TEMPLATE is
+# registered with plotly.io.templates as plotly_white's cartesian layout plus the defaults of the
+# trace types used here (~2.5 KB), and figures name it like any built-in template.
+#
+# Responses are encoded with orjson when it is installed. With FIGURE_STATS=1 every figure is
+# encoded a second time with the full plotly_white template to count the bytes saved on /metrics
+# (dash_figure_bytes_total), as reported by:
+#
+#   python figure_json.py
+# -------------------------------------------------
+FIGURE_TEMPLATE = "dashboard"
+BASE_TEMPLATE = "plotly_white"
+TEMPLATE_TRACES = ("bar", "heatmap", "pie", "scatter", "waterfall")
+UNUSED_LAYOUT = ("geo", "map", "mapbox", "polar", "scene", "ternary")
+FIGURE_STATS = os.environ.get("FIGURE_STATS", "0") == "1"      # Off: doubles the encoding cost
+
+if orjson is not None:
+    pio.json.config.default_engine = "orjson"
+
+def lean_template(base=BASE_TEMPLATE):
+    base = pio.templates[base]
+    layout = {k: v for k, v in base.layout.to_plotly_json().items() if k not in UNUSED_LAYOUT}
+    data = {k: v for k, v in base.data.to_plotly_json().items() if k in TEMPLATE_TRACES}
+    return go.layout.Template(layout=layout, data=data)
+
+pio.templates[FIGURE_TEMPLATE] = lean_template()
+
+def dumps(value):
+    return to_json_plotly(value)
+
+def loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+# -------------------------------------------------
+# Figures: Dict for dcc.Graph (+ Bytes Saved on /metrics with FIGURE_STATS=1)
+# -------------------------------------------------
+def compact_figure(fig, name="figure"):
+    start = time.perf_counter()
+    figure = fig.to_plotly_json() if hasattr(fig, "to_plotly_json") else dict(fig)
+    if FIGURE_STATS:
+        record_figure(name, figure, time.perf_counter() - start)
+    return figure
+
+def record_figure(name, figure, seconds):
+    plain = dict(figure, layout=dict(figure.get("layout", {}), template=pio.templates[BASE_TEMPLATE]))
+    metrics.FIGURE_BYTES.inc(name, "plain", amount=len(dumps(plain).encode("utf-8")))
+    metrics.FIGURE_BYTES.inc(name, "compact", amount=len(dumps(figure).encode("utf-8")))
+    metrics.FIGURE_COMPACT_SECONDS.observe(seconds, name)
+
+# -------------------------------------------------
+# Report: Plain vs Compact Bytes for Every Figure the Dashboard Renders
+# -------------------------------------------------
+def main():
+    os.environ.setdefault("CALLBACK_MODE", "sync")
+    os.environ["FIGURE_STATS"] = "1"
+    import dashboard
+    from benchmark import callback_payload, output_key_for
+    from export_static import static_inputs
+
+    # Warming the caches at import built the overview and tab figures; run one state of every other callback.
+    client = dashboard.app.server.test_client()
+    for name, states in static_inputs(dashboard).items():
+        key = output_key_for(dashboard.app, name)
+        if key is not None and states:
+            client.post("/_dash-update-component", json=callback_payload(dashboard.app, key, list(states[0])))
+
+    totals = {}
+    for (name, encoding), value in metrics.FIGURE_BYTES.values().items():
+        totals.setdefault(name, {})[encoding] = value
+    # Counters add up every build (e.g. one overview figure per year); report the average per build.
+    print(f"{'figure':<28}{'builds':>8}{'plain':>12}{'compact':>12}{'saved':>12}{'ratio':>8}")
+    for name, sizes in sorted(totals.items()):
+        builds = max(metrics.FIGURE_COMPACT_SECONDS.count(name), 1)
+        plain, compact = sizes.get("plain", 0) // builds, sizes.get("compact", 0) // builds
+        print(f"{name:<28}{builds:>8}{plain:>12,}{compact:>12,}{plain - compact:>12,}{plain / max(compact, 1):>7.1f}x")
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
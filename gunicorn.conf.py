@@ -0,0 +1,33 @@
+import gc
+import os
+
+# -------------------------------------------------
+# Gunicorn: Preload the App Once, Share It Copy-on-Write
+#
+# Picked up automatically by `gunicorn dashboard:app` (Procfile). With preload the master imports
+# dashboard (frames, snapshot-loaded caches, layouts) a single time and forks the workers from it,
+# so worker boot is a fork instead of an import. gc.freeze() moves everything built so far out of
+# the collector's reach: collections in the workers would otherwise touch those objects' headers and
+# copy their pages. The SQLite job queue and the data-file watcher already reopen per process.
+# GUNICORN_PRELOAD=0 goes back to importing in every worker.
+# -------------------------------------------------
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+
+# Live feed sizing: each open stream (live_feed.py) holds a gthread thread for as long as its tab
+# is open, so streams are capped LIVE_RESERVED_THREADS below the thread count and the rest always
+# serve callbacks. The defaults give each worker 224 viewers and 32 request threads; raise
+# GUNICORN_THREADS (or workers) for more viewers, LIVE_RESERVED_THREADS for more callback headroom.
+# threads > 1 selects gthread workers.
+threads = int(os.environ.get("GUNICORN_THREADS", "256" if os.environ.get("LIVE_FEED") else "1"))
+if os.environ.get("LIVE_FEED"):
+    reserved = int(os.environ.get("LIVE_RESERVED_THREADS", "32"))
+    if threads <= reserved:
+        raise ValueError(f"GUNICORN_THREADS={threads} leaves no room for live streams "
+                         f"(LIVE_RESERVED_THREADS={reserved} are kept for callbacks)")
+    # Read by live_feed when the app is imported, which always happens after this file runs.
+    os.environ.setdefault("LIVE_MAX_STREAMS", str(threads - reserved))
+
+def when_ready(server):
+    if preload_app:
+        gc.freeze()
@@ -0,0 +1,406 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+import pandas as pd
+
+from data_store import DATA_DIR, READERS, DataStore
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:    # beautifulsoup4 is optional; the stdlib parser below covers plain report HTML
+    BeautifulSoup = None
+
+# -------------------------------------------------
+# Annual-Report Ingestion: Report Files -> data/ Tables
+#
+# Parses a directory of report HTML/text files in a process pool and extracts, per academic year,
+# the fund value, return, allocation, ESG score, top/under performers, investment shifts and a
+# bullet summary. Extracted values overlay the current tables in data/ (hand-entered values stay
+# wherever a report does not mention the figure), and the DataStore watcher hot-reloads them.
+#
+# A manifest of (size, mtime, sha256, extracted record) per file makes re-runs incremental:
+# untouched files are not read at all, touched-but-identical files are hashed but not parsed.
+# It also records what ingestion wrote (rows it added, the earlier value of every cell it
+# overwrote), so every run first reverts that and re-applies the reports still present: values
+# from a deleted report disappear, and hand-entered values come back.
+#
+#   python ingest.py reports/ --workers 8
+#   python ingest.py reports/ --dry-run
+# -------------------------------------------------
+REPORT_EXTENSIONS = (".html", ".htm", ".txt", ".md")
+MANIFEST_NAME = ".ingest_manifest.json"
+MANIFEST_VERSION = 2    # Bump when extraction changes so every report is parsed again
+
+METRIC_COLUMNS = ["Fund_Value", "Return", "Equities", "Fixed_Income", "Cash", "Real_Assets", "ESG_Score"]
+SHIFT_COLUMNS = ["Divestitures", "New_Positions", "Key_Shifts"]
+PERFORMER_COLUMNS = ["Top_Performer", "Underperformer"]
+
+# -------------------------------------------------
+# Text: HTML to Lines, Keeping List Items as "- " Bullets
+# -------------------------------------------------
+BLOCK_TAGS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "table"}
+
+class TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n- " if tag == "li" else "\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(self._skip - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+def html_to_text(raw):
+    if BeautifulSoup is not None:
+        try:
+            soup = BeautifulSoup(raw, "lxml")
+        except Exception:
+            soup = BeautifulSoup(raw, "html.parser")
+        for tag in soup(["script", "style"]):
+            tag.decompose()
+        for li in soup.find_all("li"):
+            li.insert(0, "- ")
+        text = soup.get_text("\n")
+    else:
+        parser = TextExtractor()
+        parser.feed(raw)
+        parser.close()
+        text = "".join(parser.parts)
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+# -------------------------------------------------
+# Extraction: Regular Expressions over the Report Text
+# -------------------------------------------------
+YEAR_RE = re.compile(r"(20\d\d|19\d\d)\s*[-–/_]\s*(\d{4}|\d{2})\b")
+FUND_VALUE_RE = re.compile(r"(?:fund|portfolio|total)\s+(?:value|assets|nav)\b[^$\d\n]{0,40}\$?\s*([\d,]+(?:\.\d+)?)"
+                           r"\s*(million|mm|m|thousand|k)?\b", re.I)
+RETURN_RE = re.compile(r"\breturn(?:ed|s)?\b[^%\n]{0,40}?([-+−]?\d+(?:\.\d+)?)\s*%", re.I)
+ESG_RE = re.compile(r"\bESG\s+score\b[^\d\n]{0,30}(\d+(?:\.\d+)?)", re.I)
+ALLOCATION_NAMES = {
+    "Equities": r"equit(?:y|ies)|stocks",
+    "Fixed_Income": r"fixed\s+income|bonds",
+    "Cash": r"cash",
+    "Real_Assets": r"real\s+assets|real\s+estate|reits?"
+}
+ALLOCATION_RES = {
+    col: (re.compile(rf"(\d+(?:\.\d+)?)\s*%\s*(?:in\s+|of\s+)?(?:{names})\b", re.I),
+          re.compile(rf"\b(?:{names})\b\s*(?:at|:|of|was|to)?\s*(\d+(?:\.\d+)?)\s*%", re.I))
+    for col, names in ALLOCATION_NAMES.items()
+}
+TOP_RE = re.compile(r"\b(?:top|best)[\s-]+perform(?:er|ers|ing\s+(?:holding|investment|stock)s?)\b\s*[:\-–]?\s*([^\n;]+)", re.I)
+UNDER_RE = re.compile(r"\b(?:under[\s-]?perform(?:er|ers|ing\s+(?:holding|investment|stock)s?)|worst[\s-]+performers?)\b"
+                      r"\s*[:\-–]?\s*([^\n;]+)", re.I)
+DIVEST_RE = re.compile(r"\b(\d+)\s+(?:divestitures?|positions?\s+(?:were\s+)?(?:divested|sold|exited))", re.I)
+NEW_POSITIONS_RE = re.compile(r"\b(\d+)\s+new\s+(?:positions?|holdings?|investments?)", re.I)
+SHIFT_RE = re.compile(r"[^.\n]*\b(?:divest|new position|shift|rebalanc|reallocat|increased|reduced)\w*[^.\n]*\.?", re.I)
+BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+)$")
+
+def academic_year(text, filename=""):
+    for source in (os.path.basename(filename), text[:4000]):
+        for match in YEAR_RE.finditer(source):
+            start, end = int(match.group(1)), match.group(2)
+            end = int(end) if len(end) == 4 else (start // 100) * 100 + int(end)
+            if end == start + 1:
+                return f"{start}-{end}"
+    return None
+
+def as_number(text):
+    return float(text.replace(",", "").replace("−", "-"))
+
+def first_number(pattern, text):
+    match = pattern.search(text)
+    return as_number(match.group(1)) if match else None
+
+def fund_value_millions(text):
+    match = FUND_VALUE_RE.search(text)
+    if not match:
+        return None
+    value, unit = as_number(match.group(1)), (match.group(2) or "").lower()
+    if unit in ("thousand", "k"):
+        return round(value / 1e3, 4)
+    if unit in ("million", "mm", "m"):
+        return value
+    # Bare dollar amounts ("$2,450,000") are converted; small bare numbers are already in millions.
+    return round(value / 1e6, 4) if value >= 1e4 else value
+
+def performer(pattern, text):
+    match = pattern.search(text)
+    if not match:
+        return None
+    # "Cisco Systems (CSCO) +19.26%, Apple (AAPL) +12%" -> first listed name
+    return re.split(r",\s+(?=[A-Z])|\s+and\s+(?=[A-Z])", match.group(1).strip(" .:"))[0].strip() or None
+
+def summary_bullets(lines, limit=6):
+    bullets = [BULLET_RE.match(line).group(1) for line in lines if BULLET_RE.match(line)]
+    if not bullets:
+        sentences = re.split(r"(?<=[.!?])\s+", " ".join(lines[1:] or lines))
+        bullets = [s for s in sentences if len(s.split()) > 4]
+    heading = lines[0].rstrip(":") if lines and len(lines[0]) <= 80 and not BULLET_RE.match(lines[0]) else "Annual Report"
+    return heading + ":\n" + "\n".join(f"- {b.strip()}" for b in bullets[:limit])
+
+def extract_record(text, filename=""):
+    year = academic_year(text, filename)
+    if year is None:
+        return None
+    lines = [line for line in text.splitlines() if line.strip()]
+    record = {
+        "Year": year,
+        "Fund_Value": fund_value_millions(text),
+        "Return": first_number(RETURN_RE, text),
+        "ESG_Score": first_number(ESG_RE, text),
+        "Divestitures": first_number(DIVEST_RE, text),
+        "New_Positions": first_number(NEW_POSITIONS_RE, text),
+        "Top_Performer": performer(TOP_RE, text),
+        "Underperformer": performer(UNDER_RE, text),
+        "Summary": summary_bullets(lines) if lines else None
+    }
+    for col, (before, after) in ALLOCATION_RES.items():
+        record[col] = first_number(before, text)
+        if record[col] is None:
+            record[col] = first_number(after, text)
+    shift = SHIFT_RE.search(text)
+    record["Key_Shifts"] = shift.group(0).strip(" -") if shift else None
+    return record
+
+# Runs in the worker processes: hash first, and only parse when the content actually changed.
+def process_file(path, known_digest=None):
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest == known_digest:
+        return digest, None, False
+    text = raw.decode("utf-8", errors="replace")
+    if os.path.splitext(path)[1].lower() in (".html", ".htm"):
+        text = html_to_text(text)
+    return digest, extract_record(text, path), True
+
+# -------------------------------------------------
+# Manifest: What Was Ingested from Which File Revision
+# -------------------------------------------------
+# -> (files: rel path -> entry, provenance: table -> {"integers", "rows": year -> {"created", "cells"}})
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}, {}
+    return manifest.get("files", {}), manifest.get("provenance", {})
+
+def save_manifest(path, files, provenance):
+    if not files and not any(table["rows"] for table in provenance.values()):
+        # Every report gone and every value reverted: nothing to remember, so no file left in data/.
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": files, "provenance": provenance}, f, indent=1)
+    write_atomic(path, write)
+
+def report_files(reports_dir):
+    found = []
+    for root, _, names in os.walk(reports_dir):
+        for name in names:
+            if name.lower().endswith(REPORT_EXTENSIONS) and not name.startswith("."):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+def scan(reports_dir, manifest, workers, force=False):
+    entries = {}
+    jobs = []
+    for path in report_files(reports_dir):
+        rel = os.path.relpath(path, reports_dir).replace(os.sep, "/")
+        stat = os.stat(path)
+        old = manifest.get(rel)
+        if not force and old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+            entries[rel] = old
+            continue
+        jobs.append((rel, path, stat, None if force or not old else old["sha256"]))
+
+    parsed = 0
+    if jobs:
+        args = ([path for _, path, _, _ in jobs], [digest for _, _, _, digest in jobs])
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(process_file, *args, chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            results = list(map(process_file, *args))
+        for (rel, _, stat, _), (digest, record, changed) in zip(jobs, results):
+            record = record if changed else manifest[rel]["record"]
+            parsed += changed
+            entries[rel] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest, "record": record}
+    removed = sorted(set(manifest) - set(entries))
+    return entries, parsed, removed
+
+# -------------------------------------------------
+# Tables: Overlay Extracted Values onto the Current data/ Tables
+# -------------------------------------------------
+def records_by_year(entries):
+    # Several files for one year (e.g. letter + appendix) merge field by field; later paths win.
+    years = {}
+    for rel in sorted(entries):
+        record = entries[rel]["record"]
+        if record is None:
+            continue
+        merged = years.setdefault(record["Year"], {})
+        merged.update({k: v for k, v in record.items() if v is not None})
+    return years
+
+def plain(value):
+    # Table cell -> JSON value for the manifest.
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+def revert(table, provenance, key="Year"):
+    # Undo a previous run: drop the rows it added, put back the cells it overwrote.
+    created = [year for year, entry in provenance.items() if entry["created"]]
+    table = table[~table[key].isin(created)].reset_index(drop=True)
+    index = {year: i for i, year in enumerate(table[key])}
+    for year, entry in provenance.items():
+        if year in index:
+            for col, value in entry["cells"].items():
+                if col in table.columns:
+                    table.at[index[year], col] = value
+    return table, index
+
+# -> (table, provenance of what this overlay wrote, for the next run's revert)
+def overlay(table, years, columns, provenance=None, key="Year"):
+    provenance = provenance or {}
+    table = table.copy() if table is not None else pd.DataFrame(columns=[key] + columns)
+    # A row added without allocations reads back as floats; the provenance remembers the integers.
+    integer_columns = {col for col in columns if col in table.columns and table[col].dtype.kind in "iu"}
+    integer_columns.update(provenance.get("integers", []))
+    for col in columns:
+        if col not in table.columns:
+            table[col] = None
+        table[col] = table[col].astype(object)
+    table, index = revert(table, provenance.get("rows", {}), key)
+    written = {}
+    new_rows = []
+    for year, record in sorted(years.items()):
+        values = {col: record[col] for col in columns if record.get(col) is not None}
+        if not values:
+            continue
+        if year in index:
+            cells = written.setdefault(year, {"created": False, "cells": {}})["cells"]
+            for col, value in values.items():
+                cells[col] = plain(table.at[index[year], col])
+                table.at[index[year], col] = value
+        else:
+            new_rows.append(dict({key: year}, **values))
+            written[year] = {"created": True, "cells": {}}
+    if new_rows:
+        table = pd.concat([table, pd.DataFrame(new_rows)], ignore_index=True)
+    table = table.sort_values(key, kind="stable").reset_index(drop=True)
+    for col in columns:
+        numeric = pd.to_numeric(table[col], errors="coerce")
+        if numeric.notna().sum() == table[col].notna().sum():
+            # Integer columns (allocations, counts) stay integers on disk, even with a gap for a new year.
+            integral = col in integer_columns and numeric.dropna().eq(numeric.dropna().round()).all()
+            table[col] = numeric.round().astype("Int64") if integral else numeric
+    return table, {"integers": sorted(integer_columns), "rows": written}
+
+# -> (tables, provenance per table)
+def build_tables(current, years, provenance=None):
+    provenance = provenance or {}
+    summary_years = {y: {"Summary": r.get("Summary")} for y, r in years.items()}
+    specs = {
+        "fund_metrics": (years, METRIC_COLUMNS),
+        "investment_shifts": (years, SHIFT_COLUMNS),
+        "top_under": (years, PERFORMER_COLUMNS),
+        "yearly_summaries": (summary_years, ["Summary"])
+    }
+    tables, written = {}, {}
+    for name, (table_years, columns) in specs.items():
+        tables[name], written[name] = overlay(current.get(name), table_years, columns, provenance.get(name))
+    return tables, written
+
+def write_atomic(path, write):
+    # The DataStore watcher must never see a half-written table.
+    tmp = f"{path}.tmp-{os.getpid()}"
+    write(tmp)
+    os.replace(tmp, path)
+
+def write_records_json(df, path):
+    records = json.loads(df.to_json(orient="records", force_ascii=False))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+
+WRITERS = {
+    ".parquet": lambda df, path: df.to_parquet(path, index=False),
+    ".feather": lambda df, path: df.to_feather(path),
+    ".arrow": lambda df, path: df.to_feather(path),
+    ".csv": lambda df, path: df.to_csv(path, index=False),
+    ".json": write_records_json
+}
+
+def write_tables(store, tables):
+    written = []
+    for name, df in tables.items():
+        path = store.table_path(name) or os.path.join(store.data_dir, name + ".csv")
+        ext = os.path.splitext(path)[1]
+        if os.path.exists(path) and READERS[ext](path).astype(str).equals(df.astype(str)):
+            continue
+        write_atomic(path, lambda tmp, df=df, ext=ext: WRITERS[ext](df, tmp))
+        written.append(os.path.basename(path))
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest annual report files into the dashboard tables.")
+    parser.add_argument("reports_dir")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="Re-parse every report, ignoring the manifest")
+    parser.add_argument("--dry-run", action="store_true", help="Print the extracted records, write nothing")
+    args = parser.parse_args(argv)
+
+    store = DataStore(data_dir=args.data_dir, reload_interval=0)
+    manifest_path = os.path.join(args.data_dir, MANIFEST_NAME)
+    manifest, provenance = load_manifest(manifest_path)
+    entries, parsed, removed = scan(args.reports_dir, manifest, args.workers, args.force)
+    skipped = [rel for rel, entry in entries.items() if entry["record"] is None]
+    print(f"{len(entries)} reports: {parsed} parsed, {len(entries) - parsed} unchanged, {len(removed)} removed")
+    for rel in skipped:
+        print(f"  no academic year found in {rel}; skipped", file=sys.stderr)
+
+    years = records_by_year(entries)
+    if args.dry_run:
+        print(json.dumps(years, indent=2, ensure_ascii=False))
+        return 0
+    if not parsed and not removed and not args.force:
+        if entries != manifest:
+            save_manifest(manifest_path, entries, provenance)   # Touched but identical: keep the new mtimes
+        print("Tables are up to date.")
+        return 0
+
+    current = {name: store.table(name) for name in ("fund_metrics", "investment_shifts", "top_under", "yearly_summaries")}
+    tables, provenance = build_tables(current, years, provenance)
+    written = write_tables(store, tables)
+    save_manifest(manifest_path, entries, provenance)
+    print(f"Updated {', '.join(written)}" if written else "Extracted values match the current tables.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
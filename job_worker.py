@@ -0,0 +1,216 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Job Workers: Claim Queued Jobs from the SQLite Queue and Run Them
+#
+# The web side (jobs.SQLiteJobManager) queues a "module:function" target and its JSON keyword
+# arguments; a worker imports just that module (projections for the Monte Carlo fan chart), calls
+# the function and stores its JSON result for whichever web worker polls next. Nothing here imports
+# Dash or the app, so a worker costs the target module's imports, not another copy of dashboard.
+#
+# Web processes start JOB_WORKERS of these with the first submitted job (each one exits with the
+# web process that started it), or run them standalone with JOB_WORKERS=0 in the web environment:
+#
+#   python job_worker.py --workers 4
+# -------------------------------------------------
+JOBS_DB = os.environ.get("JOBS_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jobs.sqlite3"))
+JOB_POLL_SECONDS = 0.1
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", str(24 * 3600)))
+
+# The queue and result cache are disposable: a file with an older layout is dropped, not migrated.
+SCHEMA_VERSION = 2
+TABLES = ("jobs", "results", "progress", "side_updates")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    fn_key TEXT NOT NULL,          -- Dash's key for the callback, to find its finish() again
+    target TEXT NOT NULL,          -- module:function the worker calls
+    args TEXT NOT NULL,            -- JSON keyword arguments
+    progress INTEGER NOT NULL,     -- 1: the target takes set_progress first
+    status TEXT NOT NULL,          -- queued | running | done | failed | cancelled
+    pid INTEGER,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY, fn_key TEXT NOT NULL, value TEXT NOT NULL, accessed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS progress (key TEXT PRIMARY KEY, value TEXT NOT NULL)
+"""
+
+ACTIVE = ("queued", "running")
+
+class JobCancelled(Exception):
+    pass
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def init_db(path):
+    conn = connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                for table in TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def dumps(value):
+    # numpy arrays and scalars (what the engines return) as plain lists and numbers.
+    def plain(obj):
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+        raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+    return json.dumps(value, default=plain)
+
+def error_value(msg, tb=""):
+    return {"background_callback_error": {"msg": msg, "tb": tb}}
+
+# -------------------------------------------------
+# Worker: Claim, Run, Store
+# -------------------------------------------------
+class Worker:
+    def __init__(self, path=JOBS_DB, expire=JOB_RESULT_TTL, parent=None):
+        self.path = path
+        self.expire = expire
+        self.parent = parent      # Web process that started this worker; None when standalone
+        init_db(path)
+        self.conn = connect(path)
+
+    def status(self, job_id):
+        row = self.conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def claim(self):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose worker died mid-run go back to the queue.
+            for job_id, pid in conn.execute("SELECT id, pid FROM jobs WHERE status = 'running'").fetchall():
+                if pid and not pid_alive(pid):
+                    conn.execute("UPDATE jobs SET status = 'queued', pid = NULL WHERE id = ?", (job_id,))
+            row = conn.execute("SELECT id, key, fn_key, target, args, progress FROM jobs WHERE status = 'queued' "
+                               "ORDER BY id LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = 'running', pid = ?, started = ? WHERE id = ?",
+                             (os.getpid(), time.time(), row[0]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def finish(self, job_id, key, fn_key, value, status):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A job cancelled while running keeps its status and stores nothing.
+            if self.status(job_id) == "running":
+                now = time.time()
+                conn.execute("INSERT OR REPLACE INTO results (key, fn_key, value, accessed) VALUES (?, ?, ?, ?)",
+                             (key, fn_key, dumps(value), now))
+                conn.execute("UPDATE jobs SET status = ?, finished = ? WHERE id = ?", (status, now, job_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def prune(self):
+        cutoff = time.time() - self.expire
+        self.conn.execute("DELETE FROM results WHERE accessed < ?", (cutoff,))
+        self.conn.execute("DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished < ?", (*ACTIVE, cutoff))
+
+    def run(self, job_id, key, fn_key, target, args, progress):
+        def set_progress(value):
+            if self.status(job_id) == "cancelled":
+                raise JobCancelled()
+            if not isinstance(value, (list, tuple)):
+                value = [value]
+            self.conn.execute("INSERT OR REPLACE INTO progress (key, value) VALUES (?, ?)", (key, dumps(value)))
+
+        try:
+            module, _, name = target.partition(":")
+            fn = getattr(importlib.import_module(module), name)
+            extra = [set_progress] if progress else []
+            value, status = fn(*extra, **json.loads(args)), "done"
+        except JobCancelled:
+            return
+        except Exception as err:
+            logger.exception("Background job %s (%s) failed", job_id, target)
+            value, status = error_value(str(err), traceback.format_exc()), "failed"
+        self.finish(job_id, key, fn_key, value, status)
+
+    def work(self):
+        last_prune = 0.0
+        while self.parent is None or os.getppid() == self.parent:
+            row = self.claim()
+            if row is None:
+                if time.time() - last_prune > 60:
+                    self.prune()
+                    last_prune = time.time()
+                time.sleep(JOB_POLL_SECONDS)
+                continue
+            self.run(*row)
+
+def start(path, parent=None):
+    # A fresh interpreter on this file: spawn-style isolation without re-importing the caller's
+    # __main__ (which multiprocessing's spawn would do for `python dashboard.py`).
+    command = [sys.executable, os.path.abspath(__file__), "--db", path, "--workers", "1"]
+    if parent is not None:
+        command += ["--parent", str(parent)]
+    return subprocess.Popen(command)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background callback job workers.")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--db", default=JOBS_DB)
+    parser.add_argument("--parent", type=int, help="Exit when this process does (set by web workers)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.workers == 1:
+        Worker(args.db, parent=args.parent).work()
+        return 0
+    processes = [start(args.db, os.getpid()) for _ in range(args.workers)]
+    for process in processes:
+        process.wait()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+
+from dash.background_callback.managers import BaseBackgroundCallbackManager
+
+import job_worker
+from job_worker import ACTIVE, JOB_RESULT_TTL, JOBS_DB, connect, dumps, pid_alive
+
+# -------------------------------------------------
+# Background Jobs: SQLite Queue + Worker Processes Behind Dash's background=True Callbacks
+#
+# A callback declared with background=True and manager=<SQLiteJobManager> returns immediately;
+# the renderer polls while a job worker (job_worker.py) does the computation. Progress, results
+# and cancellations all go through one SQLite file (WAL mode), so any web worker can answer any
+# poll and no web worker ever blocks on the computation.
+#
+# Only Dash's public BaseBackgroundCallbackManager interface is implemented here. The callback
+# body itself runs in the web request and only gathers the job's arguments; @offload names the
+# "module:function" the worker calls with them and the finish() that turns the stored result into
+# the callback's outputs when a poll picks it up:
+#
+#   @app.callback(..., background=True, manager=job_manager, progress=[...])
+#   @jobs.offload("projections:projection_job", finish=render_projection)
+#   def update_projection(horizon, preset):
+#       return {"history": ..., "allocation": ..., "horizon": horizon}
+#
+# With cache_by set, results are kept per (callback source, inputs, cache_by values) and a
+# repeat request is answered from the table without queueing anything.
+# -------------------------------------------------
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
+
+def offload(target, finish=None):
+    def decorator(fn):
+        fn.job_target = target
+        fn.job_finish = finish
+        return fn
+    return decorator
+
+def job_id(job):
+    # Polls echo the id back as a query string; a cached result has none ("None").
+    return int(job) if job is not None and str(job).isdigit() else None
+
+# -------------------------------------------------
+# Manager: the Interface Dash's Callback Wrapper Calls into
+# -------------------------------------------------
+class SQLiteJobManager(BaseBackgroundCallbackManager):
+    def __init__(self, path=JOBS_DB, cache_by=None, expire=JOB_RESULT_TTL, workers=JOB_WORKERS):
+        self.path = path
+        self.expire = expire
+        self.workers = workers
+        self._local = threading.local()
+        self._worker_pid = None
+        self._processes = []
+        job_worker.init_db(path)
+        super().__init__(cache_by)
+
+    def db(self):
+        # One connection per thread (web request threads, gthread workers).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = self._local.conn = connect(self.path)
+            self._local.pid = os.getpid()
+        return conn
+
+    def make_job_fn(self, fn, progress, key=None):
+        return JobFunction(fn, progress, key)
+
+    def call_job_fn(self, key, job_fn, args, context):
+        if self.cache_by is not None and self.result_ready(key):
+            return None    # Cached: the first poll picks the stored result up.
+        kwargs = job_fn.prepare(args)
+        self.ensure_workers()
+        cur = self.db().execute(
+            "INSERT INTO jobs (key, fn_key, target, args, progress, status, created) "
+            "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+            (key, job_fn.key, job_fn.target, dumps(kwargs), int(bool(job_fn.progress)), time.time())
+        )
+        return str(cur.lastrowid)
+
+    def job_status(self, job):
+        if job_id(job) is None:
+            return None
+        row = self.db().execute("SELECT status FROM jobs WHERE id = ?", (job_id(job),)).fetchone()
+        return row[0] if row else None
+
+    def job_running(self, job):
+        return self.job_status(job) in ACTIVE
+
+    def terminate_job(self, job):
+        # Queued jobs never start; running ones stop at their next progress report.
+        if job_id(job) is not None:
+            self.db().execute("UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status IN (?, ?)",
+                              (time.time(), job_id(job), *ACTIVE))
+
+    def terminate_unhealthy_job(self, job):
+        row = self.db().execute("SELECT status, pid FROM jobs WHERE id = ?", (job_id(job),)).fetchone()
+        if row and row[0] == "running" and row[1] and not pid_alive(row[1]):
+            self.terminate_job(job)
+            return True
+        return False
+
+    def get_progress(self, key):
+        return self._pop("progress", key)
+
+    def result_ready(self, key):
+        return self.db().execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def get_result(self, key, job):
+        conn = self.db()
+        row = conn.execute("SELECT fn_key, value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return self.UNDEFINED
+        if self.cache_by is None:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        else:
+            conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        conn.execute("DELETE FROM progress WHERE key = ?", (key,))
+        value = json.loads(row[1])
+        job_fn = self.func_registry.get(row[0])
+        failed = isinstance(value, dict) and "background_callback_error" in value
+        if failed or job_fn is None or job_fn.finish is None:
+            return value
+        return job_fn.finish(value)
+
+    def get_updated_props(self, key):
+        return {}    # Jobs run outside Dash, so they have no set_props side updates.
+
+    def _pop(self, table, key):
+        conn = self.db()
+        row = conn.execute(f"SELECT value FROM {table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        return json.loads(row[0])
+
+    def ensure_workers(self):
+        # Each web worker starts (and owns) its job workers; they exit when it does.
+        if self.workers <= 0:
+            return
+        if self._worker_pid != os.getpid():
+            self._worker_pid, self._processes = os.getpid(), []
+        self._processes = [p for p in self._processes if p.poll() is None]
+        for _ in range(self.workers - len(self._processes)):
+            self._processes.append(job_worker.start(self.path, parent=os.getpid()))
+
+class JobFunction:
+    def __init__(self, fn, progress, key):
+        self.fn = fn
+        self.progress = progress
+        self.key = key
+        self.target = getattr(fn, "job_target", None)
+        self.finish = getattr(fn, "job_finish", None)
+
+    def prepare(self, args):
+        # Runs in the web request: the callback body returns the target's keyword arguments.
+        if self.target is None:
+            raise TypeError(f"{self.fn.__name__} needs @jobs.offload(target) to run as a background job")
+        if isinstance(args, dict):
+            return self.fn(**args)
+        if isinstance(args, (list, tuple)):
+            return self.fn(*args)
+        return self.fn(args)
@@ -0,0 +1,244 @@
+import json
+import logging
+import math
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Live NAV Feed: Server-Sent Events, One Shared Log for Every Subscriber
+#
+# LIVE_FEED picks the source of (timestamp, NAV) observations:
+#   "simulated"          a seeded random walk from the latest fund value (the stand-in for tests and demos)
+#   "file:<path>"        tails a file of "timestamp,nav" CSV or {"t": ..., "nav": ...} JSON lines
+#   "tcp:<host>:<port>"  reads the same lines from a socket, reconnecting when it drops
+# Any callable(publish) works as a source: LiveFeed(source) for tests.
+#
+# Each process (every gunicorn worker) reads the feed once into a Broadcast: an append-only log of
+# the last LIVE_HISTORY observations. Every published batch is encoded as an SSE event once and the
+# same bytes go to all subscribers, who block on a single Condition (no per-client queues, no
+# polling). Browsers connect to /_live/stream with EventSource, resume with Last-Event-ID, and
+# assets/live_feed.js appends new points to the chart through extendData.
+#
+# Sizing: under gthread workers an open stream holds one worker thread for as long as the tab is
+# open, so streams are capped per process at LIVE_MAX_STREAMS, which gunicorn.conf.py sets below
+# its thread count (threads - LIVE_RESERVED_THREADS). Threads beyond the cap stay free for
+# callbacks; a stream over the cap gets 503 + Retry-After and the page retries with backoff.
+# Capacity is workers x LIVE_MAX_STREAMS viewers; past that, add workers or serve this route from a
+# separate process (e.g. `gunicorn dashboard:server` dedicated to /_live/ behind the proxy).
+# -------------------------------------------------
+LIVE_FEED = os.environ.get("LIVE_FEED", "")              # Empty: no live chart, no stream route
+LIVE_HISTORY = int(os.environ.get("LIVE_HISTORY", "5000"))   # Observations kept for (re)joining clients
+LIVE_POLL = float(os.environ.get("LIVE_POLL", "0.25"))       # File tail poll interval, seconds
+LIVE_HEARTBEAT = float(os.environ.get("LIVE_HEARTBEAT", "15"))   # Keep-alive comment on idle streams
+LIVE_SIM_INTERVAL = float(os.environ.get("LIVE_SIM_INTERVAL", "1.0"))
+LIVE_MAX_STREAMS = int(os.environ.get("LIVE_MAX_STREAMS", "200"))   # Open streams per process
+LIVE_RECONNECT = 2.0          # Seconds before restarting a failed source
+RETRY_MS = 3000               # EventSource reconnect delay
+BUSY_RETRY_SECONDS = 30       # Retry-After for a stream refused at the cap
+STREAM_PATH = "/_live/stream"
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def parse_observation(line):
+    # -> (ISO timestamp, nav), or None for blank, header and malformed lines.
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith("{"):
+            record = json.loads(line)
+            t, nav = record.get("t", record.get("timestamp")), float(record.get("nav", record.get("value")))
+        else:
+            t, nav = line.split(",")[:2]
+            nav = float(nav)
+    except (ValueError, TypeError):
+        return None
+    if isinstance(t, (int, float)) or (isinstance(t, str) and t.strip().replace(".", "", 1).isdigit()):
+        t = datetime.fromtimestamp(float(t), timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    if not t or not math.isfinite(nav):
+        return None
+    return str(t).strip(), nav
+
+# -------------------------------------------------
+# Sources: callable(publish) that run for as long as the feed does
+# -------------------------------------------------
+def simulated_feed(start_nav, interval=LIVE_SIM_INTERVAL, volatility=0.002, seed=None):
+    def run(publish):
+        rng = random.Random(seed)
+        nav = start_nav
+        while True:
+            time.sleep(interval)
+            nav *= math.exp(rng.gauss(0.0, volatility))
+            publish([(now_iso(), round(nav, 4))])
+    return run
+
+def file_feed(path, poll=LIVE_POLL):
+    def run(publish):
+        position, inode, partial = 0, None, b""
+        while True:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                time.sleep(poll)
+                continue
+            if stat.st_ino != inode or stat.st_size < position:   # Rotated or truncated: start over
+                position, inode, partial = 0, stat.st_ino, b""
+            if stat.st_size > position:
+                with open(path, "rb") as f:
+                    f.seek(position)
+                    chunk = f.read()
+                    position = f.tell()
+                lines = (partial + chunk).split(b"\n")
+                partial = lines.pop()   # A half-written last line waits for the rest
+                observations = [parse_observation(line.decode("utf-8", "replace")) for line in lines]
+                publish([o for o in observations if o is not None])
+            time.sleep(poll)
+    return run
+
+def socket_feed(host, port):
+    def run(publish):
+        while True:
+            try:
+                with socket.create_connection((host, port)) as conn, conn.makefile("r", encoding="utf-8") as lines:
+                    for line in lines:
+                        observation = parse_observation(line)
+                        if observation is not None:
+                            publish([observation])
+            except OSError as exc:
+                logger.warning("Live feed %s:%s unavailable (%s); retrying", host, port, exc)
+            time.sleep(LIVE_RECONNECT)
+    return run
+
+def feed_from_spec(spec, start_nav=100.0):
+    kind, _, target = spec.partition(":")
+    if kind == "simulated":
+        return simulated_feed(start_nav)
+    if kind == "file" and target:
+        return file_feed(target)
+    if kind == "tcp" and target:
+        host, _, port = target.rpartition(":")
+        return socket_feed(host, int(port))
+    raise ValueError(f"Unknown LIVE_FEED {spec!r} (expected simulated, file:<path> or tcp:<host>:<port>)")
+
+# -------------------------------------------------
+# Broadcast: Append-Only Log, Batches Encoded Once, Subscribers Wait on One Condition
+# -------------------------------------------------
+class Broadcast:
+    def __init__(self, history=LIVE_HISTORY, stream_id=""):
+        self.stream_id = stream_id    # Event ids from another process (or an older one) restart the client
+        self._log = deque(maxlen=history)       # (seq, t, nav)
+        self._batches = deque(maxlen=history)   # (first seq, last seq, encoded event)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def encode(self, points, reset=False):
+        payload = json.dumps({"reset": reset, "points": points}, separators=(",", ":"))
+        return f"id: {self.stream_id}:{points[-1][0]}\ndata: {payload}\n\n".encode("utf-8")
+
+    def publish(self, observations):
+        if not observations:
+            return
+        with self._cond:
+            points = []
+            for t, nav in observations:
+                self._seq += 1
+                self._log.append((self._seq, t, nav))
+                points.append([self._seq, t, nav])
+            self._batches.append((points[0][0], self._seq, self.encode(points)))
+            self._cond.notify_all()
+
+    def _events_since(self, since):
+        # Caught-up subscribers get the shared encoded batches; joiners and laggards one encoded slice.
+        if self._seq <= since:
+            return []
+        cached = []
+        for first, last, event in reversed(self._batches):
+            if last <= since:
+                break
+            cached.append((first, event))
+        if since and cached and cached[-1][0] == since + 1:
+            return [event for _, event in reversed(cached)]
+        points = [list(item) for item in self._log if item[0] > since]
+        return [self.encode(points, reset=since == 0 or points[0][0] > since + 1)]
+
+    def wait(self, since, timeout):
+        # -> (encoded events after `since`, latest seq); empty after `timeout` with nothing new.
+        with self._cond:
+            if self._seq <= since:
+                self._cond.wait(timeout)
+            return self._events_since(since), max(self._seq, since)
+
+    def resume_point(self, last_event_id):
+        stream, _, seq = (last_event_id or "").partition(":")
+        return int(seq) if stream == self.stream_id and seq.isdigit() and int(seq) <= self._seq else 0
+
+# -------------------------------------------------
+# Feed: Source Thread per Process + the SSE Route
+# -------------------------------------------------
+class LiveFeed:
+    def __init__(self, source, history=LIVE_HISTORY, max_streams=LIVE_MAX_STREAMS):
+        self.source = source
+        self.history = history
+        self.broadcast = None
+        self._streams = threading.BoundedSemaphore(max_streams)
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # Threads do not survive a fork, so each gunicorn worker reads the feed itself.
+        if self._pid == os.getpid():
+            return self.broadcast
+        with self._lock:
+            if self._pid != os.getpid():
+                self.broadcast = Broadcast(self.history, stream_id=secrets.token_hex(4))
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="live-feed", daemon=True).start()
+        return self.broadcast
+
+    def _run(self):
+        while True:
+            try:
+                self.source(self.broadcast.publish)
+            except Exception:
+                logger.exception("Live feed source failed; restarting")
+            time.sleep(LIVE_RECONNECT)
+
+    def stream(self):
+        broadcast = self.ensure_started()
+        if not self._streams.acquire(blocking=False):
+            return Response("Too many live streams\n", status=503, mimetype="text/plain",
+                            headers={"Retry-After": str(BUSY_RETRY_SECONDS), "Cache-Control": "no-cache"})
+        since = broadcast.resume_point(request.headers.get("Last-Event-ID") or request.args.get("since"))
+
+        def events():
+            nonlocal since
+            yield f"retry: {RETRY_MS}\n\n".encode("utf-8")
+            while True:
+                chunks, since = broadcast.wait(since, LIVE_HEARTBEAT)
+                if chunks:
+                    yield from chunks
+                else:
+                    yield b": keep-alive\n\n"   # Also how a closed connection is noticed
+
+        response = Response(events(), mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        response.call_on_close(self._streams.release)   # The server closes it when the client goes away
+        return response
+
+def client_script(url, max_points=LIVE_HISTORY):
+    # Inline config for assets/live_feed.js; without it the page never opens a stream.
+    return f"<script>window.dashLiveFeed = {json.dumps({'url': url, 'maxPoints': max_points})};</script>"
+
+def init_app(server, feed):
+    server.add_url_rule(STREAM_PATH, "live_stream", feed.stream)
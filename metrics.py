@@ -0,0 +1,172 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+
+# -------------------------------------------------
+# Prometheus-Style Metrics (text exposition format, no client library needed)
+#
+# Metrics are per process: with several gunicorn workers each one exposes its own /metrics,
+# so scrape every worker (or sum per-instance series in the query).
+# -------------------------------------------------
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                     for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def count(self, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1])) for k, v in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames + ('le',), labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Counter:
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def values(self):
+        with self._lock:
+            return dict(self._series)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+CALLBACK_SECONDS = Histogram("dash_callback_duration_seconds",
+                             "Wall time spent inside the callback function.",
+                             ("callback", "tab"), LATENCY_BUCKETS)
+SERIALIZATION_SECONDS = Histogram("dash_callback_serialization_seconds",
+                                  "Request time outside the callback body (JSON encoding and dispatch).",
+                                  ("callback", "tab"), LATENCY_BUCKETS)
+REQUEST_SECONDS = Histogram("dash_callback_request_seconds",
+                            "Total /_dash-update-component request time.",
+                            ("callback", "tab"), LATENCY_BUCKETS)
+RESPONSE_BYTES = Histogram("dash_callback_response_bytes",
+                           "Size of the callback response body.",
+                           ("callback", "tab"), SIZE_BUCKETS)
+CACHE_LOOKUPS = Counter("dash_callback_cache_lookups_total",
+                        "Version-keyed cache lookups made while serving a callback.",
+                        ("callback", "tab", "cache", "result"))
+FIGURE_BYTES = Counter("dash_figure_bytes_total",
+                       "Encoded size of each built figure, with the full plotly_white template vs the lean one.",
+                       ("figure", "encoding"))
+FIGURE_COMPACT_SECONDS = Histogram("dash_figure_compact_seconds",
+                                   "Time spent converting a figure to its compact form.",
+                                   ("figure",), LATENCY_BUCKETS)
+METRICS = [CALLBACK_SECONDS, SERIALIZATION_SECONDS, REQUEST_SECONDS, RESPONSE_BYTES, CACHE_LOOKUPS,
+           FIGURE_BYTES, FIGURE_COMPACT_SECONDS]
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# -------------------------------------------------
+# Hooks: Callback Decorator, Cache Recorder, and Flask Request Timing
+# -------------------------------------------------
+# `tab` is either a fixed tab id or a function of the callback's arguments (e.g. the active tab).
+def instrumented(tab=None):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if has_request_context():
+                    g.callback_name = func.__name__
+                    g.callback_tab = tab(*args, **kwargs) if callable(tab) else (tab or "")
+                    g.callback_seconds = time.perf_counter() - start
+        return wrapper
+    return decorator
+
+def record_cache(cache, hit):
+    if has_request_context():
+        g.setdefault("cache_lookups", []).append((cache, "hit" if hit else "miss"))
+
+def before_request():
+    if request.path.endswith("/_dash-update-component"):
+        g.request_start = time.perf_counter()
+
+def after_request(response):
+    start = g.get("request_start")
+    name = g.get("callback_name")
+    if start is None or name is None:
+        return response
+    total = time.perf_counter() - start
+    callback = g.get("callback_seconds", 0.0)
+    tab = g.get("callback_tab", "")
+    size = response.calculate_content_length()
+    if size is None:
+        size = len(response.get_data())
+
+    CALLBACK_SECONDS.observe(callback, name, tab)
+    SERIALIZATION_SECONDS.observe(max(total - callback, 0.0), name, tab)
+    REQUEST_SECONDS.observe(total, name, tab)
+    RESPONSE_BYTES.observe(size, name, tab)
+    timings = [f"callback;dur={callback * 1000:.2f}",
+               f"serialize;dur={max(total - callback, 0.0) * 1000:.2f}",
+               f"total;dur={total * 1000:.2f}"]
+    for cache, result in g.get("cache_lookups", []):
+        CACHE_LOOKUPS.inc(name, tab, cache, result)
+        timings.append(f'cache-{cache};desc="{result}"')
+    response.headers.add("Server-Timing", ", ".join(timings))
+    return response
+
+def metrics_view():
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+def init_app(server):
+    server.before_request(before_request)
+    server.after_request(after_request)
+    server.add_url_rule("/metrics", "metrics", metrics_view)
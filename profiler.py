@@ -0,0 +1,345 @@
+import argparse
+import collections
+import functools
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from flask import Response, has_request_context, request
+
+# -------------------------------------------------
+# Deep Profiling: Sampled Callback Stacks, Collapsed-Stack and Speedscope Output
+#
+# @profiled callbacks are sampled when PROFILE=1 (every call) or when the request carries a valid
+# X-Profile-Token (that request only). A background thread reads the profiled thread's stack every
+# PROFILE_INTERVAL seconds (sys._current_frames), so the callback itself runs untouched and nothing
+# is sampled between profiled calls. (cProfile instruments every Python call instead.) The sampler
+# does need the GIL, though: on a pure-Python loop it costs roughly 1-3% of wall time at 5 ms
+# (`python profiler.py overhead` measures it), and a CPU-bound call hands the GIL over less often
+# than the interval, so it gets fewer samples than seconds / interval (about half at 5 ms). Each
+# call's samples are therefore weighted by its own measured seconds / samples, and every output
+# reports time rather than sample counts. Profiles go into a ring buffer of the last PROFILE_BUFFER,
+# grouped by callback and input on the way out.
+#
+# Tokens are "<expires>.<HMAC-SHA256(PROFILE_SECRET)>"; /_profile needs one too (header or ?token=):
+#
+#   python profiler.py token --ttl 3600
+#   curl -H "X-Profile-Token: $TOKEN" ".../_profile?callback=render_tab_content"          # hot functions
+#   curl -H "X-Profile-Token: $TOKEN" ".../_profile?format=collapsed" | flamegraph.pl > out.svg
+#   curl -H "X-Profile-Token: $TOKEN" ".../_profile?format=speedscope" > out.json           # speedscope.app
+#
+#   python profiler.py report --cold --format collapsed   # profile every input in-process, no server
+#   python profiler.py overhead                            # wall-time cost on a pure-Python loop
+#
+# Profiles are per process, like /metrics: with several gunicorn workers each one keeps its own.
+# -------------------------------------------------
+PROFILE = os.environ.get("PROFILE", "0") == "1"
+PROFILE_SECRET = os.environ.get("PROFILE_SECRET", "")    # Unset: no tokens, /_profile is a 404
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))   # Seconds between samples
+PROFILE_BUFFER = int(os.environ.get("PROFILE_BUFFER", "512"))           # Profiles kept, oldest dropped
+TOKEN_HEADER = "X-Profile-Token"
+INPUT_REPR_MAX = 80
+TOP_FUNCTIONS = 25
+UNSAMPLED = ("(unsampled)", "", 0)   # Stands in for calls that ended before the first sample
+
+Profile = namedtuple("Profile", ["callback", "inputs", "started", "seconds", "stacks"])
+
+PROFILES = collections.deque(maxlen=PROFILE_BUFFER)
+PROFILED = set()             # Names of the @profiled callbacks
+_totals = {"seconds": 0.0}   # Profiled wall time, against which the sampler's own time is reported
+
+# -------------------------------------------------
+# Tokens: Signed, Expiring Opt-In per Request
+# -------------------------------------------------
+def sign(expires):
+    return hmac.new(PROFILE_SECRET.encode("utf-8"), f"profile:{expires}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+def make_token(ttl=3600):
+    expires = int(time.time()) + ttl
+    return f"{expires}.{sign(expires)}"
+
+def valid_token(token):
+    if not PROFILE_SECRET or not token:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, sign(int(expires)))
+
+# -------------------------------------------------
+# Sampler: One Background Thread per Process, Active Only While Profiled Calls Run
+# -------------------------------------------------
+class Sampler:
+    def __init__(self, interval):
+        self.interval = interval
+        self.busy = 0.0              # Seconds spent taking samples
+        self._targets = {}           # thread id -> (root frame, Counter of stacks)
+        self._labels = {}            # code object -> (function, file, first line)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def ensure_thread(self):
+        # Threads do not survive a fork, so each gunicorn worker starts its own sampler.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._targets.clear()
+                threading.Thread(target=self._run, name="profile-sampler", daemon=True).start()
+
+    def start(self, root):
+        # Samples the calling thread's frames below `root` until stop().
+        self.ensure_thread()
+        stacks = collections.Counter()
+        with self._lock:
+            self._targets[threading.get_ident()] = (root, stacks)
+            self._wake.set()
+        return stacks
+
+    def stop(self):
+        with self._lock:
+            self._targets.pop(threading.get_ident(), None)
+            if not self._targets:
+                self._wake.clear()
+
+    def label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+        return label
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, (root, stacks) in self._targets.items():
+                frame, stack = frames.get(ident), []
+                while frame is not None and frame is not root:
+                    stack.append(self.label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    stacks[tuple(reversed(stack))] += 1
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            start = time.perf_counter()
+            self.sample()
+            self.busy += time.perf_counter() - start
+
+sampler = Sampler(PROFILE_INTERVAL)
+
+def input_key(args, kwargs):
+    key = ", ".join([repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())])
+    return key if len(key) <= INPUT_REPR_MAX else key[:INPUT_REPR_MAX - 3] + "..."
+
+def requested():
+    return PROFILE or (has_request_context() and valid_token(request.headers.get(TOKEN_HEADER)))
+
+def profiled(func):
+    PROFILED.add(func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not requested():
+            return func(*args, **kwargs)
+        stacks = sampler.start(sys._getframe())
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            sampler.stop()
+            _totals["seconds"] += seconds
+            PROFILES.append(Profile(func.__name__, input_key(args, kwargs), time.time(), seconds, stacks))
+    return wrapper
+
+# -------------------------------------------------
+# Output: Groups by (Callback, Input), Hot Functions, Collapsed Stacks, Speedscope
+# -------------------------------------------------
+def select(callback=None, inputs=None):
+    return [p for p in list(PROFILES)
+            if (not callback or p.callback == callback) and (inputs is None or p.inputs == inputs)]
+
+def grouped(profiles):
+    # "times": seconds per stack, each call's samples scaled to that call's measured duration.
+    groups = {}
+    for p in profiles:
+        group = groups.setdefault((p.callback, p.inputs), {"calls": 0, "seconds": 0.0, "stacks": collections.Counter(),
+                                                           "times": collections.Counter()})
+        group["calls"] += 1
+        group["seconds"] += p.seconds
+        group["stacks"].update(p.stacks)
+        samples = sum(p.stacks.values())
+        if not samples:
+            group["times"][(UNSAMPLED,)] += p.seconds
+        for stack, count in p.stacks.items():
+            group["times"][stack] += count * p.seconds / samples
+    return groups
+
+def frame_name(label):
+    name, filename, line = label
+    return f"{name} ({filename}:{line})"
+
+def collapsed(profiles):
+    # Brendan Gregg's folded format: "root;caller;callee microseconds", one line per distinct stack.
+    lines = []
+    for (callback, inputs), group in sorted(grouped(profiles).items()):
+        root = f"{callback}({inputs})".replace(";", ",")
+        for stack, seconds in sorted(group["times"].items()):
+            lines.append(";".join([root] + [frame_name(label) for label in stack]) + f" {round(seconds * 1e6)}")
+    return "\n".join(lines) + "\n"
+
+def speedscope(profiles):
+    frames, index, result = [], {}, []
+    for (callback, inputs), group in sorted(grouped(profiles).items()):
+        samples, weights = [], []
+        for stack, seconds in group["times"].items():
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append({"name": label[0], "file": label[1], "line": label[2]})
+            samples.append([index[label] for label in stack])
+            weights.append(seconds)
+        result.append({"type": "sampled", "name": f"{callback}({inputs}) x{group['calls']}", "unit": "seconds",
+                       "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights})
+    return {"$schema": "https://www.speedscope.app/file-format-schema.json", "exporter": "dashboard profiler",
+            "name": "dashboard callbacks", "activeProfileIndex": 0, "shared": {"frames": frames}, "profiles": result}
+
+def hot_functions(profiles, top=TOP_FUNCTIONS):
+    groups = grouped(profiles)
+    total = sum(g["seconds"] for g in groups.values())
+    overhead = sampler.busy / _totals["seconds"] if _totals["seconds"] else 0.0
+    lines = [f"{len(profiles)} profiles (buffer {PROFILE_BUFFER}), sampled every {sampler.interval * 1000:.1f} ms, "
+             f"stack walks {overhead:.2%} of profiled time (GIL handoffs not included)", "",
+             f"{'callback(input)':<56}{'calls':>7}{'mean ms':>10}{'samples':>9}"]
+    self_times, total_times = collections.Counter(), collections.Counter()
+    for (callback, inputs), group in sorted(groups.items(), key=lambda item: -item[1]["seconds"]):
+        name = f"{callback}({inputs})"
+        samples = sum(group["stacks"].values())
+        lines.append(f"{name[:55]:<56}{group['calls']:>7}{group['seconds'] / group['calls'] * 1000:>10.2f}{samples:>9}")
+        for stack, seconds in group["times"].items():
+            self_times[stack[-1]] += seconds
+            for label in set(stack):   # Recursion counts once per sample
+                total_times[label] += seconds
+    samples = sum(sum(g["stacks"].values()) for g in groups.values())
+    lines += ["", f"hot functions ({samples} samples, {total * 1000:.1f} ms profiled; shares of profiled time)",
+              f"{'self %':>8}{'total %':>9}  function"]
+    for label, seconds in self_times.most_common(top):
+        lines.append(f"{seconds / total:>8.1%}{total_times[label] / total:>9.1%}  {frame_name(label)}")
+    return "\n".join(lines) + "\n"
+
+def profile_view():
+    if not valid_token(request.headers.get(TOKEN_HEADER) or request.args.get("token")):
+        return Response("Not Found", status=404)
+    profiles = select(request.args.get("callback"), request.args.get("input"))
+    output = request.args.get("format", "top")
+    if output == "collapsed":
+        return Response(collapsed(profiles), content_type="text/plain; charset=utf-8")
+    if output == "speedscope":
+        return Response(json.dumps(speedscope(profiles)), content_type="application/json",
+                        headers={"Content-Disposition": 'attachment; filename="dashboard.speedscope.json"'})
+    top = request.args.get("top", "")
+    return Response(hot_functions(profiles, int(top) if top.isdigit() else TOP_FUNCTIONS),
+                    content_type="text/plain; charset=utf-8")
+
+def init_app(server):
+    server.add_url_rule("/_profile", "profile", profile_view)
+
+def busy_loop(n=1_000_000):
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+def measure_overhead(calls=80):
+    # Median wall-time ratio of profiled / plain calls of a pure-Python loop, interleaved so drift
+    # (frequency scaling, neighbours) hits both sides; -> (overhead, samples taken / expected).
+    global PROFILE
+    PROFILE = True
+    profiled_loop = profiled(busy_loop)
+
+    def timed(fn):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    for _ in range(5):
+        timed(busy_loop)
+        timed(profiled_loop)
+    ratios = []
+    for i in range(calls):
+        if i % 2:
+            plain = timed(busy_loop)
+            sampled = timed(profiled_loop)
+        else:
+            sampled = timed(profiled_loop)
+            plain = timed(busy_loop)
+        ratios.append(sampled / plain)
+    taken = [sum(p.stacks.values()) * sampler.interval / p.seconds for p in select("busy_loop")]
+    return statistics.median(ratios) - 1.0, statistics.median(taken)
+
+# -------------------------------------------------
+# CLI: Mint a Token, Measure the Overhead, or Profile Every Input of the @profiled Callbacks In-Process
+# -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard callback profiler.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    token_parser = sub.add_parser("token", help="Print a signed X-Profile-Token (needs PROFILE_SECRET)")
+    token_parser.add_argument("--ttl", type=int, default=3600, help="Seconds the token stays valid")
+    report_parser = sub.add_parser("report", help="Profile every input of the profiled callbacks")
+    report_parser.add_argument("--repeat", type=int, default=20, help="Calls per input")
+    report_parser.add_argument("--cold", action="store_true", help="Clear the figure and layout caches before each call")
+    report_parser.add_argument("--format", choices=("top", "collapsed", "speedscope"), default="top")
+    overhead_parser = sub.add_parser("overhead", help="Measure the sampler's cost on a pure-Python loop")
+    overhead_parser.add_argument("--calls", type=int, default=80, help="Profiled and plain calls each")
+    args = parser.parse_args(argv)
+
+    if args.command == "overhead":
+        overhead, taken = measure_overhead(args.calls)
+        print(f"interval {sampler.interval * 1000:.1f} ms: {overhead:+.2%} wall time on a pure-Python loop, "
+              f"{taken:.0%} of the expected samples taken")
+        return
+
+    if args.command == "token":
+        if not PROFILE_SECRET:
+            parser.error("PROFILE_SECRET is not set")
+        print(make_token(args.ttl))
+        return
+
+    os.environ["PROFILE"] = "1"
+    os.environ.setdefault("CALLBACK_MODE", "sync")
+    import dashboard
+    from benchmark import callback_payload, output_key_for
+    from export_static import static_inputs
+
+    live = sys.modules["profiler"]   # The instance dashboard decorated with (this file runs as __main__)
+    client = dashboard.app.server.test_client()
+    for name, states in static_inputs(dashboard).items():
+        key = output_key_for(dashboard.app, name)
+        if key is None or name not in live.PROFILED:
+            continue
+        for state in states:
+            for _ in range(args.repeat):
+                if args.cold:
+                    dashboard.overview_cache.clear()
+                    dashboard.tab_layout_cache.clear()
+                client.post("/_dash-update-component", json=callback_payload(dashboard.app, key, list(state)))
+    profiles = live.select()
+    if args.format == "collapsed":
+        sys.stdout.write(live.collapsed(profiles))
+    elif args.format == "speedscope":
+        print(json.dumps(live.speedscope(profiles)))
+    else:
+        sys.stdout.write(live.hot_functions(profiles))
+
+if __name__ == "__main__":
+    main()
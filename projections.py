@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+# -------------------------------------------------
+# Monte Carlo Projection Engine
+#
+# Each historical year's return is de-levered by that year's risky share (Equities + Real Assets)
+# into an excess return over SAFE_RATE, then re-levered to the target allocation. Paths bootstrap
+# those excess returns year by year, so they keep the fund's own return distribution while
+# reflecting the asset mix being projected.
+# -------------------------------------------------
+SAFE_RATE = float(os.environ.get("PROJECTION_SAFE_RATE", "0.02"))   # Fixed income / cash return
+DEFAULT_PATHS = int(os.environ.get("PROJECTION_PATHS", "10000"))
+DEFAULT_SEED = 2025
+CHUNK_PATHS = 50_000          # Paths per task; also the unit of seeding, so results never depend on pooling
+PARALLEL_THRESHOLD = 1_000_000  # Below this many paths pool startup and result transfer outweigh the gain
+PERCENTILES = (5, 25, 50, 75, 95)
+
+_pool = None
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        # spawn: forking a threaded web worker can deadlock the child.
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+# -------------------------------------------------
+# Inputs: Historical (return, risky share) Pairs and Target Allocation
+# -------------------------------------------------
+def history_from_frame(df):
+    # Years with no return or no risky exposure (e.g. the all-cash launch year) carry no signal.
+    rows = df.dropna(subset=["Return"])
+    risky = (rows["Equities"] + rows["Real_Assets"]) / 100.0
+    keep = risky > 0
+    return tuple(zip((rows["Return"][keep] / 100.0).round(6), risky[keep].round(6)))
+
+def allocation_from_row(row):
+    return (float(row["Equities"]), float(row["Fixed_Income"]), float(row["Cash"]), float(row["Real_Assets"]))
+
+def risky_share(allocation):
+    equities, fixed_income, cash, real_assets = allocation
+    total = equities + fixed_income + cash + real_assets
+    return (equities + real_assets) / total if total else 0.0
+
+# -------------------------------------------------
+# Simulation: Vectorized Bootstrap per Chunk
+# -------------------------------------------------
+def simulate_chunk(excess, risky, horizon, n_paths, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    draws = rng.integers(0, len(excess), size=(n_paths, horizon))
+    growth = 1.0 + SAFE_RATE + excess[draws] * risky
+    return np.cumprod(np.maximum(growth, 0.0), axis=1)
+
+def simulate_growth(history, allocation, horizon, seed, n_paths, progress=None):
+    # progress(fraction done) runs after every chunk; an exception from it (a cancelled job) stops the run.
+    returns, risky_hist = np.array(history, dtype=np.float64).T
+    excess = (returns - SAFE_RATE) / risky_hist
+    risky = risky_share(allocation)
+    sizes = [CHUNK_PATHS] * (n_paths // CHUNK_PATHS)
+    if n_paths % CHUNK_PATHS:
+        sizes.append(n_paths % CHUNK_PATHS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(excess, risky, horizon, size, s) for size, s in zip(sizes, seeds)]
+    if n_paths >= PARALLEL_THRESHOLD and len(args) > 1:
+        futures = [get_pool().submit(simulate_chunk, *a) for a in args]
+        results = (future.result() for future in futures)
+    else:
+        futures = []
+        results = (simulate_chunk(*a) for a in args)
+    chunks, done = [], 0
+    try:
+        for size, chunk in zip(sizes, results):
+            chunks.append(chunk)
+            done += size
+            if progress is not None:
+                progress(done / n_paths)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return np.vstack(chunks)
+
+def summarize(growth, allocation, horizon, n_paths):
+    bands = np.percentile(growth, PERCENTILES, axis=0)
+    final = growth[:, -1]
+    return {
+        "horizon": horizon,
+        "allocation": allocation,
+        "n_paths": n_paths,
+        "bands": {p: tuple(band) for p, band in zip(PERCENTILES, bands)},
+        "prob_loss": float(np.mean(final < 1.0)),
+        "median_annualized": float(np.median(final) ** (1.0 / horizon) - 1.0)
+    }
+
+# -------------------------------------------------
+# Public Entry Point: Memoized per (history, allocation, horizon, seed, n_paths)
+# -------------------------------------------------
+@lru_cache(maxsize=64)
+def run_projection(history, allocation, horizon, seed=DEFAULT_SEED, n_paths=DEFAULT_PATHS):
+    return summarize(simulate_growth(history, allocation, horizon, seed, n_paths), allocation, horizon, n_paths)
+
+# Job worker entry point (job_worker.py): plain JSON in and out, and nothing imported but this module.
+# `start` ([year, fund value] the paths grow from) rides along so the chart matches the data the job
+# ran on, whatever the web process has reloaded since.
+def projection_job(set_progress, history, allocation, horizon, start=None, seed=DEFAULT_SEED, n_paths=DEFAULT_PATHS):
+    def progress(done):
+        set_progress(f"Simulated {done:.0%} of {n_paths:,} paths over {horizon} years...")
+
+    progress(0.0)
+    allocation = tuple(allocation)
+    growth = simulate_growth(tuple(map(tuple, history)), allocation, horizon, seed, n_paths, progress)
+    result = summarize(growth, allocation, horizon, n_paths)
+    return dict(result, start=start, bands={str(p): list(band) for p, band in result["bands"].items()})
+
+def future_year_labels(last_year, horizon):
+    start = int(last_year.split("-")[0])
+    return [f"{start + i}-{start + i + 1}" for i in range(1, horizon + 1)]
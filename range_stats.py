@@ -0,0 +1,134 @@
+import numpy as np
+
+# -------------------------------------------------
+# Year-Range Analytics: O(1) Queries over Prefix Aggregates
+#
+# Built once per dataset version from the chronological year rows (and the engine's daily returns
+# when holdings/prices are present). Every query is a handful of array lookups and subtractions,
+# however many years or trading days the range spans:
+#
+#   cumulative return   expm1(G[j + 1] - G[i])         G = prefix sum of log1p(return)
+#                       -100% if W[j + 1] > W[i]       W = prefix count of total losses (log1p = -inf)
+#   average allocation  (S[j + 1] - S[i]) / (N[j + 1] - N[i])   per column, missing rows excluded
+#   value growth        Fund_Value[j] / opening value
+#
+# Log-growth sums stand in for prefix products: dividing running products loses precision and
+# over- or underflows across decades of daily returns, differences of log sums do not.
+# -------------------------------------------------
+ALLOCATION_COLUMNS = ["Equities", "Fixed_Income", "Cash", "Real_Assets"]
+DAYS_PER_YEAR = 365.25
+
+def prefix(values):
+    out = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=out[1:])
+    return out
+
+def log_growth(returns):
+    # -> (prefix log growth, prefix count of total losses). A -100% period adds 0 to the log sum and
+    # 1 to the count instead of -inf, which would turn every later range into inf - inf = NaN.
+    wiped = returns <= -1.0
+    return prefix(np.log1p(np.where(wiped | np.isnan(returns), 0.0, returns))), prefix(wiped)
+
+class RangeAggregates:
+    def __init__(self, years, values, log_growth, wipeouts, return_counts, alloc_sums, alloc_counts,
+                 daily_log_growth=None, daily_wipeouts=None, day_bounds=None, day_dates=None,
+                 covered_counts=None):
+        self.years = list(years)
+        self.positions = {year: i for i, year in enumerate(self.years)}
+        self.values = values
+        self.log_growth = log_growth
+        self.wipeouts = wipeouts
+        self.return_counts = return_counts
+        self.alloc_sums = alloc_sums
+        self.alloc_counts = alloc_counts
+        self.daily_log_growth = daily_log_growth
+        self.daily_wipeouts = daily_wipeouts
+        self.day_bounds = day_bounds      # (n_years, 2) first/last day row per year, -1 if uncovered
+        self.day_dates = day_dates
+        self.covered_counts = covered_counts   # prefix count of years the daily data covers
+
+    def __len__(self):
+        return len(self.years)
+
+    @classmethod
+    def build(cls, df, daily=None):
+        # `df`: one row per year with Year, Fund_Value, Return (%) and allocation columns (%);
+        # missing returns/allocations (the launch year) are NaN and count as no data.
+        rows = df.sort_values(by="Year").reset_index(drop=True)
+        returns = rows["Return"].to_numpy(dtype=np.float64) / 100.0
+        has_return = ~np.isnan(returns)
+        growth, wipeouts = log_growth(returns)
+        alloc = rows[ALLOCATION_COLUMNS].to_numpy(dtype=np.float64)
+        has_alloc = ~np.isnan(alloc)
+        alloc_sums = np.zeros((len(rows) + 1, len(ALLOCATION_COLUMNS)))
+        np.cumsum(np.where(has_alloc, alloc, 0.0), axis=0, out=alloc_sums[1:])
+        alloc_counts = np.zeros((len(rows) + 1, len(ALLOCATION_COLUMNS)), dtype=np.int64)
+        np.cumsum(has_alloc, axis=0, out=alloc_counts[1:])
+
+        daily_log_growth = daily_wipeouts = day_bounds = day_dates = covered_counts = None
+        if daily is not None and len(daily):
+            # Daily rows are chronological, so each academic year is one contiguous block.
+            day_years = daily["Year"].to_numpy()
+            labels, first = np.unique(day_years, return_index=True)
+            last = len(day_years) - 1 - np.unique(day_years[::-1], return_index=True)[1]
+            position = {year: i for i, year in enumerate(rows["Year"])}
+            day_bounds = np.full((len(rows), 2), -1, dtype=np.int64)
+            for label, lo, hi in zip(labels, first, last):
+                if label in position:
+                    day_bounds[position[label]] = (lo, hi)
+            covered_counts = prefix(day_bounds[:, 0] >= 0)
+            daily_log_growth, daily_wipeouts = log_growth(daily["return"].to_numpy(dtype=np.float64))
+            day_dates = np.asarray(daily["date"].to_numpy(), dtype="datetime64[D]")
+
+        return cls(rows["Year"], rows["Fund_Value"].to_numpy(dtype=np.float64), growth, wipeouts,
+                   prefix(has_return), alloc_sums, alloc_counts, daily_log_growth, daily_wipeouts,
+                   day_bounds, day_dates, covered_counts)
+
+    def span(self, start_year, end_year):
+        i, j = self.positions[start_year], self.positions[end_year]
+        return (i, j) if i <= j else (j, i)
+
+    def daily_span(self, i, j):
+        # Daily chaining only when the engine covers every year of the range.
+        if self.covered_counts is None or self.covered_counts[j + 1] - self.covered_counts[i] < j - i + 1:
+            return None
+        return int(self.day_bounds[i, 0]), int(self.day_bounds[j, 1])
+
+    def query(self, start_year, end_year):
+        i, j = self.span(start_year, end_year)
+        return_years = int(self.return_counts[j + 1] - self.return_counts[i])
+        cumulative = float(np.expm1(self.log_growth[j + 1] - self.log_growth[i]))
+        if self.wipeouts[j + 1] > self.wipeouts[i]:
+            cumulative = -1.0
+        period_years = float(return_years)
+        source = "yearly"
+
+        days = self.daily_span(i, j)
+        if days is not None:
+            lo, hi = days
+            cumulative = float(np.expm1(self.daily_log_growth[hi + 1] - self.daily_log_growth[lo]))
+            if self.daily_wipeouts[hi + 1] > self.daily_wipeouts[lo]:
+                cumulative = -1.0
+            # The first day's return is measured from the previous close, so the span starts there.
+            opening = self.day_dates[lo - 1] if lo > 0 else self.day_dates[lo]
+            period_years = max(float((self.day_dates[hi] - opening).astype(np.int64)), 1.0) / DAYS_PER_YEAR
+            source = "daily"
+
+        annualized = (1.0 + cumulative) ** (1.0 / period_years) - 1.0 if period_years > 0 else None
+        opening_value = self.values[i - 1] if i > 0 else self.values[i]
+        counts = self.alloc_counts[j + 1] - self.alloc_counts[i]
+        sums = self.alloc_sums[j + 1] - self.alloc_sums[i]
+        allocation = {col: (float(s / n) if n else None) for col, s, n in zip(ALLOCATION_COLUMNS, sums, counts)}
+        return {
+            "start": self.years[i],
+            "end": self.years[j],
+            "years": j - i + 1,
+            "return_years": return_years,
+            "source": source,
+            "cumulative_return": cumulative if return_years or source == "daily" else None,
+            "annualized_return": annualized if return_years or source == "daily" else None,
+            "opening_value": float(opening_value),
+            "closing_value": float(self.values[j]),
+            "value_growth": float(self.values[j] / opening_value - 1.0) if opening_value else None,
+            "allocation": allocation
+        }
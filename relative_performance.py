@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from returns_engine import academic_year_label, academic_year_start, as_dates
+
+# -------------------------------------------------
+# Benchmark-Relative Performance: Excess Return, Tracking Error, Beta, IR and Capture Ratios
+#
+# Benchmarks are optional tables under data/benchmarks/ (see data_store.TABLE_DIRECTORIES), either
+#   Year, Return        -- academic-year returns in percent, like fund_metrics
+#   date, close         -- index levels at any frequency (daily closes, month ends, ...)
+# When the holdings engine provides daily fund returns and the benchmark has levels, both are
+# aligned on the fund's trading calendar (last close on or before each day); otherwise the two
+# yearly return series are matched by academic year. Window statistics at every observation come
+# from prefix sums, so a rolling window costs the same as the full history.
+# -------------------------------------------------
+TRADING_DAYS = 252
+WINDOWS = {"1": 1, "3": 3, "5": 5, "all": None}   # Label -> years (None: since inception)
+DEFAULT_WINDOW = "3"
+
+COLUMNS = ["fund_return", "benchmark_return", "excess_return", "observations", "annualized_excess",
+           "tracking_error", "beta", "information_ratio", "up_capture", "down_capture"]
+
+def benchmark_name(table_name):
+    return table_name.split("/", 1)[-1]
+
+# -------------------------------------------------
+# Benchmark Series: Yearly Returns and (When Given) Index Levels
+# -------------------------------------------------
+def benchmark_levels(table):
+    if "date" not in table.columns or "close" not in table.columns:
+        return None
+    dates = as_dates(table["date"])
+    order = np.argsort(dates, kind="stable")
+    return dates[order], table["close"].to_numpy(dtype=np.float64)[order]
+
+def benchmark_yearly(table):
+    # -> Series of academic-year returns (fractions) indexed by year label.
+    if "Year" in table.columns and "Return" in table.columns:
+        return pd.Series(table["Return"].to_numpy(dtype=np.float64) / 100.0, index=table["Year"].to_numpy())
+    dates, close = benchmark_levels(table)
+    ay = academic_year_start(dates)
+    ends = np.concatenate([np.flatnonzero(np.diff(ay)), [len(ay) - 1]])
+    # Each year runs from the previous year's last close (the first year from its own first close).
+    starts = np.concatenate([[0], ends[:-1]])
+    return pd.Series(close[ends] / close[starts] - 1.0, index=[academic_year_label(y) for y in ay[ends]])
+
+def aligned_returns(df, daily, table):
+    # -> (fund returns, benchmark returns, year label per observation, periods per year)
+    levels = benchmark_levels(table)
+    if daily is not None and len(daily) and levels is not None:
+        dates = np.asarray(daily["date"].to_numpy(), dtype="datetime64[D]")
+        bench_dates, close = levels
+        pos = np.searchsorted(bench_dates, dates, side="right") - 1
+        level = np.where(pos >= 0, close[np.maximum(pos, 0)], np.nan)
+        bench = np.concatenate([[np.nan], level[1:] / level[:-1] - 1.0])
+        fund = daily["return"].to_numpy(dtype=np.float64)
+        labels = daily["Year"].to_numpy()
+        periods = TRADING_DAYS
+    else:
+        rows = df.sort_values(by="Year")
+        bench = benchmark_yearly(table).reindex(rows["Year"]).to_numpy(dtype=np.float64)
+        fund = rows["Return"].to_numpy(dtype=np.float64) / 100.0
+        labels = rows["Year"].to_numpy()
+        periods = 1
+    keep = ~(np.isnan(fund) | np.isnan(bench))
+    return fund[keep], bench[keep], labels[keep], periods
+
+# -------------------------------------------------
+# Window Statistics at Every Observation from Prefix Sums
+# -------------------------------------------------
+def prefix(values):
+    out = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=out[1:])
+    return out
+
+def window_stats(fund, bench, periods, window):
+    # window: observations per window (None: expanding). Windows not yet full are NaN.
+    n_obs = len(fund)
+    ends = np.arange(1, n_obs + 1)
+    starts = np.zeros(n_obs, dtype=np.int64) if window is None else np.maximum(ends - window, 0)
+    active = fund - bench
+    up, down = bench > 0, bench < 0
+
+    def total(values):
+        sums = prefix(values)
+        return sums[ends] - sums[starts]
+
+    n = (ends - starts).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sx, sy, sa = total(fund), total(bench), total(active)
+        active_var = (total(active ** 2) - sa ** 2 / n) / (n - 1)
+        tracking_error = np.sqrt(np.maximum(active_var, 0.0)) * np.sqrt(periods)
+        beta = (total(fund * bench) - sx * sy / n) / (total(bench ** 2) - sy ** 2 / n)
+        information_ratio = (sa / n) * periods / tracking_error
+        years = n / periods
+        annualized_excess = (np.expm1(total(np.log1p(fund)) / years)
+                             - np.expm1(total(np.log1p(bench)) / years))
+        up_capture = (total(fund * up) / total(up)) / (total(bench * up) / total(up))
+        down_capture = (total(fund * down) / total(down)) / (total(bench * down) / total(down))
+    stats = {
+        "observations": n,
+        "annualized_excess": annualized_excess,
+        "tracking_error": np.where(n > 1, tracking_error, np.nan),
+        "beta": np.where(n > 1, beta, np.nan),
+        "information_ratio": np.where(n > 1, information_ratio, np.nan),
+        "up_capture": up_capture,
+        "down_capture": down_capture
+    }
+    if window is not None:
+        for values in stats.values():
+            values[ends < window] = np.nan
+    return {k: np.where(np.isfinite(v), v, np.nan) for k, v in stats.items()}
+
+# -------------------------------------------------
+# Relative Table: One Row per Year (Returns for That Year, Window Stats Ending There)
+# -------------------------------------------------
+def relative_table(df, daily, table, window_years):
+    years = sorted(df["Year"])
+    result = pd.DataFrame(np.nan, index=pd.Index(years, name="Year"), columns=COLUMNS)
+    fund_yearly = df.set_index("Year")["Return"].astype(np.float64) / 100.0
+    bench_yearly = benchmark_yearly(table)
+    result["fund_return"] = fund_yearly.reindex(result.index)
+    result["benchmark_return"] = bench_yearly.groupby(level=0).last().reindex(result.index)
+    result["excess_return"] = result["fund_return"] - result["benchmark_return"]
+
+    fund, bench, labels, periods = aligned_returns(df, daily, table)
+    if len(fund) == 0:
+        return result
+    stats = window_stats(fund, bench, periods, None if window_years is None else window_years * periods)
+    unique, reversed_first = np.unique(labels[::-1], return_index=True)
+    last = len(labels) - 1 - reversed_first
+    rows = result.index.get_indexer(unique)
+    found = rows >= 0
+    for column, values in stats.items():
+        result.iloc[rows[found], result.columns.get_loc(column)] = values[last[found]]
+    return result
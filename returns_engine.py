@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Holdings-Level Return Engine
+#
+# Inputs (optional tables in data/, see data_store.TABLES):
+#   holdings:   date, ticker, shares   -- position as of `date`, carried forward until the next entry
+#   prices:     date, ticker, close    -- the trading calendar is the set of price dates
+#   cash_flows: date, amount           -- external contributions (+) and withdrawals (-)
+# Ticker "CASH" is valued at 1.0 per share unless it has prices of its own.
+# -------------------------------------------------
+CASH_TICKER = "CASH"
+MWR_ITERATIONS = 50
+
+def academic_year_start(dates):
+    # July-June academic years: 2019-07-01 .. 2020-06-30 belongs to "2019-2020".
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    years = months // 12 + 1970
+    return np.where(months % 12 >= 6, years, years - 1)
+
+def academic_year_label(start):
+    return f"{start}-{start + 1}"
+
+def ffill_rows(mat):
+    # Forward-fill NaNs down each column without a Python loop; leading NaNs stay NaN.
+    rows = np.where(np.isnan(mat), 0, np.arange(mat.shape[0])[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return mat[rows, np.arange(mat.shape[1])]
+
+def as_dates(series):
+    # Parse each distinct date once (a few thousand) instead of every row (millions).
+    codes, uniques = pd.factorize(series)
+    return pd.to_datetime(uniques).to_numpy(dtype="datetime64[D]")[codes]
+
+# -------------------------------------------------
+# Daily NAV: Dense (dates x tickers) Share and Price Matrices
+# -------------------------------------------------
+def daily_nav(holdings, prices):
+    date_codes, date_uniques = pd.factorize(prices["date"])
+    price_days = pd.to_datetime(date_uniques).to_numpy(dtype="datetime64[D]")
+    calendar = np.unique(price_days)
+    price_rows = np.searchsorted(calendar, price_days)[date_codes]
+    ticker_codes, tickers = pd.factorize(pd.concat([prices["ticker"], holdings["ticker"]], ignore_index=True))
+    tickers = np.asarray(tickers, dtype=object)
+    price_tickers = ticker_codes[:len(prices)]
+    holding_tickers = ticker_codes[len(prices):]
+    shape = (len(calendar), len(tickers))
+
+    price_mat = np.full(shape, np.nan)
+    price_mat[price_rows, price_tickers] = prices["close"].to_numpy(dtype=np.float64)
+    price_mat = ffill_rows(price_mat)
+    cash_col = np.flatnonzero(tickers == CASH_TICKER)
+    if len(cash_col):
+        price_mat[:, cash_col[0]] = np.where(np.isnan(price_mat[:, cash_col[0]]), 1.0, price_mat[:, cash_col[0]])
+
+    # A holding dated on a non-trading day takes effect on the next trading day; later rows win.
+    holding_dates = as_dates(holdings["date"])
+    order = np.argsort(holding_dates, kind="stable")
+    rows = np.searchsorted(calendar, holding_dates[order])
+    keep = rows < len(calendar)
+    shares_mat = np.full(shape, np.nan)
+    shares_mat[rows[keep], holding_tickers[order][keep]] = holdings["shares"].to_numpy(dtype=np.float64)[order][keep]
+    shares_mat = np.nan_to_num(ffill_rows(shares_mat), nan=0.0)
+
+    nav = np.einsum("ij,ij->i", shares_mat, np.nan_to_num(price_mat, nan=0.0))
+    return calendar, nav
+
+def daily_flows(calendar, cash_flows):
+    flows = np.zeros(len(calendar))
+    if cash_flows is not None and len(cash_flows):
+        rows = np.searchsorted(calendar, as_dates(cash_flows["date"]))
+        keep = rows < len(calendar)
+        np.add.at(flows, rows[keep], cash_flows["amount"].to_numpy(dtype=np.float64)[keep])
+    return flows
+
+def daily_returns(nav, flows):
+    # Flows are assumed to arrive at the close, so they are stripped from the day's change.
+    prev = np.concatenate([[np.nan], nav[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (nav - flows) / prev - 1.0
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
+
+# -------------------------------------------------
+# Money-Weighted Return: Newton Solve for Every Academic Year at Once
+# -------------------------------------------------
+def money_weighted_returns(begin_values, end_values, flow_amounts, flow_times, periods):
+    # Solves  B (1+r)^T + sum_k F_k (1+r)^tau_k = E  per row, with tau_k the years from flow k to period end.
+    # flow_amounts / flow_times are padded (years x max_flows) matrices; padding has zero amount.
+    r = np.where(begin_values > 0, (end_values / np.where(begin_values > 0, begin_values, 1.0)) ** (1.0 / periods) - 1.0, 0.0)
+    r = np.nan_to_num(r)
+    for _ in range(MWR_ITERATIONS):
+        growth = 1.0 + r
+        f = (begin_values * growth ** periods
+             + (flow_amounts * growth[:, None] ** flow_times).sum(axis=1) - end_values)
+        df = (begin_values * periods * growth ** (periods - 1)
+              + (flow_amounts * flow_times * growth[:, None] ** (flow_times - 1)).sum(axis=1))
+        step = np.divide(f, df, out=np.zeros_like(f), where=df != 0)
+        r = np.clip(r - step, -0.9999, None)
+        if np.all(np.abs(step) < 1e-10):
+            break
+    return r
+
+# -------------------------------------------------
+# Academic-Year Aggregates
+# -------------------------------------------------
+def compute_performance(holdings, prices, cash_flows=None):
+    calendar, nav = daily_nav(holdings, prices)
+    flows = daily_flows(calendar, cash_flows)
+    returns = daily_returns(nav, flows)
+
+    ay = academic_year_start(calendar)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(ay)) + 1])
+    ends = np.concatenate([starts[1:], [len(calendar)]]) - 1
+
+    # Time-weighted: chain daily returns inside each year in one reduceat over log growth.
+    twr = np.expm1(np.add.reduceat(np.log1p(returns), starts))
+
+    # Money-weighted: begin at the prior year's closing NAV (or the first NAV), flows in between.
+    begin_values = np.where(starts > 0, nav[np.maximum(starts - 1, 0)], nav[starts])
+    begin_dates = np.where(starts > 0, calendar[np.maximum(starts - 1, 0)], calendar[starts])
+    end_values = nav[ends]
+    periods = np.maximum((calendar[ends] - begin_dates).astype(np.float64), 1.0) / 365.25
+
+    year_of_day = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    # Flows on the very first day are already inside the opening NAV.
+    has_flow = flows != 0
+    has_flow[0] = False
+    flow_year = year_of_day[has_flow]
+    counts = np.bincount(flow_year, minlength=len(starts))
+    width = max(int(counts.max()) if len(counts) else 0, 1)
+    slot = np.arange(len(flow_year)) - np.repeat(np.cumsum(counts) - counts, counts)
+    flow_amounts = np.zeros((len(starts), width))
+    flow_times = np.zeros((len(starts), width))
+    flow_amounts[flow_year, slot] = flows[has_flow]
+    flow_times[flow_year, slot] = (calendar[ends][flow_year] - calendar[has_flow]).astype(np.float64) / 365.25
+    mwr = money_weighted_returns(begin_values, end_values, flow_amounts, flow_times, periods)
+
+    yearly = pd.DataFrame({
+        "Year": [academic_year_label(y) for y in ay[starts]],
+        "Fund_Value": end_values / 1e6,
+        "Return": twr * 100.0,
+        "MWR": mwr * 100.0,
+        "Days": ends - starts + 1
+    })
+    years, year_codes = np.unique(ay, return_inverse=True)
+    daily = pd.DataFrame({
+        "date": calendar,
+        "Year": np.array([academic_year_label(y) for y in years])[year_codes],
+        "nav": nav,
+        "flow": flows,
+        "return": returns
+    })
+    return yearly, daily
+
+# Replace the hand-entered Fund_Value / Return with computed values for every year the engine covers.
+def apply_performance(df, yearly):
+    df = df.copy()
+    computed = yearly.set_index("Year")
+    hit = df["Year"].isin(computed.index)
+    df.loc[hit, "Fund_Value"] = computed.loc[df.loc[hit, "Year"], "Fund_Value"].to_numpy().round(2)
+    df.loc[hit, "Return"] = computed.loc[df.loc[hit, "Year"], "Return"].to_numpy().round(2)
+    return df
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Risk Analytics: Volatility, Drawdown, Sharpe/Sortino and VaR/CVaR per Academic Year
+#
+# Every metric is evaluated "as of" the end of each year over the return history up to then, so
+# the overview can show the row for whichever year is selected. The series is the engine's daily
+# returns when holdings/prices are loaded (annualized with 252 periods), otherwise the yearly
+# Return column. Expanding and rolling moments come from prefix sums, drawdowns from running
+# maxima, and bootstrap resamples run as batched (samples x observations) matrices.
+# -------------------------------------------------
+RISK_FREE_RATE = float(os.environ.get("RISK_FREE_RATE", "0.02"))   # Annual
+CONFIDENCE = 0.95
+BOOTSTRAP_SAMPLES = int(os.environ.get("RISK_BOOTSTRAP_SAMPLES", "1000"))
+BOOTSTRAP_SEED = 2025
+BOOTSTRAP_BATCH_CELLS = 4_000_000   # Resampled returns held at once (32 MB of float64)
+ROLLING_YEARS = 3
+TRADING_DAYS = 252
+
+COLUMNS = ["observations", "volatility", "rolling_volatility", "max_drawdown", "current_drawdown",
+           "sharpe", "sortino", "var", "cvar", "bootstrap_var", "bootstrap_cvar"]
+
+def return_series(df, daily=None):
+    # -> (returns as fractions, year label per observation, periods per year)
+    if daily is not None and len(daily):
+        return daily["return"].to_numpy(dtype=np.float64), daily["Year"].to_numpy(), TRADING_DAYS
+    rows = df.sort_values(by="Year").dropna(subset=["Return"])
+    return rows["Return"].to_numpy(dtype=np.float64) / 100.0, rows["Year"].to_numpy(), 1
+
+def prefix(values):
+    out = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=out[1:])
+    return out
+
+# -------------------------------------------------
+# Moments and Drawdowns at Every Observation
+# -------------------------------------------------
+def window_std(s1, s2, ends, starts):
+    # Sample standard deviation of returns[starts:ends] from prefix sums of r and r**2.
+    n = (ends - starts).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (s1[ends] - s1[starts]) / n
+        var = (s2[ends] - s2[starts] - n * mean ** 2) / (n - 1)
+    return np.where(n > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+def drawdowns(returns):
+    # Wealth starts at 1 before the first observation, so an initial loss is a drawdown too.
+    log_wealth = np.cumsum(np.log1p(returns))
+    peak = np.maximum.accumulate(np.maximum(log_wealth, 0.0))
+    drawdown = np.expm1(log_wealth - peak)
+    return drawdown, np.minimum.accumulate(drawdown)
+
+# -------------------------------------------------
+# Value at Risk: Historical Quantiles and Batched Bootstrap
+# -------------------------------------------------
+def tail_risk(samples, alpha):
+    # samples: (..., n) -> VaR and CVaR (expected loss beyond VaR) along the last axis, as positive losses.
+    cutoff = np.quantile(samples, alpha, axis=-1, keepdims=True)
+    tail = samples <= cutoff
+    cvar = np.sum(np.where(tail, samples, 0.0), axis=-1) / np.maximum(tail.sum(axis=-1), 1)
+    return -cutoff[..., 0], -cvar
+
+def bootstrap_tail_risk(returns, alpha, n_samples, rng):
+    # Resamples run as (batch x observations) matrices, batched so daily histories stay bounded.
+    batch = max(BOOTSTRAP_BATCH_CELLS // len(returns), 1)
+    var_sum = cvar_sum = 0.0
+    for start in range(0, n_samples, batch):
+        draws = rng.integers(0, len(returns), size=(min(batch, n_samples - start), len(returns)))
+        var, cvar = tail_risk(returns[draws], alpha)
+        var_sum += var.sum()
+        cvar_sum += cvar.sum()
+    return var_sum / n_samples, cvar_sum / n_samples
+
+# -------------------------------------------------
+# Risk Table: One Row per Year, Metrics over History up to That Year's Last Observation
+# -------------------------------------------------
+def risk_table(df, daily=None, risk_free=RISK_FREE_RATE, confidence=CONFIDENCE,
+               n_samples=BOOTSTRAP_SAMPLES, seed=BOOTSTRAP_SEED):
+    returns, labels, periods = return_series(df, daily)
+    years = sorted(df["Year"])
+    table = pd.DataFrame(np.nan, index=pd.Index(years, name="Year"), columns=COLUMNS)
+    if len(returns) == 0:
+        return table
+
+    n = len(returns)
+    excess = returns - ((1.0 + risk_free) ** (1.0 / periods) - 1.0)
+    s1, s2 = prefix(returns), prefix(returns ** 2)
+    e1, d2 = prefix(excess), prefix(np.minimum(excess, 0.0) ** 2)
+    ends = np.arange(1, n + 1)
+    window = ROLLING_YEARS * periods
+
+    annualize = np.sqrt(periods)
+    volatility = window_std(s1, s2, ends, np.zeros(n, dtype=np.int64)) * annualize
+    rolling = window_std(s1, s2, ends, np.maximum(ends - window, 0)) * annualize
+    rolling[ends < window] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_excess = e1[ends] / ends
+        excess_std = window_std(e1, prefix(excess ** 2), ends, np.zeros(n, dtype=np.int64))
+        downside = np.sqrt(d2[ends] / ends)
+        # No dispersion (or no excess return below zero yet) leaves the ratio undefined, not infinite.
+        sharpe = np.where(excess_std > 0, mean_excess / excess_std, np.nan) * annualize
+        sortino = np.where(downside > 0, mean_excess / downside, np.nan) * annualize
+    drawdown, max_drawdown = drawdowns(returns)
+
+    # Last observation of each year with data; earlier years keep NaN rows.
+    unique, reversed_first = np.unique(np.asarray(labels)[::-1], return_index=True)
+    last = dict(zip(unique, n - 1 - reversed_first))
+    alpha = 1.0 - confidence
+    rng = np.random.default_rng(seed)
+    for year in years:
+        if year not in last:
+            continue
+        i = last[year]
+        history = returns[:i + 1]
+        var, cvar = tail_risk(history, alpha)
+        boot_var, boot_cvar = bootstrap_tail_risk(history, alpha, n_samples, rng)
+        table.loc[year] = [i + 1, volatility[i], rolling[i], max_drawdown[i], drawdown[i],
+                           sharpe[i], sortino[i], var, cvar, boot_var, boot_cvar]
+    return table
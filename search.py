@@ -0,0 +1,253 @@
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+import zlib
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:    # faiss-cpu is optional; the same exact inner-product search runs in NumPy
+    faiss = None
+
+# -------------------------------------------------
+# Report Search: BM25 Inverted Index + Vector Index over Locally Computed Embeddings
+#
+# Passages are the bullets of every yearly summary, each year's Key_Shifts and the insight rows.
+# Embeddings are hashed word and character n-gram TF-IDF vectors reduced by a truncated SVD
+# (latent semantic analysis), so they need no model download or network. Keyword and vector
+# rankings are merged with reciprocal rank fusion.
+#
+# Indexes are persisted under SEARCH_INDEX_DIR/<corpus hash>/ and memory-mapped on load, so
+# every worker shares the pages and a restart with unchanged reports rebuilds nothing.
+# -------------------------------------------------
+INDEX_DIR = os.environ.get("SEARCH_INDEX_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), ".search_index"))
+HASH_BUCKETS = 4096
+EMBED_RANK = 128
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+CANDIDATES = 50
+MIN_SIMILARITY = 0.15   # Vector-only hits below this are n-gram noise, not related passages
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the this to was were "
+    "with which while during over than their them they our we".split()
+)
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+# -------------------------------------------------
+# Corpus: Year Passages from Summaries, Investment Shifts and Insights
+# -------------------------------------------------
+def report_passages(yearly_summaries, df_shifts, df_insights):
+    docs = []
+    for year in sorted(yearly_summaries):
+        heading = ""
+        for line in str(yearly_summaries[year]).splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith("-"):
+                heading = line.rstrip(":")
+                continue
+            docs.append({"year": year, "source": heading or "Summary", "text": line.lstrip("- ").strip()})
+    for year, shift in zip(df_shifts["Year"], df_shifts["Key_Shifts"]):
+        docs.append({"year": year, "source": "Investment shifts", "text": str(shift)})
+    for category, insight in zip(df_insights["Category"], df_insights["Key Insights"]):
+        docs.append({"year": category, "source": "Insights", "text": str(insight)})
+    return docs
+
+def corpus_key(docs):
+    payload = json.dumps([HASH_BUCKETS, EMBED_RANK, docs], sort_keys=True).encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+# -------------------------------------------------
+# Embeddings: Hashed N-Gram TF-IDF, Projected onto the Corpus's Top Singular Vectors
+# -------------------------------------------------
+def hashed_counts(text):
+    # crc32 rather than hash(): bucket ids must be identical in every process and run.
+    tokens = tokenize(text)
+    features = tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]
+    for token in tokens:
+        padded = f"<{token}>"
+        features.extend(padded[i:i + 4] for i in range(max(len(padded) - 3, 1)))
+    counts = np.zeros(HASH_BUCKETS, dtype=np.float32)
+    if features:
+        buckets = [zlib.crc32(f.encode("utf-8")) % HASH_BUCKETS for f in features]
+        np.add.at(counts, buckets, 1.0)
+    return counts
+
+def weigh(counts, feature_idf):
+    weighted = np.log1p(counts) * feature_idf
+    norm = np.linalg.norm(weighted, axis=-1, keepdims=True)
+    return weighted / np.where(norm > 0, norm, 1.0)
+
+def normalize_rows(mat):
+    norm = np.linalg.norm(mat, axis=-1, keepdims=True)
+    return np.ascontiguousarray(mat / np.where(norm > 0, norm, 1.0), dtype=np.float32)
+
+# -------------------------------------------------
+# Search Index: Build, Persist, Memory-Map, Query
+# -------------------------------------------------
+class SearchIndex:
+    ARRAYS = ("indptr", "postings", "tf", "doc_len", "feature_idf", "projection", "vectors")
+
+    def __init__(self, docs, vocab, indptr, postings, tf, doc_len, feature_idf, projection, vectors):
+        self.docs = docs
+        self.vocab = vocab if isinstance(vocab, dict) else {term: i for i, term in enumerate(vocab)}
+        self.indptr = indptr
+        self.postings = postings
+        self.tf = tf
+        self.doc_len = doc_len
+        self.avg_len = float(np.mean(doc_len)) if len(doc_len) else 1.0
+        self.feature_idf = feature_idf
+        self.projection = projection
+        self.vectors = vectors
+        self.faiss_index = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    @classmethod
+    def build(cls, docs):
+        # Inverted index as CSR arrays: postings[indptr[t]:indptr[t + 1]] are the docs holding term t.
+        term_docs = {}
+        doc_len = np.zeros(len(docs), dtype=np.float32)
+        for i, doc in enumerate(docs):
+            tokens = tokenize(doc["text"])
+            doc_len[i] = len(tokens)
+            for term in tokens:
+                counts = term_docs.setdefault(term, {})
+                counts[i] = counts.get(i, 0) + 1
+        vocab = sorted(term_docs)
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(term_docs[t]) for t in vocab])
+        postings = np.fromiter((d for t in vocab for d in term_docs[t]), dtype=np.int32, count=int(indptr[-1]))
+        tf = np.fromiter((c for t in vocab for c in term_docs[t].values()), dtype=np.float32, count=int(indptr[-1]))
+
+        counts = np.stack([hashed_counts(doc["text"]) for doc in docs]) if docs else np.zeros((0, HASH_BUCKETS), np.float32)
+        df = np.count_nonzero(counts, axis=0)
+        feature_idf = (np.log((1.0 + len(docs)) / (1.0 + df)) + 1.0).astype(np.float32)
+        weighted = weigh(counts, feature_idf)
+        if len(docs):
+            _, _, vt = np.linalg.svd(weighted, full_matrices=False)
+            projection = np.ascontiguousarray(vt[:EMBED_RANK].T, dtype=np.float32)
+        else:
+            projection = np.zeros((HASH_BUCKETS, 0), dtype=np.float32)
+        vectors = normalize_rows(weighted @ projection)
+        return cls(docs, vocab, indptr, postings, tf, doc_len, feature_idf, projection, vectors)
+
+    def save(self, path):
+        root = os.path.dirname(path)
+        os.makedirs(root, exist_ok=True)
+        # Write to a scratch directory and rename it into place, so a concurrent reader (another
+        # worker) sees either no index or a complete one.
+        scratch = tempfile.mkdtemp(dir=root, prefix=".build-")
+        try:
+            with open(os.path.join(scratch, "docs.json"), "w", encoding="utf-8") as f:
+                json.dump(self.docs, f, ensure_ascii=False)
+            with open(os.path.join(scratch, "vocab.json"), "w", encoding="utf-8") as f:
+                json.dump(sorted(self.vocab, key=self.vocab.get), f, ensure_ascii=False)
+            for name in self.ARRAYS:
+                np.save(os.path.join(scratch, f"{name}.npy"), getattr(self, name))
+            if faiss is not None:
+                faiss.write_index(self.vector_index(), os.path.join(scratch, "vectors.faiss"))
+            os.rename(scratch, path)
+        except OSError:
+            shutil.rmtree(scratch, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "docs.json"), encoding="utf-8") as f:
+            docs = json.load(f)
+        with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+            vocab = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in cls.ARRAYS}
+        index = cls(docs, vocab, **arrays)
+        faiss_path = os.path.join(path, "vectors.faiss")
+        if faiss is not None and os.path.exists(faiss_path):
+            try:
+                index.faiss_index = faiss.read_index(faiss_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                index.faiss_index = faiss.read_index(faiss_path)
+        return index
+
+    def vector_index(self):
+        if self.faiss_index is None and faiss is not None:
+            self.faiss_index = faiss.IndexFlatIP(self.vectors.shape[1])
+            if len(self.vectors):
+                self.faiss_index.add(np.ascontiguousarray(self.vectors, dtype=np.float32))
+        return self.faiss_index
+
+    def embed(self, text):
+        # Not re-normalized after projection: a query whose n-grams the corpus never uses keeps
+        # only a sliver of its norm in the subspace, so it cannot score as a strong match.
+        return np.ascontiguousarray(weigh(hashed_counts(text), self.feature_idf) @ self.projection, dtype=np.float32)
+
+    def bm25_scores(self, terms):
+        n = len(self.docs)
+        scores = np.zeros(n, dtype=np.float32)
+        for term in set(terms):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            lo, hi = self.indptr[t], self.indptr[t + 1]
+            docs, tf = self.postings[lo:hi], self.tf[lo:hi]
+            idf = math.log(1.0 + (n - (hi - lo) + 0.5) / ((hi - lo) + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_len[docs] / self.avg_len)
+            scores[docs] += idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+        return scores
+
+    def vector_search(self, text, k):
+        k = min(k, len(self.docs))
+        if k == 0 or self.vectors.shape[1] == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        query = self.embed(text)
+        index = self.vector_index()
+        if index is not None:
+            similarity, rows = index.search(query.reshape(1, -1), k)
+            return rows[0], similarity[0]
+        similarity = self.vectors @ query
+        rows = np.argsort(-similarity, kind="stable")[:k]
+        return rows, similarity[rows]
+
+    def search(self, text, limit=10):
+        terms = tokenize(text)
+        if not terms or not self.docs:
+            return []
+        bm25 = self.bm25_scores(terms)
+        keyword_rows = np.argsort(-bm25, kind="stable")[:CANDIDATES]
+        keyword_rows = keyword_rows[bm25[keyword_rows] > 0]
+        vector_rows, similarity = self.vector_search(text, CANDIDATES)
+
+        fused = {}
+        for rank, row in enumerate(keyword_rows):
+            fused[int(row)] = fused.get(int(row), 0.0) + 1.0 / (RRF_K + rank + 1)
+        for rank, (row, sim) in enumerate(zip(vector_rows, similarity)):
+            if row >= 0 and sim >= MIN_SIMILARITY:
+                fused[int(row)] = fused.get(int(row), 0.0) + 1.0 / (RRF_K + rank + 1)
+        sim_by_row = dict(zip(vector_rows.tolist(), similarity.tolist()))
+        ranked = sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [dict(self.docs[row], score=score, bm25=float(bm25[row]), similarity=sim_by_row.get(row, 0.0))
+                for row, score in ranked]
+
+def load_or_build(docs, root=INDEX_DIR):
+    path = os.path.join(root, corpus_key(docs))
+    if os.path.isdir(path):
+        return SearchIndex.load(path)
+    index = SearchIndex.build(docs)
+    try:
+        index.save(path)
+        return SearchIndex.load(path)
+    except OSError:
+        # Read-only deployments still get an in-memory index.
+        return index
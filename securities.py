@@ -0,0 +1,85 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Security Index: Performer Text Parsed Once into (Name, Ticker, Return) Rows + Ticker -> Rows Index
+#
+# "Cisco Systems (CSCO) +19.26%" -> Name "Cisco Systems", Ticker "CSCO", Return 19.26. Entries with
+# no ticker ("Hanes Brand -7%") are keyed by their upper-cased name. A cell may list several
+# positions separated by ";" or newlines, so full position-level lists load the same way.
+# Rows are grouped by security in CSR form (order + indptr): a lookup slices one block instead of
+# scanning any strings.
+# -------------------------------------------------
+PERFORMER_RE = re.compile(
+    r"^\s*(?P<name>.*?)\s*(?:\((?P<ticker>[A-Za-z0-9.\-]{1,12})\))?\s*(?:(?P<ret>[+\-−]?\d+(?:\.\d+)?)\s*%?)?\s*$"
+)
+ROLES = {"Top_Performer": "Top", "Underperformer": "Under"}
+MISSING = {"", "N/A", "NA", "NONE", "-"}
+SEPARATORS = r"\s*(?:;|\n)\s*"
+
+def parse_performer(text):
+    # -> (name, ticker or None, return in percent or None); None for an empty/"N/A" cell.
+    # "Apple Inc. (AAPL)" with no return still keys by its ticker.
+    text = str(text).strip()
+    if text.upper() in MISSING:
+        return None
+    match = PERFORMER_RE.match(text)
+    if match is None:
+        return text, None, None
+    ret = float(match.group("ret").replace("−", "-")) if match.group("ret") else None
+    return match.group("name").strip() or text, match.group("ticker"), ret
+
+def security_key(name, ticker):
+    return ticker.upper() if ticker else re.sub(r"\s+", " ", name).upper()
+
+def performer_records(df_top_under, roles=ROLES):
+    records = []
+    for column, role in roles.items():
+        if column not in df_top_under.columns:
+            continue
+        for year, cell in zip(df_top_under["Year"], df_top_under[column]):
+            for text in re.split(SEPARATORS, str(cell)):
+                parsed = parse_performer(text)
+                if parsed is None:
+                    continue
+                name, ticker, ret = parsed
+                records.append((year, role, name, ticker, ret, security_key(name, ticker)))
+    frame = pd.DataFrame(records, columns=["Year", "Role", "Name", "Ticker", "Return", "Key"])
+    return frame.sort_values(["Year", "Role"], kind="stable").reset_index(drop=True)
+
+class SecurityIndex:
+    def __init__(self, records):
+        self.records = records
+        codes, keys = pd.factorize(records["Key"])
+        self.keys = np.asarray(keys, dtype=object)
+        self.codes = {key: i for i, key in enumerate(self.keys)}
+        self.order = np.argsort(codes, kind="stable")
+        self.indptr = np.zeros(len(self.keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(self.keys)), out=self.indptr[1:])
+        # Most recent name per security labels it (names drift: "Mastercard" / "Mastercard Inc.").
+        latest = np.full(len(self.keys), -1, dtype=np.int64)
+        np.maximum.at(latest, codes, np.arange(len(codes)))
+        self.names = records["Name"].to_numpy(dtype=object)[latest] if len(codes) else np.array([], dtype=object)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, df_top_under):
+        return cls(performer_records(df_top_under))
+
+    def securities(self):
+        # -> [(key, label, appearances)] sorted by label, for pickers.
+        counts = np.diff(self.indptr)
+        labels = [(key, f"{name} ({key})" if name.upper() != key else name, n)
+                  for key, name, n in zip(self.keys, self.names, counts)]
+        return sorted(labels, key=lambda item: item[1].lower())
+
+    def lookup(self, key):
+        # Every year/role the security appeared in, oldest first.
+        code = self.codes.get(str(key).upper())
+        if code is None:
+            return self.records.iloc[:0]
+        return self.records.iloc[self.order[self.indptr[code]:self.indptr[code + 1]]]
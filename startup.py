@@ -0,0 +1,184 @@
+import argparse
+import functools
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+# -------------------------------------------------
+# Cold Start: Lazy Imports, Prebuilt Cache Snapshot, Boot-Time Report
+#
+# STARTUP_MODE="snapshot" (default) defers plotly.express until a figure is actually built, and
+# loads the serialized overview figures, tab layouts and benchmark charts for the current dataset
+# version and code from SNAPSHOT_DIR instead of rebuilding them. The first boot that misses writes
+# the snapshot, so every later worker, restart and autoscaled instance reads it; build one ahead of
+# time as a deploy step with:
+#
+#   python startup.py snapshot
+#
+# STARTUP_MODE="eager" imports everything up front and rebuilds every cache on boot.
+# With `gunicorn --preload` (see gunicorn.conf.py) the master does all of this once and the
+# workers share the pages copy-on-write.
+#
+#   python startup.py report --output boot.json     # import-time and boot-phase report per release
+# -------------------------------------------------
+HERE = os.path.dirname(os.path.abspath(__file__))
+STARTUP_MODE = os.environ.get("STARTUP_MODE", "snapshot")
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR", os.path.join(HERE, ".snapshot"))
+SNAPSHOTS_KEPT = 4
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+BOOT_PHASES = {}   # phase -> seconds, in boot order
+_last_mark = time.perf_counter()
+
+# Time since the previous mark (the first one: since this module was imported) -> BOOT_PHASES[name].
+def mark(name):
+    global _last_mark
+    now = time.perf_counter()
+    BOOT_PHASES[name] = now - _last_mark
+    _last_mark = now
+
+def lazy_import(name):
+    # Module object whose import runs on first attribute access (eager in STARTUP_MODE="eager").
+    if STARTUP_MODE == "eager" or name in sys.modules:
+        return importlib.import_module(name)
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+# -------------------------------------------------
+# Snapshot: Serialized Cache Entries per (Dataset Version, Code Fingerprint)
+# -------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(settings=()):
+    # Sources, library versions and the settings that shape the layout all invalidate snapshots.
+    import dash
+    import plotly
+    digest = hashlib.sha256(f"{dash.__version__}|{plotly.__version__}|{settings!r}".encode("utf-8"))
+    for path in sorted(glob.glob(os.path.join(HERE, "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+@functools.lru_cache(maxsize=None)
+def source_fingerprint(names, settings=()):
+    # Narrower than code_fingerprint for results only the named modules shape (risk.py -> risk table).
+    digest = hashlib.sha256(repr(settings).encode("utf-8"))
+    for name in names:
+        with open(os.path.join(HERE, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def snapshot_path(version, fingerprint, root=SNAPSHOT_DIR):
+    return os.path.join(root, f"{version}-{fingerprint}.json")
+
+def enabled(root=SNAPSHOT_DIR):
+    return STARTUP_MODE == "snapshot" and bool(root)
+
+def write_snapshot(path, caches):
+    # caches: name -> {key tuple: JSON-serializable value (figures, components, strings)}
+    from figure_json import dumps
+    payload = dumps({name: [[list(key), value] for key, value in cache.items()] for name, cache in caches.items()})
+    root = os.path.dirname(path)
+    os.makedirs(root, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=root, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(payload)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)   # Atomic: concurrent booting workers never read a partial file
+    for old in sorted(glob.glob(os.path.join(root, "*.json")), key=os.path.getmtime)[:-SNAPSHOTS_KEPT]:
+        os.remove(old)
+
+def read_snapshot(path):
+    from figure_json import loads
+    try:
+        with open(path, "rb") as f:
+            payload = loads(f.read())
+    except (OSError, ValueError):
+        return None
+    return {name: {tuple(key): value for key, value in entries} for name, entries in payload.items()}
+
+# -------------------------------------------------
+# Report: Import Times (python -X importtime) and Boot Phases, Cold and from the Snapshot
+# -------------------------------------------------
+BOOT_PROBE = """
+import json, time
+start = time.perf_counter()
+import dashboard, startup
+print(json.dumps({"boot": time.perf_counter() - start, "phases": startup.BOOT_PHASES}))
+"""
+
+def parse_import_times(stderr):
+    # -> {top-level module: cumulative seconds} for the modules dashboard imports directly.
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if match and len(match.group(3)) <= 3:
+            modules[match.group(4)] = int(match.group(2)) / 1e6
+    return modules
+
+def probe(snapshot_dir):
+    env = dict(os.environ, DASHBOARD_SNAPSHOT_DIR=snapshot_dir, CALLBACK_MODE=os.environ.get("CALLBACK_MODE", "sync"))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", BOOT_PROBE], cwd=HERE, env=env,
+                            capture_output=True, text=True, check=True)
+    boot = json.loads(result.stdout.strip().splitlines()[-1])
+    boot["imports"] = parse_import_times(result.stderr)
+    return boot
+
+def release():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return os.environ.get("RELEASE", "unknown")
+
+def report(top=15):
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        cold = probe(snapshot_dir)       # Empty snapshot dir: builds everything and writes it
+        warm = probe(snapshot_dir)       # Loads what the cold boot wrote
+    return {"release": release(), "startup_mode": STARTUP_MODE, "python": sys.version.split()[0],
+            "cold": cold, "snapshot": warm,
+            "slowest_imports": sorted(warm["imports"].items(), key=lambda item: -item[1])[:top]}
+
+def print_report(result):
+    print(f"release {result['release']} ({result['startup_mode']} mode, Python {result['python']})")
+    print(f"{'phase':<24}{'cold (s)':>12}{'snapshot (s)':>14}")
+    for name in result["cold"]["phases"]:
+        print(f"{name:<24}{result['cold']['phases'][name]:>12.3f}{result['snapshot']['phases'].get(name, 0.0):>14.3f}")
+    print(f"{'import dashboard':<24}{result['cold']['boot']:>12.3f}{result['snapshot']['boot']:>14.3f}")
+    print("\nslowest imports (cumulative, snapshot boot):")
+    for name, seconds in result["slowest_imports"]:
+        print(f"  {name:<40}{seconds:>8.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard cold-start tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("snapshot", help="Build the cache snapshot for the current data and code")
+    report_parser = sub.add_parser("report", help="Measure import and boot times, cold and from a snapshot")
+    report_parser.add_argument("--output", help="Write the JSON report here")
+    report_parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        start = time.perf_counter()
+        import dashboard
+        print(f"{dashboard.snapshot_file(dashboard.current_frames)} ({time.perf_counter() - start:.2f}s)")
+        return
+    result = report(args.top)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
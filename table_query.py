@@ -0,0 +1,150 @@
+import math
+import operator
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Filter Parsing: Dash DataTable filter_query Syntax ({col} op value && ...)
+# -------------------------------------------------
+FILTER_OPERATORS = [
+    ["ge ", ">="],
+    ["le ", "<="],
+    ["lt ", "<"],
+    ["gt ", ">"],
+    ["ne ", "!="],
+    ["eq ", "="],
+    ["contains "],
+    ["datestartswith "]
+]
+
+COMPARISONS = {
+    "ge": operator.ge,
+    "le": operator.le,
+    "lt": operator.lt,
+    "gt": operator.gt,
+    "ne": operator.ne,
+    "eq": operator.eq
+}
+
+def split_filter_part(filter_part):
+    for operator_type in FILTER_OPERATORS:
+        for op in operator_type:
+            if op in filter_part:
+                name_part, value_part = filter_part.split(op, 1)
+                name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+                value_part = value_part.strip()
+                if not value_part:
+                    return None, None, None
+                v0 = value_part[0]
+                if v0 == value_part[-1] and v0 in ("'", '"', "`") and len(value_part) > 1:
+                    value = value_part[1:-1].replace("\\" + v0, v0)
+                elif operator_type[0] in ("contains ", "datestartswith "):
+                    value = value_part
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+def parse_filter_query(filter_query):
+    clauses = []
+    for part in (filter_query or "").split(" && "):
+        name, op, value = split_filter_part(part)
+        if name is not None:
+            clauses.append((name, op, value))
+    return clauses
+
+# -------------------------------------------------
+# Table Index: Per-Column Sort Orders and Codes, Built Once per Dataset Version
+# -------------------------------------------------
+class TableIndex:
+    def __init__(self, frame, display=None):
+        # `frame` drives sorting and filtering; rows are rendered from `display` (same row order).
+        self.frame = frame.reset_index(drop=True)
+        self.display = (display if display is not None else frame).reset_index(drop=True)
+        self.columns = list(self.frame.columns)
+        self._codes = {}
+        self._orders = {}
+        self._sorted_values = {}
+        self._text = {}
+        for col in self.columns:
+            codes, uniques = pd.factorize(self.frame[col], sort=True)
+            # Missing values sort last in both directions.
+            missing = codes < 0
+            codes = codes.astype(np.int64)
+            codes[missing] = len(uniques)
+            desc_codes = len(uniques) - 1 - codes
+            desc_codes[missing] = len(uniques)
+            self._codes[col] = (codes, desc_codes)
+            self._orders[col] = (np.argsort(codes, kind="stable"), np.argsort(desc_codes, kind="stable"))
+            if self.frame[col].dtype.kind in "fiu":
+                values = self.frame[col].to_numpy(dtype=np.float64)
+                order = self._orders[col][0]
+                self._sorted_values[col] = values[order[:np.count_nonzero(~missing)]]
+
+    def __len__(self):
+        return len(self.frame)
+
+    def text(self, col):
+        if col not in self._text:
+            self._text[col] = self.frame[col].astype(str).str.lower()
+        return self._text[col]
+
+    def column_mask(self, col, op, value):
+        n = len(self.frame)
+        if col not in self._codes:
+            return np.ones(n, dtype=bool)
+        if op == "contains":
+            return self.text(col).str.contains(str(value).lower(), regex=False).to_numpy()
+        if op == "datestartswith":
+            return self.text(col).str.startswith(str(value).lower()).to_numpy()
+        if col in self._sorted_values and isinstance(value, float) and op != "ne":
+            # Range lookup on the pre-sorted values: O(log n) bounds plus one scatter into the mask.
+            sorted_values = self._sorted_values[col]
+            lo, hi = 0, len(sorted_values)
+            if op == "ge":
+                lo = np.searchsorted(sorted_values, value, side="left")
+            elif op == "gt":
+                lo = np.searchsorted(sorted_values, value, side="right")
+            elif op == "le":
+                hi = np.searchsorted(sorted_values, value, side="right")
+            elif op == "lt":
+                hi = np.searchsorted(sorted_values, value, side="left")
+            elif op == "eq":
+                lo = np.searchsorted(sorted_values, value, side="left")
+                hi = np.searchsorted(sorted_values, value, side="right")
+            mask = np.zeros(n, dtype=bool)
+            mask[self._orders[col][0][lo:hi]] = True
+            return mask
+        values = self.frame[col]
+        if values.dtype.kind not in "fiu" or not isinstance(value, float):
+            values, value = self.text(col), str(value).lower()
+        return COMPARISONS[op](values, value).to_numpy()
+
+    def sorted_rows(self, sort_by):
+        sort_by = [s for s in (sort_by or []) if s.get("column_id") in self._codes]
+        if not sort_by:
+            return np.arange(len(self.frame))
+        if len(sort_by) == 1:
+            col = sort_by[0]["column_id"]
+            return self._orders[col][sort_by[0].get("direction") == "desc"]
+        # np.lexsort treats the last key as primary.
+        keys = [self._codes[s["column_id"]][s.get("direction") == "desc"] for s in reversed(sort_by)]
+        return np.lexsort(keys)
+
+    def query(self, page_current=0, page_size=20, sort_by=None, filter_query=""):
+        rows = self.sorted_rows(sort_by)
+        clauses = parse_filter_query(filter_query)
+        if clauses:
+            mask = np.ones(len(self.frame), dtype=bool)
+            for col, op, value in clauses:
+                mask &= self.column_mask(col, op, value)
+            rows = rows[mask[rows]]
+        page_size = page_size or len(rows) or 1
+        page_count = max(1, math.ceil(len(rows) / page_size))
+        start = (page_current or 0) * page_size
+        page = self.display.iloc[rows[start:start + page_size]]
+        return page.to_dict("records"), page_count
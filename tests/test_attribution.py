@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import attribution
+
+CLASSES = ["Equities", "Cash"]
+POLICY = pd.DataFrame({"Asset_Class": CLASSES, "Weight": [60.0, 40.0], "Return": [10.0, 2.0]})
+# Policy return each year: 0.6 * 10% + 0.4 * 2% = 6.8%.
+FUND = pd.DataFrame({
+    "Year": ["2019-2020", "2020-2021", "2021-2022"],
+    "Return": [np.nan, 9.0, 5.0],
+    "Equities": [np.nan, 70.0, 50.0],
+    "Cash": [np.nan, 30.0, 50.0]
+})
+SEGMENTS = pd.DataFrame({"Year": ["2020-2021"] * 2, "Asset_Class": CLASSES, "Return": [12.0, 2.0]})
+
+def build(fund=FUND, segments=SEGMENTS):
+    return attribution.Attribution.build(fund, POLICY, {}, segments, classes=CLASSES)
+
+def test_brinson_fachler_effects_for_a_reported_year():
+    result = build()
+    assert result.years == ["2020-2021", "2021-2022"]    # The launch year has no inputs
+    assert result.benchmark_return == pytest.approx([0.068, 0.068])
+    # Equities: overweight by 10 points in a class beating the policy (+3.2 points), 2 points of selection.
+    assert result.allocation[0] == pytest.approx([0.1 * 0.032, -0.1 * -0.048])
+    assert result.selection[0] == pytest.approx([0.6 * 0.02, 0.0])
+    assert result.interaction[0] == pytest.approx([0.1 * 0.02, 0.0])
+    assert not result.estimated[0].any()
+
+def test_missing_segment_returns_are_estimated_from_the_total():
+    result = build()
+    # 50/50 at policy returns explains 6%, the fund made 5%: each class is 1 point below its policy return.
+    assert result.rp[1] == pytest.approx([0.09, 0.01])
+    assert result.estimated[1].all()
+    assert result.selection[1] == pytest.approx([0.6 * -0.01, 0.4 * -0.01])
+
+def test_effects_add_up_to_the_excess_return_each_year():
+    result = build()
+    total = result.allocation.sum(axis=1) + result.selection.sum(axis=1) + result.interaction.sum(axis=1)
+    assert total == pytest.approx([0.09 - 0.068, 0.05 - 0.068])
+
+@pytest.mark.parametrize("method", attribution.LINKING_METHODS)
+def test_linked_effects_add_up_to_the_cumulative_excess(method):
+    linked = build().linked("2019-2020", "2021-2022", method)
+    assert (linked["start"], linked["end"], linked["years"]) == ("2020-2021", "2021-2022", 2)
+    assert linked["fund_return"] == pytest.approx(1.09 * 1.05 - 1)
+    assert linked["benchmark_return"] == pytest.approx(1.068 ** 2 - 1)
+    assert linked["estimated"]
+    assert linked["effects"].to_numpy().sum() == pytest.approx(1.09 * 1.05 - 1.068 ** 2)
+
+def test_carino_coefficients():
+    rp, rb = np.array([0.09, 0.05]), np.array([0.068, 0.068])
+    k = (math.log(1.09 * 1.05) - math.log(1.068 ** 2)) / (1.09 * 1.05 - 1.068 ** 2)
+    expected = [(math.log(1.09) - math.log(1.068)) / 0.022 / k, (math.log(1.05) - math.log(1.068)) / -0.018 / k]
+    assert attribution.carino_factors(rp, rb) == pytest.approx(expected)
+
+def test_menchero_coefficients():
+    rp, rb = np.array([0.09, 0.05]), np.array([0.068, 0.068])
+    cp, cb = 1.09 * 1.05 - 1, 1.068 ** 2 - 1
+    m = ((cp - cb) / 2) / (math.sqrt(1 + cp) - math.sqrt(1 + cb))
+    diff = np.array([0.022, -0.018])
+    expected = m + (cp - cb - m * diff.sum()) / np.sum(diff ** 2) * diff
+    assert attribution.menchero_factors(rp, rb) == pytest.approx(expected)
+
+@pytest.mark.parametrize("method", attribution.LINKING_METHODS)
+def test_matching_the_policy_links_to_zero(method):
+    fund = FUND.assign(Return=[np.nan, 6.8, 6.8], Equities=[np.nan, 60.0, 60.0], Cash=[np.nan, 40.0, 40.0])
+    effects = build(fund, None).linked("2020-2021", "2021-2022", method)["effects"].to_numpy()
+    assert np.isfinite(effects).all()
+    assert effects == pytest.approx(np.zeros((2, 3)))
+
+def test_single_year_and_empty_ranges():
+    result = build()
+    single = result.linked("2020-2021", "2020-2021")
+    assert single["effects"]["selection"].tolist() == pytest.approx(result.selection[0])
+    assert result.linked("2019-2020", "2019-2020") is None
@@ -0,0 +1,103 @@
+import os
+import shutil
+
+import pytest
+
+from data_store import DataStore
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+@pytest.fixture
+def data(tmp_path):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    return tmp_path / "data"
+
+@pytest.fixture
+def store(data, tmp_path):
+    store = DataStore(data_dir=str(data), reload_interval=0, columnar_dir=str(tmp_path / "columnar"))
+    store.snapshot()
+    return store
+
+def write(path, text):
+    # A fresh mtime even when two writes land within the filesystem's timestamp resolution.
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000 if os.path.exists(path) else None
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+def edit_fund_value(data, value):
+    path = data / "fund_metrics.csv"
+    lines = path.read_text().splitlines()
+    fields = lines[-1].split(",")
+    fields[1] = value
+    write(path, "\n".join(lines[:-1] + [",".join(fields)]) + "\n")
+
+def test_edit_publishes_a_new_version(data, store):
+    version = store.version
+    assert store.reload() is False
+    edit_fund_value(data, "9.99")
+    assert store.reload() is True
+    assert store.version != version
+    assert store.table("fund_metrics")["Fund_Value"].iloc[-1] == 9.99
+
+def test_touched_file_keeps_the_version(data, store):
+    version = store.version
+    path = data / "fund_metrics.csv"
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+    assert store.reload() is False
+    assert store.version == version
+    assert store.snapshot().files["fund_metrics"].mtime_ns == mtime
+
+def test_directory_tables_come_and_go(data, store):
+    write(data / "benchmarks" / "msci.csv", "Year,Return\n2020-2021,5.0\n")
+    assert store.reload() is True
+    assert store.table("benchmarks/msci")["Return"].tolist() == [5.0]
+    os.remove(data / "benchmarks" / "msci.csv")
+    assert store.reload() is True
+    assert store.table("benchmarks/msci") is None
+
+def test_bad_revision_keeps_the_previous_table(data, store):
+    version = store.version
+    write(data / "top_under.csv", '"unterminated\n')
+    with pytest.raises(Exception):
+        store.reload()
+    # The same bad revision is not read again; the old table keeps being served.
+    assert store.reload() is False
+    assert store.version == version
+    assert "Top_Performer" in store.table("top_under").columns
+
+def test_bad_new_table_does_not_block_other_updates(data, store):
+    version = store.version
+    write(data / "benchmarks" / "bad.json", "{not json")
+    with pytest.raises(ValueError):
+        store.reload()
+    edit_fund_value(data, "9.99")
+    assert store.reload() is True
+    assert store.version != version
+    assert store.table("fund_metrics")["Fund_Value"].iloc[-1] == 9.99
+    assert store.table("benchmarks/bad") is None
+    # Fixed in place, it loads like any new table.
+    write(data / "benchmarks" / "bad.json", '[{"Year": "2020-2021", "Return": 1.5}]')
+    assert store.reload() is True
+    assert store.table("benchmarks/bad")["Return"].tolist() == [1.5]
+
+def test_listener_rejection_keeps_the_published_snapshot(data, store):
+    def reject(snapshot):
+        if snapshot.tables["fund_metrics"]["Fund_Value"].iloc[-1] < 0:
+            raise ValueError("negative fund value")
+    store.add_listener(reject)
+    version = store.version
+    edit_fund_value(data, "-1")
+    with pytest.raises(ValueError):
+        store.reload()
+    assert store.reload() is False
+    assert store.version == version
+    edit_fund_value(data, "9.99")
+    assert store.reload() is True
+
+def test_missing_required_table(data, tmp_path):
+    os.remove(data / "top_under.csv")
+    store = DataStore(data_dir=str(data), reload_interval=0, columnar_dir=str(tmp_path / "columnar"))
+    with pytest.raises(FileNotFoundError, match="top_under"):
+        store.snapshot()
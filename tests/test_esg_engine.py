@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from esg_engine import ESGEngine, apply_esg
+
+HOLDINGS = pd.DataFrame({
+    "date": ["2020-12-31", "2020-12-31", "2020-12-31", "2021-07-15"],
+    "ticker": ["AAA", "BBB", "CCC", "AAA"],
+    "shares": [10.0, 20.0, 5.0, 10.0]
+})
+PRICES = pd.DataFrame({
+    "date": ["2020-12-30", "2020-12-31", "2020-01-01", "2021-07-01"],
+    "ticker": ["AAA", "BBB", "CCC", "AAA"],
+    "close": [10.0, 5.0, 20.0, 12.0]
+})
+# CCC has no scores: it counts towards coverage, not towards the averages.
+SCORES = pd.DataFrame({"ticker": ["AAA", "BBB"], "E": [60.0, 30.0], "S": [70.0, 40.0], "G": [80.0, 50.0]})
+
+@pytest.fixture
+def engine():
+    return ESGEngine.build(HOLDINGS, PRICES, SCORES)
+
+def test_scores_are_weighted_by_market_value(engine):
+    frame = engine.scores_by_date()
+    # 2020-12-31: AAA, BBB and CCC each worth 100.
+    first = frame.iloc[0]
+    assert (first["E_Score"], first["S_Score"], first["G_Score"]) == pytest.approx((45.0, 55.0, 65.0))
+    assert first["ESG_Score"] == pytest.approx(55.0)
+    assert first["Coverage"] == pytest.approx(2 / 3)
+    # 2021-07-15: AAA revalued to 120, the others carried forward.
+    second = frame.iloc[1]
+    assert second["ESG_Score"] == pytest.approx((120 * 70 + 100 * 40) / 220)
+    assert second["Coverage"] == pytest.approx(220 / 320)
+
+def test_yearly_scores_replace_the_hand_entered_ones(engine):
+    yearly = engine.yearly()
+    assert yearly["Year"].tolist() == ["2020-2021", "2021-2022"]
+    df = pd.DataFrame({"Year": ["2019-2020", "2020-2021"], "ESG_Score": [80.0, 81.0]})
+    assert apply_esg(df, yearly)["ESG_Score"].tolist() == [80.0, 55.0]
+
+def test_positions_for_one_observation(engine):
+    positions = engine.positions(0)
+    assert sorted(positions["ticker"]) == ["AAA", "BBB", "CCC"]
+    assert positions["weight"].tolist() == pytest.approx([1 / 3] * 3)
+    assert positions.set_index("ticker")["scored"].to_dict() == {"AAA": True, "BBB": True, "CCC": False}
+
+def test_what_if_reweights_one_observation(engine):
+    sold = engine.what_if({"BBB": 0}, row=0)
+    assert sold["esg"] == pytest.approx(70.0)
+    assert sold["coverage"] == pytest.approx(0.5)
+    assert sold["base_esg"] == pytest.approx(55.0)
+    doubled = engine.what_if({"AAA": 2, "ZZZ": 0}, row=0)    # Unknown tickers are ignored
+    assert doubled["esg"] == pytest.approx((200 * 70 + 100 * 40) / 300)
+
+def test_selling_everything_leaves_no_score(engine):
+    unscored = engine.what_if({"AAA": 0, "BBB": 0}, row=0)
+    assert unscored["esg"] is None
+    assert unscored["pillars"] == {"E": None, "S": None, "G": None}
+    assert unscored["coverage"] == 0.0
+    empty = engine.what_if({"AAA": 0, "BBB": 0, "CCC": 0}, row=0)
+    assert (empty["esg"], empty["coverage"]) == (None, None)
+    assert empty["base_esg"] == pytest.approx(55.0)
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import ingest
+
+REPORT = """Annual Report 2030-2031
+Total fund value of $12.5 million. The fund returned 7.5% for the year.
+Allocation: 60% equities, 30% fixed income, 10% cash.
+ESG score: 71
+Top performer: Cisco Systems (CSCO) +19.26%, Apple (AAPL) +12%
+Underperformer: Intel (INTC) -8%
+We made 3 new positions and 2 divestitures.
+"""
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def test_extract_record():
+    record = ingest.extract_record(REPORT)
+    assert record["Year"] == "2030-2031"
+    assert record["Fund_Value"] == 12.5
+    assert record["Return"] == 7.5
+    assert (record["Equities"], record["Fixed_Income"], record["Cash"], record["Real_Assets"]) == (60, 30, 10, None)
+    assert record["ESG_Score"] == 71
+    assert record["Top_Performer"] == "Cisco Systems (CSCO) +19.26%"
+    assert record["Underperformer"] == "Intel (INTC) -8%"
+    assert (record["New_Positions"], record["Divestitures"]) == (3, 2)
+    assert record["Summary"].startswith("Annual Report 2030-2031:\n- ")
+
+@pytest.mark.parametrize("text, filename, expected", [
+    ("", "reports/2019-20.html", "2019-2020"),
+    ("Fiscal 2021/2022 report", "", "2021-2022"),
+    ("1999-2000 review", "", "1999-2000"),
+    ("2020-2022 was two years", "", None),
+])
+def test_academic_year(text, filename, expected):
+    assert ingest.academic_year(text, filename) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("Total fund value of $12.5 million", 12.5),
+    ("Portfolio value: $2,450,000", 2.45),
+    ("Total assets of $850 thousand", 0.85),
+    ("Total assets of 3.4", 3.4),
+])
+def test_fund_value_millions(text, expected):
+    assert ingest.fund_value_millions(text) == expected
+
+def test_overlay_reverts_the_previous_run():
+    table = pd.DataFrame({"Year": ["2028-2029"], "Return": [5.9], "Equities": [73]})
+    first, provenance = ingest.overlay(table, {"2028-2029": {"Return": 6.0}, "2030-2031": {"Return": 7.5}},
+                                       ["Return", "Equities"])
+    assert first["Return"].tolist() == [6.0, 7.5]
+    assert provenance["rows"] == {"2028-2029": {"created": False, "cells": {"Return": 5.9}},
+                                  "2030-2031": {"created": True, "cells": {}}}
+    # Both reports gone: the hand-entered value comes back, the added row goes, integers stay integers.
+    second, provenance = ingest.overlay(first, {}, ["Return", "Equities"], provenance)
+    assert second["Year"].tolist() == ["2028-2029"]
+    assert second["Return"].tolist() == [5.9]
+    assert second["Equities"].tolist() == [73]
+    assert provenance["rows"] == {}
+
+@pytest.fixture
+def dirs(tmp_path):
+    reports, data = tmp_path / "reports", tmp_path / "data"
+    reports.mkdir()
+    shutil.copytree(DATA_DIR, data)
+    return reports, data
+
+def run(reports, data):
+    return ingest.main([str(reports), "--data-dir", str(data), "--workers", "1"])
+
+def test_main_adds_and_removes_a_report(dirs, capsys):
+    reports, data = dirs
+    original = (data / "fund_metrics.csv").read_bytes()
+    existing = pd.read_csv(data / "fund_metrics.csv")["Year"].iloc[-1]
+    (reports / "new.txt").write_text(REPORT)
+    (reports / "old.txt").write_text(f"Annual Report {existing}\nThe fund returned 99.5% for the year.\n")
+    assert run(reports, data) == 0
+    assert (data / ingest.MANIFEST_NAME).exists()
+    metrics = pd.read_csv(data / "fund_metrics.csv").set_index("Year")
+    assert metrics.index[-1] == "2030-2031"
+    assert metrics.loc[existing, "Return"] == 99.5
+    assert metrics.loc["2030-2031", "Return"] == 7.5
+
+    os.remove(reports / "new.txt")
+    os.remove(reports / "old.txt")
+    assert run(reports, data) == 0
+    assert (data / "fund_metrics.csv").read_bytes() == original
+    assert not (data / ingest.MANIFEST_NAME).exists()
+    assert "2 removed" in capsys.readouterr().out
+
+def test_touched_but_unchanged_reports_update_the_manifest(dirs, capsys):
+    reports, data = dirs
+    report = reports / "2030.txt"
+    report.write_text(REPORT)
+    run(reports, data)
+    os.utime(report, ns=(0, 1_000_000_000))
+    assert run(reports, data) == 0
+    assert "Tables are up to date." in capsys.readouterr().out
+    manifest = json.loads((data / ingest.MANIFEST_NAME).read_text())
+    assert manifest["files"]["2030.txt"]["mtime_ns"] == 1_000_000_000
+    # And the next run no longer hashes it.
+    entries, parsed, removed = ingest.scan(str(reports), manifest["files"], 1)
+    assert (parsed, removed) == (0, [])
@@ -0,0 +1,138 @@
+import sqlite3
+
+import pytest
+
+import jobs
+import projections
+from job_worker import JobCancelled, Worker
+
+# Targets the worker imports by "module:function" (tests/ is on sys.path under pytest).
+def scaled(values, factor):
+    return [v * factor for v in values]
+
+def counted(set_progress, steps):
+    for step in range(steps):
+        set_progress(step)
+    return steps
+
+def broken():
+    raise ValueError("no data")
+
+REACHED = []
+
+def cancelled_midway(set_progress, db, job):
+    # Cancels itself (as the Cancel button would) after the first step, then keeps reporting.
+    for step in range(5):
+        set_progress(step)
+        REACHED.append(step)
+        if step == 0:
+            with sqlite3.connect(db) as conn:
+                conn.execute("UPDATE jobs SET status = 'cancelled' WHERE id = ?", (job,))
+    return "finished anyway"
+
+@jobs.offload("test_jobs:scaled", finish=lambda value: {"total": sum(value)})
+def scale_callback(values, factor):
+    return {"values": values, "factor": factor}
+
+@jobs.offload("test_jobs:counted")
+def count_callback(steps):
+    return {"steps": steps}
+
+@jobs.offload("test_jobs:cancelled_midway")
+def cancel_callback(db, job):
+    return {"db": db, "job": job}
+
+@jobs.offload("test_jobs:broken", finish=lambda value: pytest.fail("finish ran on an error"))
+def broken_callback():
+    return {}
+
+@pytest.fixture
+def manager(tmp_path):
+    # workers=0: nothing is spawned, the tests drive a Worker inline.
+    manager = jobs.SQLiteJobManager(str(tmp_path / "jobs.sqlite3"), workers=0)
+    manager.register("scale", scale_callback, False)
+    manager.register("count", count_callback, True)
+    manager.register("broken", broken_callback, False)
+    manager.register("cancel", cancel_callback, True)
+    return manager
+
+def submit(manager, fn_key, key, args):
+    return manager.call_job_fn(key, manager.func_registry[fn_key], args, None)
+
+def run_next(manager):
+    worker = Worker(manager.path)
+    row = worker.claim()
+    assert row is not None
+    worker.run(*row)
+
+def test_job_runs_in_the_worker_and_finishes_in_the_web_process(manager):
+    job = submit(manager, "scale", "k1", [[1, 2, 3], 2])
+    assert manager.job_running(job)
+    assert manager.get_result("k1", job) is manager.UNDEFINED
+    run_next(manager)
+    assert manager.job_status(job) == "done"
+    assert manager.get_result("k1", job) == {"total": 12}
+    # Without cache_by the result is handed out once.
+    assert manager.get_result("k1", job) is manager.UNDEFINED
+
+def test_progress_is_reported_through_the_queue(manager):
+    job = submit(manager, "count", "k2", {"steps": 3})
+    run_next(manager)
+    # The latest report is kept until a poll takes it.
+    assert manager.get_progress("k2") == [2]
+    assert manager.get_progress("k2") is None
+    assert manager.get_result("k2", job) == 3
+
+def test_failure_comes_back_as_dash_error_value(manager):
+    job = submit(manager, "broken", "k3", [])
+    run_next(manager)
+    assert manager.job_status(job) == "failed"
+    error = manager.get_result("k3", job)["background_callback_error"]
+    assert error["msg"] == "no data"
+    assert "ValueError" in error["tb"]
+
+def test_cancelled_job_is_never_run(manager):
+    job = submit(manager, "scale", "k4", [[1], 1])
+    manager.terminate_job(job)
+    assert not manager.job_running(job)
+    assert Worker(manager.path).claim() is None
+    assert manager.get_result("k4", job) is manager.UNDEFINED
+
+def test_cached_result_is_reused_without_queueing(tmp_path):
+    manager = jobs.SQLiteJobManager(str(tmp_path / "jobs.sqlite3"), cache_by=[lambda: "v1"], workers=0)
+    manager.register("scale", scale_callback, False)
+    job = submit(manager, "scale", "k5", [[5], 2])
+    run_next(manager)
+    assert manager.get_result("k5", job) == {"total": 10}
+    assert submit(manager, "scale", "k5", [[5], 2]) is None
+    assert manager.get_result("k5", None) == {"total": 10}
+    assert Worker(manager.path).claim() is None
+
+def test_callback_without_offload_is_rejected(manager):
+    manager.register("plain", lambda x: x, False)
+    with pytest.raises(TypeError, match="jobs.offload"):
+        submit(manager, "plain", "k6", [1])
+
+def test_running_job_stops_at_its_next_progress_report(manager):
+    REACHED.clear()
+    job = submit(manager, "cancel", "k7", [manager.path, 1])
+    assert job == "1"
+    run_next(manager)
+    assert REACHED == [0]
+    assert manager.job_status(job) == "cancelled"
+    assert manager.get_result("k7", job) is manager.UNDEFINED
+
+def test_projection_reports_progress_per_chunk_and_stops_when_cancelled(monkeypatch):
+    monkeypatch.setattr(projections, "CHUNK_PATHS", 100)
+    history = [[0.08, 0.6], [-0.02, 0.6], [0.12, 0.7]]
+    reports = []
+    def set_progress(message):
+        reports.append(message)
+        if len(reports) == 3:
+            raise JobCancelled()
+    with pytest.raises(JobCancelled):
+        projections.projection_job(set_progress, history, [60, 30, 10, 0], 5, start=["2023-2024", 4.3], n_paths=400)
+    assert reports[1:] == ["Simulated 25% of 400 paths over 5 years...", "Simulated 50% of 400 paths over 5 years..."]
+    result = projections.projection_job(lambda message: None, history, [60, 30, 10, 0], 5,
+                                        start=["2023-2024", 4.3], n_paths=400)
+    assert result["start"] == ["2023-2024", 4.3]
@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+
+import pytest
+from flask import Flask
+
+import live_feed
+from live_feed import Broadcast, LiveFeed
+
+def points(event):
+    lines = event.decode("utf-8").splitlines()
+    payload = json.loads(lines[1][len("data: "):])
+    return lines[0], payload["reset"], [p[0] for p in payload["points"]]
+
+@pytest.fixture
+def broadcast():
+    broadcast = Broadcast(history=4, stream_id="abc")
+    broadcast.publish([("t1", 1.0), ("t2", 2.0)])
+    broadcast.publish([("t3", 3.0)])
+    return broadcast
+
+def test_caught_up_client_gets_the_shared_encoded_batch(broadcast):
+    (event,) = broadcast._events_since(2)
+    assert event is broadcast._batches[-1][2]
+    assert points(event) == ("id: abc:3", False, [3])
+    assert broadcast._events_since(3) == []
+
+def test_client_behind_mid_batch_gets_one_slice(broadcast):
+    (event,) = broadcast._events_since(1)
+    assert points(event) == ("id: abc:3", False, [2, 3])
+
+def test_new_client_and_one_past_the_history_are_reset(broadcast):
+    assert points(broadcast._events_since(0)[0]) == ("id: abc:3", True, [1, 2, 3])
+    broadcast.publish([("t4", 4.0), ("t5", 5.0)])
+    assert points(broadcast._events_since(1)[0]) == ("id: abc:5", False, [2, 3, 4, 5])
+    broadcast.publish([("t6", 6.0)])
+    # Point 2 has now left the 4-point history, so a client at 1 cannot be caught up incrementally.
+    assert points(broadcast._events_since(1)[0]) == ("id: abc:6", True, [3, 4, 5, 6])
+
+def test_wait_times_out_with_nothing_new(broadcast):
+    assert broadcast.wait(3, 0.01) == ([], 3)
+    events, seq = broadcast.wait(1, 0.01)
+    assert seq == 3 and len(events) == 1
+
+@pytest.mark.parametrize("last_event_id, expected", [
+    ("abc:2", 2),
+    ("other:2", 0),       # Another process (or an earlier one) numbered its own points
+    ("abc:99", 0),        # Ahead of this log
+    ("abc:x", 0),
+    ("", 0),
+    (None, 0),
+])
+def test_resume_point(broadcast, last_event_id, expected):
+    assert broadcast.resume_point(last_event_id) == expected
+
+class Stop(Exception):
+    pass
+
+def test_file_feed_waits_for_whole_lines_and_follows_truncation_and_rotation(tmp_path):
+    path = tmp_path / "nav.csv"
+    path.write_text("t,nav\nt1,1.5\nt2,2")
+    batches = []
+
+    def publish(observations):
+        batches.append(observations)
+        if len(batches) == 1:
+            with open(path, "a") as f:
+                f.write(".5\n")                    # Completes the half-written line
+        elif len(batches) == 2:
+            path.write_text("t9,9\n")              # Truncated in place
+        elif len(batches) == 3:
+            rotated = tmp_path / "nav.new"
+            rotated.write_text('{"t": "t10", "nav": 10}\nnot a line\n')
+            os.replace(rotated, path)              # Rotated: new inode
+        else:
+            raise Stop()
+
+    with pytest.raises(Stop):
+        live_feed.file_feed(str(path), poll=0)(publish)
+    assert batches == [[("t1", 1.5)], [("t2", 2.5)], [("t9", 9.0)], [("t10", 10.0)]]
+
+def test_parse_observation():
+    assert live_feed.parse_observation("0,100") == ("1970-01-01T00:00:00.000Z", 100.0)
+    assert live_feed.parse_observation('{"timestamp": "t", "value": "3"}') == ("t", 3.0)
+    assert live_feed.parse_observation("t,nan") is None
+    assert live_feed.parse_observation("timestamp,nav") is None
+
+@pytest.fixture
+def client():
+    feed = LiveFeed(lambda publish: threading.Event().wait(), max_streams=1)
+    server = Flask(__name__)
+    live_feed.init_app(server, feed)
+    return server.test_client()
+
+def test_streams_over_the_cap_are_refused_until_one_closes(client):
+    first = client.get(live_feed.STREAM_PATH, buffered=False)
+    assert first.status_code == 200
+    assert first.mimetype == "text/event-stream"
+    refused = client.get(live_feed.STREAM_PATH, buffered=False)
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == str(live_feed.BUSY_RETRY_SECONDS)
+    first.close()
+    second = client.get(live_feed.STREAM_PATH, buffered=False)
+    assert second.status_code == 200
+    assert next(second.response) == f"retry: {live_feed.RETRY_MS}\n\n".encode("utf-8")
+    second.close()
@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import projections
+
+HISTORY = ((0.08, 0.6), (-0.12, 0.65), (0.15, 0.7), (0.03, 0.5))
+ALLOCATION = (60.0, 30.0, 10.0, 0.0)
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    projections.run_projection.cache_clear()
+    yield
+    projections.run_projection.cache_clear()
+
+def test_history_skips_years_without_risky_exposure():
+    df = pd.DataFrame({"Return": [np.nan, 0.0, 8.0], "Equities": [0, 0, 50], "Real_Assets": [0, 0, 10]})
+    assert projections.history_from_frame(df) == ((0.08, 0.6),)
+    assert projections.risky_share((50.0, 30.0, 10.0, 10.0)) == 0.6
+    assert projections.risky_share((0.0, 0.0, 0.0, 0.0)) == 0.0
+
+def test_percentile_bands_are_ordered():
+    result = projections.run_projection(HISTORY, ALLOCATION, 10, n_paths=2000)
+    bands = np.array([result["bands"][p] for p in projections.PERCENTILES])
+    assert bands.shape == (5, 10)
+    assert (np.diff(bands, axis=0) >= 0).all()
+    assert 0.0 <= result["prob_loss"] <= 1.0
+
+def test_same_seed_same_result():
+    first = projections.run_projection(HISTORY, ALLOCATION, 5, seed=7, n_paths=1000)
+    projections.run_projection.cache_clear()
+    assert projections.run_projection(HISTORY, ALLOCATION, 5, seed=7, n_paths=1000) == first
+    assert projections.run_projection(HISTORY, ALLOCATION, 5, seed=8, n_paths=1000) != first
+
+def test_chunks_are_the_seeding_unit(monkeypatch):
+    # A run split into chunks equals its chunks simulated one by one from the spawned seeds.
+    monkeypatch.setattr(projections, "CHUNK_PATHS", 300)
+    growth = projections.simulate_growth(HISTORY, ALLOCATION, 4, 11, 700)
+    returns, risky = np.array(HISTORY).T
+    excess = (returns - projections.SAFE_RATE) / risky
+    seeds = np.random.SeedSequence(11).spawn(3)
+    expected = np.vstack([projections.simulate_chunk(excess, 0.6, 4, size, seed)
+                          for size, seed in zip((300, 300, 100), seeds)])
+    np.testing.assert_array_equal(growth, expected)
+
+def test_pooled_and_in_process_runs_are_identical(monkeypatch):
+    monkeypatch.setattr(projections, "CHUNK_PATHS", 500)
+    serial = projections.simulate_growth(HISTORY, ALLOCATION, 6, 3, 2000)
+    monkeypatch.setattr(projections, "PARALLEL_THRESHOLD", 1000)
+    pooled = projections.simulate_growth(HISTORY, ALLOCATION, 6, 3, 2000)
+    np.testing.assert_array_equal(pooled, serial)
+
+def test_job_result_matches_the_in_process_projection():
+    progress = []
+    result = projections.projection_job(progress.append, [list(h) for h in HISTORY], list(ALLOCATION), 5,
+                                        start=["2023-2024", 4.3], n_paths=1000)
+    expected = projections.run_projection(HISTORY, ALLOCATION, 5, n_paths=1000)
+    assert json.loads(json.dumps(result)) == dict(json.loads(json.dumps(expected)), start=["2023-2024", 4.3],
+                                                  allocation=list(ALLOCATION))
+    assert progress[-1] == "Simulated 100% of 1,000 paths over 5 years..."
+
+def test_future_year_labels():
+    assert projections.future_year_labels("2023-2024", 2) == ["2024-2025", "2025-2026"]
@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from range_stats import RangeAggregates
+
+YEARS = ["2019-2020", "2020-2021", "2021-2022", "2022-2023"]
+
+def yearly(returns=(np.nan, 10.0, -10.0, 10.0), values=(100.0, 110.0, 99.0, 108.9)):
+    return pd.DataFrame({
+        "Year": YEARS,
+        "Fund_Value": values,
+        "Return": returns,
+        "Equities": [np.nan, 60.0, 40.0, 50.0],
+        "Fixed_Income": [np.nan, 40.0, 60.0, 50.0],
+        "Cash": [np.nan, 0.0, 0.0, 0.0],
+        "Real_Assets": [np.nan] * 4
+    })
+
+def test_range_chains_yearly_returns():
+    stats = RangeAggregates.build(yearly()).query("2020-2021", "2022-2023")
+    assert stats["source"] == "yearly"
+    assert (stats["years"], stats["return_years"]) == (3, 3)
+    assert stats["cumulative_return"] == pytest.approx(1.1 * 0.9 * 1.1 - 1)     # 8.9%
+    assert stats["annualized_return"] == pytest.approx(1.089 ** (1 / 3) - 1)
+    # The range opens at the close of the year before it.
+    assert (stats["opening_value"], stats["closing_value"]) == (100.0, 108.9)
+    assert stats["value_growth"] == pytest.approx(0.089)
+    assert stats["allocation"] == {"Equities": 50.0, "Fixed_Income": 50.0, "Cash": 0.0, "Real_Assets": None}
+
+def test_reversed_bounds_are_the_same_range():
+    ranges = RangeAggregates.build(yearly())
+    assert ranges.query("2022-2023", "2020-2021") == ranges.query("2020-2021", "2022-2023")
+
+def test_launch_year_has_no_return():
+    stats = RangeAggregates.build(yearly()).query("2019-2020", "2019-2020")
+    assert stats["return_years"] == 0
+    assert stats["cumulative_return"] is None
+    assert stats["annualized_return"] is None
+    assert stats["value_growth"] == 0.0
+
+def test_zero_opening_value_has_no_growth():
+    stats = RangeAggregates.build(yearly(values=(0.0, 110.0, 99.0, 108.9))).query("2020-2021", "2020-2021")
+    assert stats["value_growth"] is None
+
+def test_total_loss_does_not_poison_later_ranges():
+    ranges = RangeAggregates.build(yearly(returns=(np.nan, -100.0, 10.0, 10.0)))
+    assert ranges.query("2019-2020", "2022-2023")["cumulative_return"] == -1.0
+    assert ranges.query("2019-2020", "2022-2023")["annualized_return"] == -1.0
+    after = ranges.query("2021-2022", "2022-2023")
+    assert math.isfinite(after["cumulative_return"])
+    assert after["cumulative_return"] == pytest.approx(0.21)
+
+def test_daily_returns_take_over_when_they_cover_the_range():
+    daily = pd.DataFrame({
+        "Year": ["2020-2021", "2020-2021", "2021-2022", "2021-2022"],
+        "date": pd.to_datetime(["2021-01-01", "2021-06-30", "2021-12-31", "2022-06-30"]),
+        "return": [0.0, 0.05, 0.02, 0.01]
+    })
+    ranges = RangeAggregates.build(yearly(), daily)
+    stats = ranges.query("2020-2021", "2021-2022")
+    assert stats["source"] == "daily"
+    assert stats["cumulative_return"] == pytest.approx(1.05 * 1.02 * 1.01 - 1)
+    period = (pd.Timestamp("2022-06-30") - pd.Timestamp("2021-01-01")).days / 365.25
+    assert stats["annualized_return"] == pytest.approx((1.05 * 1.02 * 1.01) ** (1 / period) - 1)
+    # 2022-2023 has no daily rows, so a range reaching it falls back to the yearly figures.
+    assert ranges.query("2020-2021", "2022-2023")["source"] == "yearly"
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import relative_performance as rp
+
+YEARS = ["2019-2020", "2020-2021", "2021-2022", "2022-2023"]
+FUND = pd.DataFrame({"Year": YEARS, "Return": [np.nan, 10.0, -5.0, 20.0]})
+BENCH = pd.DataFrame({"Year": YEARS[1:], "Return": [5.0, -10.0, 10.0]})
+
+def test_expanding_window_against_hand_computed_statistics():
+    table = rp.relative_table(FUND, None, BENCH, None)
+    assert table.loc["2020-2021", "excess_return"] == pytest.approx(0.05)
+    row = table.loc["2022-2023"]
+    assert row["observations"] == 3
+    # Active returns 5%, 5%, 10%.
+    assert row["tracking_error"] == pytest.approx(np.sqrt(0.0025 / 3))
+    assert row["information_ratio"] == pytest.approx((0.2 / 3) / np.sqrt(0.0025 / 3))
+    assert row["beta"] == pytest.approx(0.025833333 / 0.021666667)
+    # Up years (5%, 10%): fund 15% on average vs 7.5%; the down year: -5% vs -10%.
+    assert row["up_capture"] == pytest.approx(2.0)
+    assert row["down_capture"] == pytest.approx(0.5)
+    assert row["annualized_excess"] == pytest.approx((1.1 * 0.95 * 1.2) ** (1 / 3) - (1.05 * 0.9 * 1.1) ** (1 / 3))
+    assert table.loc["2019-2020"].isna().all()
+
+def test_short_windows_are_empty_rather_than_infinite():
+    table = rp.relative_table(FUND, None, BENCH, 1)
+    assert table["tracking_error"].isna().all()
+    assert np.isnan(table.loc["2021-2022", "up_capture"])      # No up period in a one-year window
+    assert not np.isinf(table.to_numpy(dtype=np.float64)).any()
+    table = rp.relative_table(FUND, None, BENCH, 3)
+    assert np.isnan(table.loc["2021-2022", "tracking_error"])   # Window not yet full
+    assert table.loc["2022-2023", "tracking_error"] == pytest.approx(np.sqrt(0.0025 / 3))
+
+def test_tracking_the_benchmark_exactly_has_no_information_ratio():
+    table = rp.relative_table(FUND, None, FUND.dropna(), None)
+    row = table.loc["2022-2023"]
+    assert row["tracking_error"] == 0.0
+    assert np.isnan(row["information_ratio"])
+    assert row["beta"] == pytest.approx(1.0)
+
+def test_levels_become_academic_year_returns():
+    levels = pd.DataFrame({"date": ["2020-06-30", "2020-12-31", "2021-06-30", "2021-12-31"],
+                           "close": [100.0, 110.0, 121.0, 133.1]})
+    yearly = rp.benchmark_yearly(levels)
+    assert list(yearly.index) == ["2019-2020", "2020-2021", "2021-2022"]
+    assert yearly.to_numpy() == pytest.approx([0.0, 0.21, 0.1])
+
+def test_daily_returns_align_on_the_last_close_at_or_before_each_day():
+    daily = pd.DataFrame({"date": pd.to_datetime(["2021-01-04", "2021-01-05", "2021-01-06"]),
+                          "Year": ["2020-2021"] * 3, "return": [0.01, 0.02, 0.03]})
+    levels = pd.DataFrame({"date": ["2021-01-01", "2021-01-05"], "close": [100.0, 110.0]})
+    fund, bench, labels, periods = rp.aligned_returns(FUND, daily, levels)
+    # The first day has no previous close to measure the benchmark from.
+    assert fund.tolist() == [0.02, 0.03]
+    assert bench == pytest.approx([0.1, 0.0])
+    assert periods == rp.TRADING_DAYS
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from returns_engine import (academic_year_start, apply_performance, compute_performance, daily_returns,
+                            money_weighted_returns)
+
+# 100 shares of A at 10 on 2020-06-30 (NAV 1,000); A rises 10% on each of the next two trading days,
+# and 121 is contributed on 2020-07-02 and invested in 10 more shares (NAV 110 x 12.1 = 1,331).
+PRICES = pd.DataFrame({
+    "date": ["2020-06-30", "2020-07-01", "2020-07-02", "2021-06-30"],
+    "ticker": ["A", "A", "A", "A"],
+    "close": [10.0, 11.0, 12.1, 12.1]
+})
+HOLDINGS = pd.DataFrame({"date": ["2020-06-30", "2020-07-02"], "ticker": ["A", "A"], "shares": [100.0, 110.0]})
+FLOWS = pd.DataFrame({"date": ["2020-07-02"], "amount": [121.0]})
+
+def test_academic_years_run_july_to_june():
+    dates = np.array(["2020-06-30", "2020-07-01", "2021-06-30", "2021-07-01"], dtype="datetime64[D]")
+    assert academic_year_start(dates).tolist() == [2019, 2020, 2020, 2021]
+
+def test_daily_nav_and_returns_strip_flows():
+    yearly, daily = compute_performance(HOLDINGS, PRICES, FLOWS)
+    assert daily["nav"].tolist() == pytest.approx([1000.0, 1100.0, 1331.0, 1331.0])
+    # (1331 - 121) / 1100 - 1 = 10%: the contribution is not return.
+    assert daily["return"].tolist() == pytest.approx([0.0, 0.1, 0.1, 0.0])
+    assert daily["Year"].tolist() == ["2019-2020", "2020-2021", "2020-2021", "2020-2021"]
+
+def test_yearly_twr_and_mwr():
+    yearly, _ = compute_performance(HOLDINGS, PRICES, FLOWS)
+    assert yearly["Year"].tolist() == ["2019-2020", "2020-2021"]
+    assert yearly["Days"].tolist() == [1, 3]
+    assert yearly["Fund_Value"].tolist() == pytest.approx([0.001, 0.001331])
+    assert yearly["Return"].tolist() == pytest.approx([0.0, 21.0])     # 1.1 x 1.1 - 1
+
+    # MWR solves 1000 (1+r)^T + 121 (1+r)^tau = 1331 with T = 365 and tau = 363 days in years.
+    T, tau = 365 / 365.25, 363 / 365.25
+    lo, hi = 0.0, 1.0
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        lo, hi = (mid, hi) if 1000 * (1 + mid) ** T + 121 * (1 + mid) ** tau < 1331 else (lo, mid)
+    assert yearly["MWR"].iloc[1] == pytest.approx(lo * 100, abs=1e-8)
+    # Below the 21% TWR: the 121 arrived after both up days and earned nothing (~1331 / 1121 - 1).
+    assert 18.0 < yearly["MWR"].iloc[1] < 19.0
+
+def test_mwr_without_flows_is_the_annualized_growth():
+    r = money_weighted_returns(np.array([100.0, 100.0]), np.array([121.0, 100.0]),
+                               np.zeros((2, 1)), np.zeros((2, 1)), np.array([2.0, 1.0]))
+    assert r.tolist() == pytest.approx([0.1, 0.0])
+
+def test_mwr_with_no_opening_value_uses_the_flows():
+    # Empty at the start, 100 contributed half a year before the end, 110.25 at the end: 10.25% over 0.5y.
+    r = money_weighted_returns(np.array([0.0]), np.array([110.25]), np.array([[100.0]]), np.array([[0.5]]),
+                               np.array([1.0]))
+    assert r[0] == pytest.approx(1.1025 ** 2 - 1)
+
+def test_returns_after_a_zero_nav_day_are_zero_not_inf():
+    returns = daily_returns(np.array([0.0, 100.0, 110.0]), np.array([0.0, 100.0, 0.0]))
+    assert returns.tolist() == pytest.approx([0.0, 0.0, 0.1])
+
+def test_apply_performance_only_touches_covered_years():
+    df = pd.DataFrame({"Year": ["2019-2020", "2020-2021", "2021-2022"], "Fund_Value": [9.0, 9.0, 9.0],
+                       "Return": [1.0, 1.0, 1.0]})
+    yearly = pd.DataFrame({"Year": ["2020-2021"], "Fund_Value": [1.23456], "Return": [21.004]})
+    out = apply_performance(df, yearly)
+    assert out["Fund_Value"].tolist() == [9.0, 1.23, 9.0]
+    assert out["Return"].tolist() == [1.0, 21.0, 1.0]
+    assert df["Return"].tolist() == [1.0, 1.0, 1.0]
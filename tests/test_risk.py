@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import risk
+
+YEARS = ["2019-2020", "2020-2021", "2021-2022", "2022-2023"]
+
+def table(returns, **kwargs):
+    df = pd.DataFrame({"Year": YEARS, "Return": returns})
+    return risk.risk_table(df, risk_free=0.0, n_samples=200, **kwargs)
+
+def test_metrics_as_of_the_last_year():
+    # Yearly returns 10%, -5%, 20%: mean 8.33%, sample std 12.58%, downside deviation sqrt(0.05**2 / 3).
+    row = table([np.nan, 10.0, -5.0, 20.0]).loc["2022-2023"]
+    assert row["observations"] == 3
+    assert row["volatility"] == pytest.approx(0.125831, abs=1e-6)
+    assert row["rolling_volatility"] == pytest.approx(row["volatility"])
+    assert row["sharpe"] == pytest.approx((0.25 / 3) / 0.125831, abs=1e-5)
+    assert row["sortino"] == pytest.approx((0.25 / 3) / np.sqrt(0.0025 / 3))
+    assert row["max_drawdown"] == pytest.approx(-0.05)
+    assert row["current_drawdown"] == 0.0
+    # 5% quantile of (-5%, 10%, 20%) interpolates to -3.5%; the tail beyond it is the -5% year.
+    assert row["var"] == pytest.approx(0.035)
+    assert row["cvar"] == pytest.approx(0.05)
+    # Resamples draw from the same three years, so their tail never goes past the worst one.
+    assert -0.2 <= row["bootstrap_var"] <= row["bootstrap_cvar"] <= 0.05
+
+def test_rows_before_the_history_are_empty():
+    frame = table([np.nan, 10.0, -5.0, 20.0])
+    assert frame.loc["2019-2020"].isna().all()
+    assert np.isnan(frame.loc["2021-2022", "rolling_volatility"])    # Fewer than ROLLING_YEARS returns
+
+def test_ratios_without_dispersion_are_undefined_not_infinite():
+    frame = table([np.nan, 10.0, 20.0, 5.0])
+    # One observation: no standard deviation; no losing year yet: no downside deviation.
+    assert np.isnan(frame.loc["2020-2021", "sharpe"])
+    assert frame["sortino"].isna().all()
+    assert not np.isinf(frame.to_numpy()).any()
+    constant = table([np.nan, 5.0, 5.0, 5.0])
+    assert constant["sharpe"].isna().all()
+
+def test_initial_loss_is_a_drawdown():
+    row = table([np.nan, -10.0, 5.0, 5.0]).loc["2021-2022"]
+    assert row["current_drawdown"] == pytest.approx(0.9 * 1.05 - 1)
+    assert row["max_drawdown"] == pytest.approx(-0.1)
+
+def test_bootstrap_is_reproducible():
+    returns = [np.nan, 10.0, -5.0, 20.0]
+    pd.testing.assert_frame_equal(table(returns), table(returns))
+
+def test_daily_returns_are_annualized_with_trading_days():
+    daily = pd.DataFrame({"Year": ["2020-2021"] * 3, "return": [0.01, -0.01, 0.02]})
+    frame = risk.risk_table(pd.DataFrame({"Year": YEARS, "Return": np.nan}), daily, risk_free=0.0, n_samples=10)
+    assert frame.loc["2020-2021", "volatility"] == pytest.approx(np.std([0.01, -0.01, 0.02], ddof=1) * np.sqrt(252))
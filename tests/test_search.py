@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import search
+from search import SearchIndex, load_or_build, report_passages
+
+SUMMARIES = {
+    "2019-2020": "Annual Report 2019-2020:\n- Divested from coal producers and oil sands.\n- Added solar and wind infrastructure.",
+    "2020-2021": "Highlights:\n- Equity allocation rose to 60 percent.\n- Bond duration was shortened ahead of rate hikes.",
+    "2021-2022": "- Cisco Systems was the top performer.\n- Real assets returned 12 percent.",
+}
+SHIFTS = pd.DataFrame({"Year": ["2019-2020", "2021-2022"],
+                       "Key_Shifts": ["Sold fossil fuel holdings", "Increased renewable energy exposure"]})
+INSIGHTS = pd.DataFrame({"Category": ["ESG"], "Key Insights": ["Solar divestment screens improved the ESG score"]})
+
+@pytest.fixture(scope="module")
+def docs():
+    return report_passages(SUMMARIES, SHIFTS, INSIGHTS)
+
+@pytest.fixture(scope="module")
+def index(docs):
+    return SearchIndex.build(docs)
+
+def test_passages_are_bullets_shifts_and_insights(docs):
+    assert len(docs) == 9
+    assert docs[0] == {"year": "2019-2020", "source": "Annual Report 2019-2020",
+                       "text": "Divested from coal producers and oil sands."}
+    assert docs[2]["source"] == "Highlights"
+    assert docs[4]["source"] == "Summary"        # Bullets with no heading line
+    assert docs[-1] == {"year": "ESG", "source": "Insights", "text": "Solar divestment screens improved the ESG score"}
+
+def test_bm25_matches_the_formula_for_a_single_term(index):
+    # "coal" occurs once, in the first passage only.
+    scores = index.bm25_scores(["coal"])
+    n, doc_len = len(index), index.doc_len
+    idf = math.log(1.0 + (n - 1 + 0.5) / (1 + 0.5))
+    norm = search.BM25_K1 * (1.0 - search.BM25_B + search.BM25_B * doc_len[0] / doc_len.mean())
+    assert scores[0] == pytest.approx(idf * (search.BM25_K1 + 1.0) / (1.0 + norm))
+    assert np.count_nonzero(scores) == 1
+
+def test_keyword_and_vector_matches_fuse(index):
+    results = index.search("solar divestment")
+    assert results[0]["text"] == "Solar divestment screens improved the ESG score"
+    # First in both rankings: two reciprocal-rank terms.
+    assert results[0]["score"] == pytest.approx(2.0 / (search.RRF_K + 1))
+    assert results[0]["bm25"] > 0 and results[0]["similarity"] >= search.MIN_SIMILARITY
+    assert "Added solar and wind infrastructure." in [r["text"] for r in results]
+
+def test_ranking_is_deterministic(docs, index):
+    query = "renewable energy solar"
+    assert index.search(query) == SearchIndex.build(docs).search(query) == index.search(query)
+
+def test_stopword_and_empty_queries(index):
+    assert index.search("the of and") == []
+    assert index.search("") == []
+    assert SearchIndex.build([]).search("solar") == []
+
+def test_reloaded_index_is_memory_mapped_and_answers_the_same(docs, index, tmp_path):
+    loaded = load_or_build(docs, str(tmp_path))
+    assert isinstance(loaded.vectors, np.memmap)
+    assert isinstance(loaded.postings, np.memmap)
+    for query in ("solar divestment", "bond duration rate", "Cisco top performer", "fossil"):
+        assert loaded.search(query) == index.search(query)
+    # Same corpus: the saved index is reused, not rebuilt.
+    assert [p.name for p in tmp_path.iterdir()] == [search.corpus_key(docs)]
+    assert isinstance(load_or_build(docs, str(tmp_path)).vectors, np.memmap)
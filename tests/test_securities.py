@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from securities import PERFORMER_RE, SecurityIndex, parse_performer, security_key
+
+@pytest.mark.parametrize("text, expected", [
+    ("Cisco Systems (CSCO) +19.26%", ("Cisco Systems", "CSCO", 19.26)),
+    ("Suntech Power Holdings (STP) -60.83%", ("Suntech Power Holdings", "STP", -60.83)),
+    ("Hanes Brand -7%", ("Hanes Brand", None, -7.0)),
+    ("Berkshire Hathaway (BRK.B) −3.5 %", ("Berkshire Hathaway", "BRK.B", -3.5)),
+    ("3M (MMM) 4", ("3M", "MMM", 4.0)),
+    ("Apple Inc. (AAPL)", ("Apple Inc.", "AAPL", None)),
+    ("Fund 2020 -5%", ("Fund 2020", None, -5.0)),
+    ("Apple", ("Apple", None, None)),
+])
+def test_parse_performer(text, expected):
+    assert parse_performer(text) == expected
+
+@pytest.mark.parametrize("text", ["", "  ", "N/A", "none", "-"])
+def test_missing_cells(text):
+    assert parse_performer(text) is None
+
+def test_ticker_is_at_most_twelve_characters():
+    match = PERFORMER_RE.match("Odd Co (ABCDEFGHIJKLM) +1%")
+    assert match.group("ticker") is None
+    assert match.group("name") == "Odd Co (ABCDEFGHIJKLM)"
+
+def test_security_keys():
+    assert security_key("Cisco Systems", "csco") == "CSCO"
+    assert security_key("Hanes  Brand", None) == "HANES BRAND"
+
+def test_index_groups_every_appearance_by_security():
+    df = pd.DataFrame({
+        "Year": ["2008-2009", "2009-2010", "2010-2011"],
+        "Top_Performer": ["Cisco Systems (CSCO) +19.26%", "Mastercard (MA) +8%; Cisco (CSCO) +3%", "N/A"],
+        "Underperformer": ["Hanes Brand -7%", "Hanes  Brand -2%", "Mastercard Inc. (MA) -5%"]
+    })
+    index = SecurityIndex.build(df)
+    assert len(index) == 3
+    cisco = index.lookup("csco")
+    assert cisco["Year"].tolist() == ["2008-2009", "2009-2010"]
+    assert cisco["Return"].tolist() == [19.26, 3.0]
+    assert index.lookup("HANES BRAND")["Role"].tolist() == ["Under", "Under"]
+    # The latest name labels a security.
+    assert ("MA", "Mastercard Inc. (MA)", 2) in index.securities()
+    assert index.lookup("XYZ").empty
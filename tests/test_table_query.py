@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from table_query import TableIndex, parse_filter_query
+
+@pytest.fixture
+def index():
+    frame = pd.DataFrame({
+        "Year": ["2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"],
+        "Return": [0.62, 40.9, -8.8, np.nan, 13.87],
+        "Top": ["AAPL", "MSFT", "aapl", "NVDA", "MSFT"]
+    })
+    return TableIndex(frame)
+
+def years(records):
+    return [r["Year"] for r in records]
+
+def test_parse_filter_query():
+    assert parse_filter_query('{Return} ge 5 && {Top} contains "ms"') == [("Return", "ge", 5.0), ("Top", "contains", "ms")]
+    assert parse_filter_query("{Return} ge ") == []
+    assert parse_filter_query(None) == []
+
+def test_unsorted_unfiltered_pages(index):
+    records, pages = index.query(page_current=1, page_size=2)
+    assert years(records) == ["2021-2022", "2022-2023"]
+    assert pages == 3
+
+def test_sort_puts_missing_last_in_both_directions(index):
+    asc, _ = index.query(0, 10, [{"column_id": "Return", "direction": "asc"}])
+    desc, _ = index.query(0, 10, [{"column_id": "Return", "direction": "desc"}])
+    assert years(asc) == ["2021-2022", "2019-2020", "2023-2024", "2020-2021", "2022-2023"]
+    assert years(desc) == ["2020-2021", "2023-2024", "2019-2020", "2021-2022", "2022-2023"]
+
+def test_multi_column_sort(index):
+    records, _ = index.query(0, 10, [{"column_id": "Top", "direction": "asc"},
+                                     {"column_id": "Return", "direction": "desc"}])
+    # factorize sorts case-sensitively: "AAPL" < "MSFT" < "NVDA" < "aapl"
+    assert years(records) == ["2019-2020", "2020-2021", "2023-2024", "2022-2023", "2021-2022"]
+
+@pytest.mark.parametrize("query, expected", [
+    ("{Return} ge 13.87", ["2020-2021", "2023-2024"]),
+    ("{Return} gt 13.87", ["2020-2021"]),
+    ("{Return} lt 0.62", ["2021-2022"]),
+    ("{Return} le 0.62", ["2019-2020", "2021-2022"]),
+    ("{Return} eq -8.8", ["2021-2022"]),
+    ("{Return} ne 40.9", ["2019-2020", "2021-2022", "2022-2023", "2023-2024"]),
+    ("{Top} contains aap", ["2019-2020", "2021-2022"]),
+    ("{Year} datestartswith 2022", ["2022-2023"]),
+    ("{Top} eq msft && {Return} gt 20", ["2020-2021"]),
+    ("{Unknown} gt 1", ["2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"]),
+])
+def test_filters(index, query, expected):
+    records, _ = index.query(0, 10, None, query)
+    assert years(records) == expected
+
+def test_filter_then_sort_then_page(index):
+    records, pages = index.query(1, 1, [{"column_id": "Return", "direction": "desc"}], "{Return} gt 0")
+    assert years(records) == ["2023-2024"]
+    assert pages == 3
+
+def test_empty_result_still_has_one_page(index):
+    records, pages = index.query(0, 20, None, "{Return} gt 100")
+    assert records == []
+    assert pages == 1
+
+def test_rows_come_from_display_frame():
+    frame = pd.DataFrame({"Value": [3.0, 1.0, 2.0]})
+    display = pd.DataFrame({"Value": ["$3", "$1", "$2"]})
+    records, _ = TableIndex(frame, display).query(0, 10, [{"column_id": "Value", "direction": "asc"}])
+    assert [r["Value"] for r in records] == ["$1", "$2", "$3"]